@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Merge Benchmark
+===============
+
+Measures merge_events time against store size, comparing the indexed
+store (IndexedEvents) with the original linear find_duplicate_by_link scan.
+Index build time covers both the link index and the near-duplicate index.
+
+Usage:
+    python scripts/_site/benchmarks/bench_merge.py [--sizes 1000,10000,100000] [--new 100]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fetch_events  # noqa: E402
+
+WORDS = (
+    'festival market concert parade council budget school board library park fire police '
+    'business opening closure factory expansion jobs fair museum exhibit theater show '
+    'marathon charity auction farmers holiday lights downtown village township county '
+    'meeting election vote road construction bridge hospital clinic church youth sports'
+).split()
+
+
+def synthetic_text(seed: int, words: int) -> str:
+    """Deterministic pseudo-random text, so synthetic events aren't near-duplicates of each other"""
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def make_store(total_events: int, days: int = 365) -> Dict[str, List[Dict[str, Any]]]:
+    """Build a synthetic store of `total_events` spread over `days` dates"""
+    start = datetime(2025, 1, 1)
+    store: Dict[str, List[Dict[str, Any]]] = {}
+    for i in range(total_events):
+        date = (start + timedelta(days=i % days)).strftime('%Y-%m-%d')
+        store.setdefault(date, []).append({
+            'category': 'News',
+            'title': f'Event {i}: {synthetic_text(i, 5)}',
+            'description': synthetic_text(-i - 1, 20),
+            'link': f'https://example.com/events/{i}',
+            'tags': ['bench'],
+            'event_date': date,
+            'found_date': date
+        })
+    return store
+
+
+def make_new_events(total_events: int, count: int, current_date: str) -> List[Dict[str, Any]]:
+    """Half updates of existing links, half brand new links"""
+    events = []
+    for i in range(count):
+        n = (i * 7919) % total_events if i % 2 == 0 else total_events + i
+        events.append({
+            'category': 'News',
+            'title': f'Event {n}: {synthetic_text(n, 5)}',
+            'description': synthetic_text(-n - 1, 20),
+            'link': f'https://example.com/events/{n}',
+            'tags': ['bench'],
+            'event_date': current_date,
+            'found_date': current_date
+        })
+    return events
+
+
+def linear_merge(store: Dict[str, List[Dict[str, Any]]], new_events: List[Dict[str, Any]]):
+    """The pre-index merge: one full find_duplicate_by_link scan per new event"""
+    for new_event in new_events:
+        duplicate = fetch_events.find_duplicate_by_link(store, new_event['link'])
+        if duplicate:
+            date, idx = duplicate
+            store[date][idx] = new_event
+        else:
+            store.setdefault(new_event['found_date'], []).append(new_event)
+
+
+def time_merge(store: Dict[str, List[Dict[str, Any]]], new_events: List[Dict[str, Any]], current_date: str) -> float:
+    """Run merge_events once with its output suppressed, returning seconds"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        fetch_events.merge_events(store, new_events, current_date)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Comma-separated store sizes')
+    parser.add_argument('--new', type=int, default=100, help='New events merged per run')
+    args = parser.parse_args()
+
+    current_date = '2026-01-01'
+    print(f"{'store size':>12} {'linear (ms)':>14} {'index build (ms)':>18} {'indexed (ms)':>14}")
+
+    for size in [int(s) for s in args.sizes.split(',')]:
+        new_events = make_new_events(size, args.new, current_date)
+
+        linear_store = make_store(size)
+        start = time.perf_counter()
+        linear_merge(linear_store, new_events)
+        linear = time.perf_counter() - start
+
+        plain_store = make_store(size)
+        start = time.perf_counter()
+        indexed_store = fetch_events.IndexedEvents(plain_store)
+        with contextlib.redirect_stdout(io.StringIO()):
+            indexed_store.near_duplicates
+        build = time.perf_counter() - start
+        indexed = time_merge(indexed_store, new_events, current_date)
+
+        print(f"{size:>12} {linear * 1000:>14.2f} {build * 1000:>18.2f} {indexed * 1000:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Mock API Server
+===============
+
+Local stand-in for the Google Custom Search, OpenAI and X.AI
+chat-completions endpoints, so the pipeline can be benchmarked without
+spending API quota.
+
+    GET  /customsearch/v1       Google Custom Search (q, num, start)
+    POST /v1/chat/completions   OpenAI / X.AI chat completions (stream supported)
+
+Latency, jitter, error rate, rate limiting (429 with Retry-After) and
+payload sizes are configurable. Chat
+completions answer with one event per "URL:" line in the prompt (as
+analyze_with_openai sends), or `events_per_completion` events otherwise.
+
+Usage:
+    python scripts/_site/benchmarks/mock_api.py --port 8765 --latency-ms 200 --error-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+class MockSettings:
+    """Behaviour knobs shared by all request handlers"""
+
+    def __init__(
+        self,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        error_rate: float = 0.0,
+        results_per_query: int = 10,
+        snippet_bytes: int = 160,
+        events_per_completion: int = 20,
+        rate_limit_rate: float = 0.0,
+        retry_after_seconds: float = 1.0,
+        seed: Optional[int] = None
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.results_per_query = results_per_query
+        self.snippet_bytes = snippet_bytes
+        self.events_per_completion = events_per_completion
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_seconds = retry_after_seconds
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.lock = threading.Lock()
+
+
+class MockAPIHandler(BaseHTTPRequestHandler):
+    """Request handler for the mock Google / OpenAI / X.AI endpoints"""
+
+    protocol_version = 'HTTP/1.1'
+    settings: MockSettings = MockSettings()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _simulate(self) -> bool:
+        """Sleep for the configured latency; return False if this request should fail"""
+        settings = self.settings
+        with settings.lock:
+            settings.requests += 1
+            delay = settings.latency_ms + settings.random.uniform(-settings.jitter_ms, settings.jitter_ms)
+            roll = settings.random.random()
+            fail = roll < settings.error_rate
+            limited = not fail and roll < settings.error_rate + settings.rate_limit_rate
+            if fail:
+                settings.errors += 1
+            if limited:
+                settings.rate_limited += 1
+
+        time.sleep(max(0.0, delay) / 1000)
+        if fail:
+            self._send_json(500, {'error': {'message': 'Injected mock failure', 'code': 500}})
+        elif limited:
+            self._send_json(
+                429, {'error': {'message': 'Injected rate limit', 'code': 429}},
+                {'Retry-After': f'{settings.retry_after_seconds:g}'}
+            )
+        return not (fail or limited)
+
+    def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != '/customsearch/v1':
+            self._send_json(404, {'error': {'message': 'Not found'}})
+            return
+        if not self._simulate():
+            return
+
+        params = parse_qs(url.query)
+        query = params.get('q', [''])[0]
+        num = min(int(params.get('num', ['10'])[0]), self.settings.results_per_query)
+        start = int(params.get('start', ['1'])[0])
+        slug = zlib.crc32(query.encode('utf-8'))
+        snippet = ('Local event details ' * (self.settings.snippet_bytes // 20 + 1))[:self.settings.snippet_bytes]
+
+        items = [
+            {
+                'title': f'{query} result {start + i}',
+                'link': f'https://example.com/{slug}/{start + i}',
+                'snippet': snippet
+            }
+            for i in range(num)
+        ]
+        self._send_json(200, {'items': items})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+
+        if urlparse(self.path).path != '/v1/chat/completions':
+            self._send_json(404, {'error': {'message': 'Not found'}})
+            return
+        if not self._simulate():
+            return
+
+        prompt = body.get('messages', [{}])[-1].get('content', '')
+        content = json.dumps(self._events_for(prompt), indent=2)
+        model = body.get('model', 'mock')
+        usage = {
+            'prompt_tokens': len(prompt) // 4 + 1,
+            'completion_tokens': len(content) // 4 + 1,
+            'total_tokens': (len(prompt) + len(content)) // 4 + 2
+        }
+
+        if body.get('stream'):
+            self._stream_completion(model, content, usage)
+            return
+
+        self._send_json(200, {
+            'id': 'chatcmpl-mock',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop'
+            }],
+            'usage': usage
+        })
+
+    def _events_for(self, prompt: str) -> List[Dict[str, Any]]:
+        links = [line[len('URL: '):].strip() for line in prompt.splitlines() if line.startswith('URL: ')]
+        if not links:
+            links = [f'https://example.com/xai/{zlib.crc32(prompt.encode("utf-8"))}/{i}'
+                     for i in range(self.settings.events_per_completion)]
+
+        return [
+            {
+                'category': 'Community',
+                'title': f'Mock event {i}',
+                'description': 'A synthetic event returned by the mock API server.',
+                'link': link,
+                'tags': ['mock', 'benchmark'],
+                'event_date': 'unknown'
+            }
+            for i, link in enumerate(links)
+        ]
+
+    def _stream_completion(self, model: str, content: str, usage: Dict[str, int]):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+
+        def send(payload: str):
+            self.wfile.write(f'data: {payload}\n\n'.encode('utf-8'))
+            self.wfile.flush()
+
+        base = {'id': 'chatcmpl-mock', 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': model}
+        for i in range(0, len(content), 64):
+            send(json.dumps({**base, 'choices': [
+                {'index': 0, 'delta': {'content': content[i:i + 64]}, 'finish_reason': None}
+            ]}))
+        send(json.dumps({**base, 'choices': [], 'usage': usage}))
+        send('[DONE]')
+        self.close_connection = True
+
+
+class MockAPIServer:
+    """
+    Threaded mock server that can run in the background of a benchmark
+
+    Example:
+        with MockAPIServer(MockSettings(latency_ms=100)) as server:
+            print(server.url)
+    """
+
+    def __init__(self, settings: Optional[MockSettings] = None, host: str = '127.0.0.1', port: int = 0):
+        handler = type('BoundMockAPIHandler', (MockAPIHandler,), {'settings': settings or MockSettings()})
+        self.settings = handler.settings
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def endpoints(self) -> Dict[str, str]:
+        """http_config overrides that point the pipeline at this server"""
+        return {
+            'google_search_url': f'{self.url}/customsearch/v1',
+            'xai_chat_url': f'{self.url}/v1/chat/completions',
+            'openai_base_url': f'{self.url}/v1'
+        }
+
+    def start(self) -> 'MockAPIServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'MockAPIServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--results-per-query', type=int, default=10)
+    parser.add_argument('--snippet-bytes', type=int, default=160)
+    parser.add_argument('--events-per-completion', type=int, default=20)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--retry-after-seconds', type=float, default=1.0)
+    args = parser.parse_args()
+
+    settings = MockSettings(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        results_per_query=args.results_per_query,
+        snippet_bytes=args.snippet_bytes,
+        events_per_completion=args.events_per_completion,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after_seconds=args.retry_after_seconds
+    )
+    server = MockAPIServer(settings, args.host, args.port)
+    print(f"Mock API listening on {server.url}")
+    for name, url in server.endpoints().items():
+        print(f"  {name}: {url}")
+
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Offline Pipeline Benchmarks
+===========================
+
+Drives fetch_all_search_results, analyze_with_openai, fetch_events_with_xai,
+merge_events and save_events_json against the local mock API server
+(mock_api.py) and synthetic event stores, and reports throughput and
+latency percentiles. No API quota is used and nothing under the real
+_data/ or _events_store/ directories is touched.
+
+Usage:
+    python scripts/_site/benchmarks/run_benchmarks.py
+    python scripts/_site/benchmarks/run_benchmarks.py --latency-ms 200 --jitter-ms 50 --error-rate 0.05
+    python scripts/_site/benchmarks/run_benchmarks.py --rate-limit-rate 0.1 --retry-after-seconds 0.5
+    python scripts/_site/benchmarks/run_benchmarks.py --only merge,save --sizes 1000,100000,1000000
+    python scripts/_site/benchmarks/run_benchmarks.py --json bench_output.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fetch_events  # noqa: E402
+from bench_merge import make_new_events, make_store  # noqa: E402
+from mock_api import MockAPIServer, MockSettings  # noqa: E402
+
+BENCHMARKS = ('search', 'openai', 'xai', 'merge', 'save')
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(name: str, items: int, total_seconds: float, latencies: List[float], **extra: Any) -> Dict[str, Any]:
+    """Build one result row: throughput over the whole run, latency per call"""
+    return {
+        'benchmark': name,
+        'items': items,
+        'seconds': round(total_seconds, 4),
+        'items_per_second': round(items / total_seconds, 1) if total_seconds else None,
+        'calls': len(latencies),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p90_ms': round(percentile(latencies, 90) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        **extra
+    }
+
+
+@contextlib.contextmanager
+def timed_calls(module: Any, attribute: str, latencies: List[float]):
+    """Temporarily wrap module.attribute so each call's duration is recorded"""
+    original = getattr(module, attribute)
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    setattr(module, attribute, wrapper)
+    try:
+        yield
+    finally:
+        setattr(module, attribute, original)
+
+
+def quiet(func: Callable, *args, **kwargs) -> Any:
+    """Call func with its progress output suppressed"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def bench_config(args: argparse.Namespace) -> Dict[str, Any]:
+    """Pipeline configuration pointed at synthetic data"""
+    return {
+        'categories': ['Community', 'News', 'Business'],
+        'google_config': {
+            'results_per_query': 10,
+            'total_results_limit': args.queries * 10,
+            'max_workers': args.workers,
+            'requests_per_second': 0
+        },
+        'openai_config': {
+            'model': 'mock-model',
+            'max_retries': 3,
+            'stream': args.stream
+        },
+        'xai_config': {'stream': args.stream},
+        'data_retention': {'keep_days': 365, 'cleanup_enabled': False}
+    }
+
+
+def bench_search(args: argparse.Namespace, config: Dict[str, Any]) -> Dict[str, Any]:
+    queries = [f'benchmark query {i}' for i in range(args.queries)]
+    latencies: List[float] = []
+    items = 0
+
+    start = time.perf_counter()
+    with timed_calls(fetch_events, 'fetch_google_results', latencies):
+        for _ in range(args.repeat):
+            items += len(quiet(fetch_events.fetch_all_search_results, queries, 'key', 'cx', config))
+    return summarize('search', items, time.perf_counter() - start, latencies, unit='results')
+
+
+def bench_openai(args: argparse.Namespace, config: Dict[str, Any]) -> Dict[str, Any]:
+    results = [
+        {'title': f'Result {i}', 'link': f'https://example.com/result/{i}', 'snippet': 'Local event details ' * 8}
+        for i in range(args.results)
+    ]
+    latencies: List[float] = []
+    items = 0
+
+    start = time.perf_counter()
+    with timed_calls(fetch_events, 'analyze_chunk_with_openai', latencies):
+        for _ in range(args.repeat):
+            items += len(quiet(fetch_events.analyze_with_openai, results, '2026-01-01', 'key', config))
+    return summarize('openai', items, time.perf_counter() - start, latencies, unit='events')
+
+
+def bench_xai(args: argparse.Namespace, config: Dict[str, Any]) -> Dict[str, Any]:
+    latencies: List[float] = []
+    items = 0
+
+    start = time.perf_counter()
+    for i in range(args.repeat):
+        call_start = time.perf_counter()
+        items += len(quiet(
+            fetch_events.fetch_events_with_xai, f'Benchmark City {i}', config['categories'], 'key', '2026-01-01',
+            3, '', args.stream
+        ))
+        latencies.append(time.perf_counter() - call_start)
+    return summarize('xai', items, time.perf_counter() - start, latencies, unit='events')
+
+
+def bench_merge(args: argparse.Namespace, size: int) -> Dict[str, Any]:
+    store = fetch_events.IndexedEvents(make_store(size))
+    latencies: List[float] = []
+    items = 0
+
+    start = time.perf_counter()
+    for i in range(args.repeat):
+        new_events = make_new_events(size + i * args.new, args.new, '2026-01-01')
+        call_start = time.perf_counter()
+        quiet(fetch_events.merge_events, store, new_events, '2026-01-01')
+        latencies.append(time.perf_counter() - call_start)
+        items += len(new_events)
+    return summarize('merge', items, time.perf_counter() - start, latencies, unit='events', store_size=size)
+
+
+def bench_save(args: argparse.Namespace, size: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        base_path = fetch_events.BASE_PATH
+        fetch_events.BASE_PATH = Path(tmp)
+        try:
+            (Path(tmp) / '_data').mkdir()
+            with open(Path(tmp) / '_data' / 'events.json', 'w', encoding='utf-8') as f:
+                json.dump(make_store(size), f)
+
+            # First load migrates the synthetic history into the store (untimed)
+            events = quiet(fetch_events.load_events_json)
+            latencies: List[float] = []
+            items = 0
+
+            start = time.perf_counter()
+            for i in range(args.repeat):
+                quiet(fetch_events.merge_events, events, make_new_events(size + i * args.new, args.new, '2026-01-01'),
+                      '2026-01-01')
+                call_start = time.perf_counter()
+                quiet(fetch_events.save_events_json, events)
+                latencies.append(time.perf_counter() - call_start)
+                items += size
+            elapsed = time.perf_counter() - start
+        finally:
+            fetch_events.BASE_PATH = base_path
+
+    return summarize('save', items, elapsed, latencies, unit='stored events', store_size=size)
+
+
+def print_table(rows: List[Dict[str, Any]]):
+    print(f"{'benchmark':<10} {'store':>9} {'items':>9} {'items/s':>11} {'calls':>6} "
+          f"{'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}")
+    for row in rows:
+        print(f"{row['benchmark']:<10} {row.get('store_size', ''):>9} {row['items']:>9} "
+              f"{row['items_per_second'] or 0:>11} {row['calls']:>6} "
+              f"{row['p50_ms']:>9} {row['p90_ms']:>9} {row['p99_ms']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', default=','.join(BENCHMARKS), help='Comma-separated subset of: ' + ', '.join(BENCHMARKS))
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Store sizes for merge/save (up to 1000000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per benchmark')
+    parser.add_argument('--queries', type=int, default=28, help='Search queries per run')
+    parser.add_argument('--results', type=int, default=280, help='Search results per OpenAI analysis run')
+    parser.add_argument('--new', type=int, default=100, help='New events merged per run')
+    parser.add_argument('--workers', type=int, default=5, help='Concurrent search workers')
+    parser.add_argument('--stream', action='store_true', help='Use streaming LLM responses')
+    parser.add_argument('--latency-ms', type=float, default=50, help='Mock API latency')
+    parser.add_argument('--jitter-ms', type=float, default=10, help='Mock API latency jitter (+/-)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of mock requests that fail with 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0,
+                        help='Fraction of mock requests answered with 429 + Retry-After')
+    parser.add_argument('--retry-after-seconds', type=float, default=1.0, help='Retry-After sent with mock 429s')
+    parser.add_argument('--results-per-query', type=int, default=10, help='Mock search results per query')
+    parser.add_argument('--snippet-bytes', type=int, default=160, help='Mock search snippet size')
+    parser.add_argument('--events-per-completion', type=int, default=20, help='Mock X.AI events per completion')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.only.split(',') if name.strip()]
+    sizes = [int(size) for size in args.sizes.split(',')]
+    config = bench_config(args)
+    rows: List[Dict[str, Any]] = []
+
+    settings = MockSettings(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        results_per_query=args.results_per_query,
+        snippet_bytes=args.snippet_bytes,
+        events_per_completion=args.events_per_completion,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after_seconds=args.retry_after_seconds,
+        seed=0
+    )
+
+    with MockAPIServer(settings) as server:
+        fetch_events.http_clients.configure(server.endpoints())
+        fetch_events.response_cache.configure({'enabled': False})
+        policy = fetch_events.retry_policy.configure()
+
+        if 'search' in selected:
+            rows.append(bench_search(args, config))
+        if 'openai' in selected:
+            rows.append(bench_openai(args, config))
+        if 'xai' in selected:
+            rows.append(bench_xai(args, config))
+
+        fetch_events.http_clients.configure(fetch_events.http_clients.DEFAULT_ENDPOINTS)
+        mock_requests, mock_errors, mock_limited = settings.requests, settings.errors, settings.rate_limited
+
+    for size in sizes:
+        if 'merge' in selected:
+            rows.append(bench_merge(args, size))
+        if 'save' in selected:
+            rows.append(bench_save(args, size))
+
+    print(f"Mock API: {args.latency_ms}±{args.jitter_ms} ms latency, {args.error_rate:.0%} error rate, "
+          f"{mock_requests} requests served ({mock_errors} failed, {mock_limited} rate limited)")
+    print(f"Retry policy: {policy.summary()}\n")
+    print_table(rows)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': rows}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
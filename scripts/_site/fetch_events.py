@@ -6,19 +6,53 @@ Local Events Fetcher for Jekyll Blog
 This script fetches local events from Google Custom Search API,
 analyzes them with OpenAI, and stores results in events.json.
 
+Run with --rebuild-archives to re-render every markdown archive from the
+stored events (e.g. after the archive template changes) without fetching.
+
 Author: Claude Code
 Date: 2025-11-01
 """
 
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import io
 import json
 import os
+import re
 import sys
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Set, Tuple, Union
 import requests
 
+# Shared modules live in scripts/, one level up from this file
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Root for config/, _data/, _events_store/ and _event_archives/
+BASE_PATH = Path(__file__).parent.parent
+
+# Subdirectory of _data/, _events_store/ and _event_archives/ for the location
+# this process is running (None: the single-location layout)
+OUTPUT_NAMESPACE: Optional[str] = None
+
+import atomic_io  # noqa: E402
+import http_clients  # noqa: E402
+import near_duplicates  # noqa: E402
+import published_output  # noqa: E402
+import query_watermarks  # noqa: E402
+import response_cache  # noqa: E402
+import retry_policy  # noqa: E402
+import run_metrics  # noqa: E402
+from rate_limit import SharedTokenBucket, TokenBucket  # noqa: E402
+from event_store import ShardedEventStore, ShardedLinkIndex, month_of  # noqa: E402
+from json_stream import JSONArrayStreamParser, iter_json_array_items  # noqa: E402
+from sqlite_store import SQLiteEventStore  # noqa: E402
+
 # ============================================================================
 # Configuration Loading
 # ============================================================================
@@ -34,7 +68,7 @@ def load_config() -> Dict[str, Any]:
         FileNotFoundError: If config file doesn't exist
         json.JSONDecodeError: If config file is invalid JSON
     """
-    config_path = Path(__file__).parent.parent / 'config' / 'events.json'
+    config_path = BASE_PATH / 'config' / 'events.json'
 
     if not config_path.exists():
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
@@ -67,10 +101,105 @@ def load_secrets() -> Dict[str, str]:
     if missing:
         raise ValueError(f"Missing required secrets: {', '.join(missing)}")
 
+    # Optional: X.AI is an additional source when xai_config.enabled is set
+    secrets['xai_api_key'] = os.getenv('XAI_API_KEY')
+
     print("✓ API secrets loaded from environment")
     return secrets
 
 
+def configure_services(config: Dict[str, Any]):
+    """
+    Set up the process-wide HTTP clients, dedup settings, cache and retry policy
+
+    Args:
+        config: Configuration dictionary
+    """
+    http_clients.configure(config.get('http_config'))
+    near_duplicates.configure(config.get('dedup_config'))
+    response_cache.configure(config.get('cache_config'))
+    retry_policy.configure(config.get('retry_config'))
+    published_output.configure(config.get('output_config'))
+    query_watermarks.configure(
+        config.get('watermark_config'), output_path('_events_store') / 'query_watermarks.json'
+    )
+
+
+def location_configs(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Expand the optional "locations" list into one configuration per location
+
+    Each entry needs a "name" and may override any top-level section
+    ("location", "cities", "schedule", "query_templates", ...); anything it
+    doesn't set is inherited. Its output goes to the `output` subdirectory
+    (default: the name) of _data/, _events_store/ and _event_archives/; a
+    SQLite `storage_config.sqlite_path` is used as given, so each location
+    has to set its own:
+
+        "locations": [
+            {"name": "gurnee", "location": {...}, "cities": {...}, "schedule": {...}},
+            {"name": "evanston", "output": "north-shore", "location": {...}, "cities": {...}}
+        ]
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        list: Per-location configurations (empty for a single-location config)
+
+    Raises:
+        ValueError: If an entry has no name, or two entries share an output
+            directory or SQLite database
+    """
+    base = {key: value for key, value in config.items() if key != 'locations'}
+    configs = []
+    namespaces: Set[str] = set()
+    sqlite_paths: Set[str] = set()
+
+    for entry in config.get('locations', []):
+        if not entry.get('name'):
+            raise ValueError("Every entry in 'locations' needs a name")
+        namespace = entry.get('output', entry['name'])
+        if not re.fullmatch(r'[\w.-]+', namespace) or namespace in ('.', '..'):
+            raise ValueError(f"Invalid output directory for location '{entry['name']}': {namespace!r}")
+        if namespace in namespaces:
+            raise ValueError(f"Locations share the output directory '{namespace}'")
+        namespaces.add(namespace)
+
+        location_config = {**base, **{k: v for k, v in entry.items() if k not in ('name', 'output')}}
+        location_config['location_name'] = entry['name']
+        location_config['output_namespace'] = namespace
+
+        storage_config = location_config.get('storage_config', {})
+        if storage_config.get('backend') == 'sqlite' and 'sqlite_path' in storage_config:
+            sqlite_path = os.path.normpath(storage_config['sqlite_path'])
+            if sqlite_path in sqlite_paths:
+                raise ValueError(
+                    f"Locations share the SQLite database '{sqlite_path}'; "
+                    f"set storage_config.sqlite_path per location"
+                )
+            sqlite_paths.add(sqlite_path)
+
+        configs.append(location_config)
+
+    return configs
+
+
+def output_path(directory: str) -> Path:
+    """
+    Path of an output directory (_data, _events_store, _event_archives) for this run
+
+    Args:
+        directory: Directory name under scripts/
+
+    Returns:
+        Path: The directory, or its location subdirectory in a multi-location run
+    """
+    if OUTPUT_NAMESPACE:
+        return BASE_PATH / directory / OUTPUT_NAMESPACE
+    return BASE_PATH / directory
+
+
 # ============================================================================
 # Query Generation
 # ============================================================================
@@ -135,37 +264,79 @@ def build_queries(cities: List[str], config: Dict[str, Any]) -> List[str]:
 # Google Custom Search API Integration
 # ============================================================================
 
-def fetch_google_results(
+# The API returns at most 10 results per request and serves only the first 100
+GOOGLE_PAGE_SIZE = 10
+GOOGLE_MAX_RESULTS = 100
+
+
+def fetch_google_page(
     query: str,
     api_key: str,
     search_engine_id: str,
-    num_results: int = 10,
-    max_retries: int = 3
+    start: int = 1,
+    num: int = GOOGLE_PAGE_SIZE,
+    max_retries: int = 3,
+    limiter: Optional[TokenBucket] = None
 ) -> List[Dict[str, Any]]:
     """
-    Fetch search results from Google Custom Search API
+    Fetch one page of search results from Google Custom Search API
+
+    With query watermarks enabled, only pages indexed since the query's
+    last fetch are requested.
 
     Args:
         query: Search query string
         api_key: Google API key
         search_engine_id: Custom Search Engine ID
-        num_results: Number of results to fetch (max 10 per request)
+        start: 1-based index of the first result
+        num: Number of results to fetch (max 10 per request)
         max_retries: Number of retry attempts on failure
+        limiter: Rate limiter to acquire() before each request (optional)
 
     Returns:
         list: List of search result dictionaries with 'title', 'link', 'snippet'
     """
-    url = "https://www.googleapis.com/customsearch/v1"
+    url = http_clients.endpoint('google_search_url')
     params = {
         'key': api_key,
         'cx': search_engine_id,
         'q': query,
-        'num': min(num_results, 10)  # API max is 10
+        'num': min(num, GOOGLE_PAGE_SIZE)  # API max is 10
     }
-
+    if start > 1:
+        params['start'] = start
+    date_restrict = query_watermarks.get_watermarks().date_restrict(query)
+    if date_restrict:
+        params['dateRestrict'] = date_restrict
+
+    # Same query on the same day returns the cached results
+    cache = response_cache.get_cache()
+    cache_key = [search_engine_id, query, params['num'], datetime.now().strftime('%Y-%m-%d')]
+    if start > 1:
+        cache_key.append(start)
+    if date_restrict:
+        cache_key.append(date_restrict)
+    metrics = run_metrics.get_metrics()
+    cached = cache.get('google', cache_key)
+    if cached is not None:
+        metrics.add('search', cache_hits=1)
+        return cached
+
+    policy = retry_policy.get_policy()
+
+    # Stays -1 (no attempts) if max_retries is 0
+    attempt = -1
     for attempt in range(max_retries):
+        if not policy.allow('google'):
+            print(f"  ✗ Google Search circuit open, skipping query '{query[:50]}...'")
+            return []
+
+        if limiter is not None:
+            limiter.acquire()
+
         try:
-            response = requests.get(url, params=params, timeout=30)
+            response = http_clients.get_session().get(url, params=params)
+            metrics.add('search', requests=1, bytes_out=len(response.request.url), bytes_in=len(response.content))
             response.raise_for_status()
 
             data = response.json()
@@ -180,106 +351,564 @@ def fetch_google_results(
                     'snippet': item.get('snippet', '')
                 })
 
+            policy.record_success('google')
+            cache.set('google', cache_key, results)
             return results
 
         except requests.exceptions.RequestException as e:
             print(f"  ⚠ Attempt {attempt + 1}/{max_retries} failed for query '{query[:50]}...': {e}")
+            policy.record_failure('google', e)
 
-            if attempt < max_retries - 1:
-                # Wait before retry (exponential backoff)
-                wait_time = 2 ** attempt
-                time.sleep(wait_time)
+            # Backoff with jitter, or exactly the server's Retry-After
+            if attempt < max_retries - 1 and policy.wait(attempt, e, 'google'):
+                metrics.add('search', retries=1)
             else:
-                print(f"  ✗ Failed to fetch results for query '{query[:50]}...' after {max_retries} attempts")
-                return []
+                break
 
+    print(f"  ✗ Failed to fetch results for query '{query[:50]}...' after {attempt + 1} attempts")
     return []
 
 
+def fetch_google_results(
+    query: str,
+    api_key: str,
+    search_engine_id: str,
+    num_results: int = 10,
+    max_retries: int = 3,
+    limiter: Optional[TokenBucket] = None,
+    is_known: Optional[Callable[[str], bool]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    pages_in_flight: int = 2
+) -> List[Dict[str, Any]]:
+    """
+    Fetch up to `num_results` results for a query, paging through `start`
+
+    The first page is fetched on its own; the following pages are fetched
+    `pages_in_flight` at a time and examined in order. Paging stops at the
+    first page that comes back short (no more results) or brings no new
+    links, i.e. every link is known to `is_known` (the event store), was on
+    an earlier page, or was returned for this query on an earlier run
+    (query watermarks); and before each batch once `should_stop()` says
+    the run has enough results.
+
+    Args:
+        query: Search query string
+        api_key: Google API key
+        search_engine_id: Custom Search Engine ID
+        num_results: Number of results wanted (at most 100)
+        max_retries: Number of retry attempts per request
+        limiter: Rate limiter to acquire() before each request (optional)
+        is_known: Returns True for links already in the event store (optional)
+        should_stop: Returns True once no more results are needed (optional)
+        pages_in_flight: Pages fetched concurrently after the first
+
+    Returns:
+        list: Results not returned for this query on earlier runs, in page order
+    """
+    num_results = max(0, min(num_results, GOOGLE_MAX_RESULTS))
+    starts = list(range(1, num_results + 1, GOOGLE_PAGE_SIZE))
+    watermarks = query_watermarks.get_watermarks()
+    seen_links: Set[str] = set()
+    results: List[Dict[str, Any]] = []
+
+    def fetch(start: int) -> List[Dict[str, Any]]:
+        num = min(GOOGLE_PAGE_SIZE, num_results - start + 1)
+        return fetch_google_page(query, api_key, search_engine_id, start, num, max_retries, limiter)
+
+    def take(start: int, page: List[Dict[str, Any]]) -> bool:
+        """Keep a page's results; False if paging should stop here"""
+        # Pages fetched concurrently can overlap; keep each link once per query
+        fresh = [result for result in watermarks.filter_new(query, page) if result['link'] not in seen_links]
+        seen_links.update(result['link'] for result in page)
+        new_links = [result['link'] for result in fresh if not (is_known and is_known(result['link']))]
+        results.extend(fresh)
+        return bool(new_links) and len(page) >= min(GOOGLE_PAGE_SIZE, num_results - start + 1)
+
+    if not starts or not take(1, fetch(1)) or len(starts) == 1:
+        return results
+
+    with ThreadPoolExecutor(max_workers=max(1, pages_in_flight)) as executor:
+        for i in range(1, len(starts), max(1, pages_in_flight)):
+            if should_stop is not None and should_stop():
+                break
+            window = starts[i:i + max(1, pages_in_flight)]
+            for start, page in zip(window, executor.map(fetch, window)):
+                if not take(start, page):
+                    return results
+
+    return results
+
+
+# Set in location worker processes (see run_locations) to the parent's bucket
+_shared_search_limiter: Optional[SharedTokenBucket] = None
+
+
+def make_search_limiter(google_config: Dict[str, Any], max_workers: int) -> TokenBucket:
+    """
+    Rate limiter for Google requests: the shared one in a location worker, else a new one
+
+    Args:
+        google_config: The "google_config" section
+        max_workers: Search concurrency, the default burst
+
+    Returns:
+        TokenBucket: Limiter to acquire() before each request
+    """
+    if _shared_search_limiter is not None:
+        return _shared_search_limiter
+    return TokenBucket(
+        rate=google_config.get('requests_per_second', 5.0),
+        capacity=google_config.get('burst', max_workers)
+    )
+
+
 def fetch_all_search_results(
     queries: List[str],
     api_key: str,
     search_engine_id: str,
-    config: Dict[str, Any]
+    config: Dict[str, Any],
+    is_known: Optional[Callable[[str], bool]] = None
 ) -> List[Dict[str, Any]]:
     """
-    Fetch results for all queries with rate limiting
+    Fetch results for all queries with bounded concurrency and rate limiting
+
+    Queries are dispatched to a thread pool of `google_config.max_workers`
+    workers, throttled by a token bucket of `google_config.requests_per_second`
+    (burst `google_config.burst`). Queries wanting more than 10 results
+    (`google_config.results_per_query`) page through them, up to
+    `google_config.pages_in_flight` pages at a time, until a page brings no
+    new links. Results are combined in query order, so the output is the
+    same as a sequential run regardless of completion order.
 
     Args:
         queries: List of search queries
         api_key: Google API key
         search_engine_id: Custom Search Engine ID
         config: Configuration dictionary
+        is_known: Returns True for links already in the event store (optional)
 
     Returns:
         list: Combined list of all search results
     """
-    all_results = []
-    results_per_query = config['google_config']['results_per_query']
-    total_limit = config['google_config'].get('total_results_limit', 50)
+    google_config = config['google_config']
+    results_per_query = google_config['results_per_query']
+    total_limit = google_config.get('total_results_limit', 50)
+    max_workers = max(1, google_config.get('max_workers', 5))
+    limiter = make_search_limiter(google_config, max_workers)
+
+    print(f"\n🔍 Fetching search results from Google ({max_workers} workers)...")
+
+    per_query: Dict[int, List[Dict[str, Any]]] = {}
+    fetched_count = 0
+    state_lock = threading.Lock()
+    limit_reached = threading.Event()
 
-    print(f"\n🔍 Fetching search results from Google...")
+    def run_query(index: int, query: str):
+        # Queries still queued when the limit is hit are skipped entirely
+        if limit_reached.is_set():
+            return
 
-    for i, query in enumerate(queries, 1):
-        print(f"  [{i}/{len(queries)}] Querying: {query[:60]}...")
+        print(f"  [{index + 1}/{len(queries)}] Querying: {query[:60]}...")
 
         results = fetch_google_results(
             query=query,
             api_key=api_key,
             search_engine_id=search_engine_id,
             num_results=results_per_query,
-            max_retries=config['openai_config']['max_retries']
+            max_retries=config['openai_config']['max_retries'],
+            limiter=limiter,
+            is_known=is_known,
+            should_stop=limit_reached.is_set,
+            pages_in_flight=google_config.get('pages_in_flight', 2)
         )
 
-        all_results.extend(results)
+        nonlocal fetched_count
+        with state_lock:
+            per_query[index] = results
+            fetched_count += len(results)
+            if fetched_count >= total_limit:
+                limit_reached.set()
 
-        # Respect API rate limits (slight delay between requests)
-        if i < len(queries):
-            time.sleep(0.5)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_query, i, query) for i, query in enumerate(queries)]
+        for future in futures:
+            future.result()
 
-        # Stop if we've hit the total limit
+    # Combine in query order, stopping at the same point a sequential run would
+    all_results = []
+    for i in range(len(queries)):
+        if i not in per_query:
+            break
+        all_results.extend(per_query[i])
         if len(all_results) >= total_limit:
+            all_results = all_results[:total_limit]
             print(f"  ℹ Reached total results limit ({total_limit}), stopping")
             break
 
+    skipped = query_watermarks.get_watermarks().skipped
+    if skipped:
+        print(f"  ℹ Skipped {skipped} results already returned on earlier runs")
     print(f"✓ Fetched {len(all_results)} total search results\n")
     return all_results
 
 
+# ============================================================================
+# Search Result Prefiltering
+# ============================================================================
+
+# Topic vocabulary for the default categories; other categories match on their
+# own name. Extend or override with prefilter_config.keywords. Terms that turn
+# up on almost any page ("event", "news", "open", "live", "show", and "art",
+# which as a prefix also matches "article") are left out, or nothing would
+# ever count as off-topic.
+CATEGORY_KEYWORDS = {
+    'Culture': ['artist', 'artwork', 'mural', 'museum', 'gallery', 'exhibit', 'theater', 'theatre',
+                'music', 'library', 'history', 'heritage', 'cultur'],
+    'Community': ['community', 'volunteer', 'park', 'school', 'church', 'neighborhood', 'resident',
+                  'fundraiser', 'charity', 'parade'],
+    'News': ['police', 'fire', 'crash', 'accident', 'arrest', 'weather', 'closure', 'emergency',
+             'investigat'],
+    'Food': ['restaurant', 'food', 'dining', 'cafe', 'bakery', 'brew', 'menu', 'chef', 'pizza',
+             'grill', 'tasting', 'farmers market'],
+    'Entertainment': ['concert', 'movie', 'comedy', 'festival', 'ticket', 'performance',
+                      'nightlife', 'band'],
+    'Business': ['business', 'store', 'shop', 'company', 'hiring', 'jobs', 'grand opening',
+                 'chamber', 'retail', 'expan'],
+    'Manufacturing': ['manufactur', 'factory', 'plant', 'industr', 'warehouse', 'production',
+                      'facility', 'distribution'],
+    'Politics': ['council', 'board', 'mayor', 'trustee', 'election', 'vote', 'ordinance',
+                 'government', 'senator', 'legislat', 'candidate'],
+    'Economy': ['econom', 'budget', 'tax', 'development', 'investment', 'grant', 'housing',
+                'real estate', 'unemployment']
+}
+
+
+def keyword_pattern(terms: Iterable[str]) -> Optional[re.Pattern]:
+    """
+    Compile terms into one case-insensitive pattern matching them as word prefixes
+
+    Args:
+        terms: Keywords or phrases ("brew" also matches "brewery", "brews")
+
+    Returns:
+        re.Pattern: Pattern whose matches are the terms found, None if no terms
+    """
+    terms = sorted({term.lower().strip() for term in terms if term.strip()}, key=len, reverse=True)
+    if not terms:
+        return None
+    return re.compile(r'\b(' + '|'.join(re.escape(term) for term in terms) + r')\w*', re.IGNORECASE)
+
+
+class ResultPrefilter:
+    """
+    Local filter that drops search results not worth an LLM call
+
+    Applied between search and analysis, in this order:
+
+    1. Already stored: the link (or its canonical form) is already in the
+       event store from a previous run
+    2. Off-topic: fewer than `prefilter_config.min_relevance` distinct
+       category keywords in the title/snippet. Place names don't count:
+       every query already names the city, so nearly every result has one
+    3. Near-duplicate: title + snippet near-identical to a result already
+       kept in this run (syndicated stories, the same page under different
+       URLs)
+
+    Settings come from the optional "prefilter_config" section:
+
+        "prefilter_config": {
+            "enabled": true,
+            "skip_stored_links": true,
+            "dedupe_snippets": true,
+            "min_relevance": 1,
+            "keywords": {"Food": ["taqueria", "food truck"]}
+        }
+
+    With skip_stored_links, a result whose link is already stored never
+    reaches merge_events(), so changes to a stored event (new details, a
+    moved date) are not picked up; set it to false to re-analyze them.
+
+    filter() keeps its state between calls, so results can be fed in as
+    they arrive (see the async pipeline).
+    """
+
+    def __init__(self, events_dict: Dict[str, List[Dict[str, Any]]], config: Dict[str, Any]):
+        prefilter_config = config.get('prefilter_config', {})
+        self.enabled = prefilter_config.get('enabled', True)
+        self.skip_stored_links = prefilter_config.get('skip_stored_links', True)
+        self.dedupe_snippets = prefilter_config.get('dedupe_snippets', True)
+        self.min_relevance = prefilter_config.get('min_relevance', 1)
+        self.events_dict = events_dict
+
+        keywords = prefilter_config.get('keywords', {})
+        topic_terms = []
+        for category in config['categories']:
+            topic_terms.extend(CATEGORY_KEYWORDS.get(category, [category]))
+            topic_terms.extend(keywords.get(category, []))
+        self.topic_pattern = keyword_pattern(topic_terms)
+
+        self.seen = near_duplicates.NearDuplicateIndex()
+        self.seen_shingles: Dict[str, Set[str]] = {}
+        self.counts = {'input': 0, 'kept': 0, 'stored': 0, 'duplicate': 0, 'off_topic': 0}
+
+    def relevance(self, result: Dict[str, Any]) -> int:
+        """Number of distinct topic keywords in a result's title and snippet"""
+        if self.topic_pattern is None:
+            return 0
+        text = f"{result.get('title', '')} {result.get('snippet', '')}"
+        return len({match.lower() for match in self.topic_pattern.findall(text)})
+
+    def is_stored(self, link: str) -> bool:
+        """True if the link, exactly or in canonical form, is already in the event store"""
+        if not isinstance(self.events_dict, IndexedEvents):
+            return find_duplicate_by_link(self.events_dict, link) is not None
+        if link in self.events_dict.link_index:
+            return True
+        if not near_duplicates.enabled():
+            return False
+        same_page = self.events_dict.near_duplicates.same_page(link)
+        return same_page is not None and same_page in self.events_dict.link_index
+
+    def is_known(self, link: str) -> bool:
+        """True if the link is stored and filter() would skip it, so paging can treat it as old"""
+        return self.enabled and self.skip_stored_links and self.is_stored(link)
+
+    def is_duplicate(self, result: Dict[str, Any]) -> bool:
+        """True if a near-identical result was already kept; otherwise remembers this one"""
+        link = result['link']
+        if self.seen.same_page(link) is not None:
+            return True
+
+        text = {'title': result.get('title', ''), 'description': result.get('snippet', '')}
+        result_shingles = near_duplicates.shingles(text)
+        bands = near_duplicates.band_hashes(result_shingles)
+        threshold = near_duplicates.similarity_threshold()
+        for key in self.seen.candidates(bands):
+            if near_duplicates.jaccard(result_shingles, self.seen_shingles[key]) >= threshold:
+                return True
+
+        self.seen.add(link, {'link': link}, bands)
+        self.seen_shingles[link] = result_shingles
+        return False
+
+    def filter(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Drop stored, duplicate and off-topic results
+
+        Args:
+            results: Search results (title, link, snippet)
+
+        Returns:
+            list: Results worth analyzing, in their original order
+        """
+        self.counts['input'] += len(results)
+        if not self.enabled:
+            self.counts['kept'] += len(results)
+            return results
+
+        kept = []
+        dropped = []
+        for result in results:
+            if self.skip_stored_links and self.is_stored(result['link']):
+                self.counts['stored'] += 1
+            elif self.relevance(result) < self.min_relevance:
+                self.counts['off_topic'] += 1
+            elif self.dedupe_snippets and self.is_duplicate(result):
+                self.counts['duplicate'] += 1
+            else:
+                kept.append(result)
+                continue
+            dropped.append(result)
+
+        query_watermarks.get_watermarks().mark_passed_over(dropped)
+        self.counts['kept'] += len(kept)
+        return kept
+
+    def summary(self) -> str:
+        counts = self.counts
+        return (f"Prefilter kept {counts['kept']} of {counts['input']} results "
+                f"({counts['stored']} already stored, {counts['duplicate']} near-duplicates, "
+                f"{counts['off_topic']} off-topic)")
+
+
+# ============================================================================
+# Streaming Completions
+# ============================================================================
+
+def stream_openai_text(client, **kwargs) -> Iterator[str]:
+    """
+    Yield content deltas from a streamed OpenAI chat completion
+
+    Token usage from the final chunk is recorded under the "llm_openai" stage.
+
+    Args:
+        client: OpenAI client
+        **kwargs: Arguments for chat.completions.create (stream is added)
+
+    Yields:
+        str: Each non-empty content delta
+    """
+    stream = client.chat.completions.create(stream=True, stream_options={'include_usage': True}, **kwargs)
+    for chunk in stream:
+        if chunk.usage:
+            run_metrics.get_metrics().add_usage(
+                'llm_openai', kwargs['model'], chunk.usage.prompt_tokens, chunk.usage.completion_tokens
+            )
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+def stream_xai_text(response: requests.Response, model: str) -> Iterator[str]:
+    """
+    Yield content deltas from an X.AI server-sent events response
+
+    Token usage, when the stream reports it, is recorded under the "llm_xai" stage.
+
+    Args:
+        response: Streaming response from the chat completions endpoint
+        model: Model name the usage is billed against
+
+    Yields:
+        str: Each non-empty content delta
+    """
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith('data:'):
+            continue
+        data = line[len('data:'):].strip()
+        if data == '[DONE]':
+            break
+        event = json.loads(data)
+        if event.get('usage'):
+            run_metrics.get_metrics().add_usage(
+                'llm_xai', model, event['usage'].get('prompt_tokens', 0), event['usage'].get('completion_tokens', 0)
+            )
+        choices = event.get('choices') or [{}]
+        delta = choices[0].get('delta', {}).get('content')
+        if delta:
+            yield delta
+
+
+def extract_streamed_events(pieces: Iterable[str], source: str) -> Tuple[List[Any], str, bool]:
+    """
+    Collect array elements from a streamed completion as they arrive
+
+    Elements that fail to decode are skipped, and if the stream breaks off
+    the elements received so far are kept. Only a stream that yields no
+    elements at all counts as a failure (and is retried by the caller).
+
+    Args:
+        pieces: Completion text chunks
+        source: Name used in progress messages
+
+    Returns:
+        tuple: (elements, raw text, clean) where clean means the array was
+            complete with no malformed elements
+
+    Raises:
+        json.JSONDecodeError: If no usable elements were received
+    """
+    parser = JSONArrayStreamParser()
+    items = []
+
+    try:
+        for item in iter_json_array_items(pieces, parser):
+            items.append(item)
+    except Exception as e:
+        if not items:
+            raise
+        print(f"  ⚠ {source} stream broke off ({e}), keeping {len(items)} events received")
+
+    clean = parser.complete and not parser.errors
+    if not clean:
+        if not items:
+            raise json.JSONDecodeError("No complete array elements in streamed response", parser.text, 0)
+        print(f"  ⚠ {source} response was {'partly corrupt' if parser.complete else 'truncated'}: "
+              f"kept {len(items)} events, skipped {parser.errors} malformed")
+
+    return items, parser.text, clean
+
+
 # ============================================================================
 # OpenAI API Integration
 # ============================================================================
 
-def analyze_with_openai(
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count for budgeting prompts (~4 characters per token)
+
+    Args:
+        text: Prompt text
+
+    Returns:
+        int: Estimated number of tokens
+    """
+    return len(text) // 4 + 1
+
+
+def format_search_result(result: Dict[str, Any]) -> str:
+    """Format one search result the way it appears in the analysis prompt"""
+    return f"Title: {result['title']}\nURL: {result['link']}\nSnippet: {result['snippet']}"
+
+
+def chunk_results_by_tokens(results: List[Dict[str, Any]], max_tokens: int) -> List[List[Dict[str, Any]]]:
+    """
+    Split search results into consecutive chunks that fit a token budget
+
+    A single result larger than the budget still gets a chunk of its own.
+
+    Args:
+        results: List of search results
+        max_tokens: Token budget for the search results of one prompt
+
+    Returns:
+        list: List of result chunks, in the original order
+    """
+    chunks = []
+    current: List[Dict[str, Any]] = []
+    current_tokens = 0
+
+    for result in results:
+        tokens = estimate_tokens(format_search_result(result))
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(current)
+            current = []
+            current_tokens = 0
+        current.append(result)
+        current_tokens += tokens
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def analyze_chunk_with_openai(
     results: List[Dict[str, Any]],
     current_date: str,
     api_key: str,
-    config: Dict[str, Any]
+    config: Dict[str, Any],
+    label: str = ""
 ) -> List[Dict[str, Any]]:
     """
-    Send search results to OpenAI for event extraction and analysis
+    Send one chunk of search results to OpenAI for event extraction
+
+    The chunk is marked as analyzed (or failed) in the query watermarks,
+    so only successfully analyzed links are remembered as seen.
 
     Args:
-        results: List of Google search results
+        results: Chunk of Google search results
         current_date: Current date in YYYY-MM-DD format
         api_key: OpenAI API key
         config: Configuration dictionary
+        label: Prefix for progress messages (e.g. "[chunk 2/5]")
 
     Returns:
         list: List of extracted events
     """
-    if not results:
-        print("⚠ No search results to analyze")
-        return []
-
     # Prepare the prompt
     categories_list = ', '.join(config['categories'])
 
     # Format search results for prompt
-    results_text = "\n\n".join([
-        f"Title: {r['title']}\nURL: {r['link']}\nSnippet: {r['snippet']}"
-        for r in results[:50]  # Limit to 50 results to stay within token limits
-    ])
+    results_text = "\n\n".join([format_search_result(r) for r in results])
 
     prompt = f"""Current date: {current_date}
 
@@ -302,48 +931,99 @@ Return JSON array of events:"""
 
     model = config['openai_config']['model']
     max_retries = config['openai_config']['max_retries']
-    retry_delay = config['openai_config']['retry_delay_seconds']
+    stream = config['openai_config'].get('stream', False)
+
+    messages = [
+        {
+            "role": "system",
+            "content": "You are a helpful assistant that extracts structured event data from search results. Always return valid JSON arrays."
+        },
+        {
+            "role": "user",
+            "content": prompt
+        }
+    ]
+
+    # Identical prompts reuse the cached completion
+    cache = response_cache.get_cache()
+    cache_key = {'model': model, 'messages': messages, 'temperature': 0.3, 'max_tokens': 4000}
 
-    print(f"🤖 Analyzing results with OpenAI ({model})...")
+    metrics = run_metrics.get_metrics()
+    policy = retry_policy.get_policy()
 
+    # Stays -1 (no attempts) if max_retries is 0
+    attempt = -1
     for attempt in range(max_retries):
         try:
-            # Using the official OpenAI library
-            from openai import OpenAI
-            client = OpenAI(api_key=api_key)
-
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful assistant that extracts structured event data from search results. Always return valid JSON arrays."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=4000
-            )
-
-            # Parse the response
-            content = response.choices[0].message.content.strip()
-
-            # Remove markdown code blocks if present
-            if content.startswith('```'):
-                content = content.split('```')[1]
-                if content.startswith('json'):
-                    content = content[4:]
-                content = content.strip()
-
-            # Parse JSON
-            events = json.loads(content)
+            content = cache.get('openai', cache_key)
+            from_cache = content is not None
+            cacheable = not from_cache
+
+            if from_cache:
+                metrics.add('llm_openai', cache_hits=1)
+            elif not policy.allow('openai'):
+                print(f"  {label} ✗ OpenAI circuit open, skipping chunk")
+                query_watermarks.get_watermarks().mark_failed(results)
+                return []
+            else:
+                metrics.add('llm_openai', requests=1, bytes_out=len(json.dumps(messages)))
 
-            # Validate structure
-            if not isinstance(events, list):
-                raise ValueError("OpenAI did not return a list")
+            if stream:
+                # Parse array elements as they arrive; a truncated or partly
+                # corrupt completion still gives up its good elements
+                if from_cache:
+                    pieces: Iterable[str] = [content]
+                else:
+                    pieces = stream_openai_text(
+                        http_clients.get_openai_client(api_key, max_retries=0),
+                        model=model,
+                        messages=messages,
+                        temperature=0.3,
+                        max_tokens=4000
+                    )
+                events, raw_content, clean = extract_streamed_events(pieces, f"{label} OpenAI".strip())
+                cacheable = cacheable and clean
+            else:
+                if not from_cache:
+                    # Shared client keeps its connection pool across calls and retries;
+                    # the retry policy above does the retrying, not the SDK
+                    client = http_clients.get_openai_client(api_key, max_retries=0)
+
+                    response = client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        temperature=0.3,
+                        max_tokens=4000
+                    )
+
+                    if response.usage:
+                        metrics.add_usage(
+                            'llm_openai', model, response.usage.prompt_tokens, response.usage.completion_tokens
+                        )
+
+                    # Parse the response
+                    content = response.choices[0].message.content.strip()
+                raw_content = content
+
+                # Remove markdown code blocks if present
+                if content.startswith('```'):
+                    content = content.split('```')[1]
+                    if content.startswith('json'):
+                        content = content[4:]
+                    content = content.strip()
+
+                # Parse JSON
+                events = json.loads(content)
+
+                # Validate structure
+                if not isinstance(events, list):
+                    raise ValueError("OpenAI did not return a list")
+
+            if not from_cache:
+                policy.record_success('openai')
+                metrics.add('llm_openai', bytes_in=len(raw_content.encode('utf-8')))
+            if cacheable:
+                cache.set('openai', cache_key, raw_content)
 
             # Validate each event has required fields
             required_fields = ['category', 'title', 'description', 'link', 'tags', 'event_date']
@@ -357,111 +1037,798 @@ Return JSON array of events:"""
                 else:
                     print(f"  ⚠ Skipping invalid event (missing fields): {event.get('title', 'N/A')}")
 
-            print(f"✓ Extracted {len(validated_events)} valid events from {len(results)} search results\n")
+            print(f"  {label} ✓ Extracted {len(validated_events)} valid events from {len(results)} search results")
+            query_watermarks.get_watermarks().mark_analyzed(results)
             return validated_events
 
         except json.JSONDecodeError as e:
-            print(f"  ⚠ Attempt {attempt + 1}/{max_retries} - JSON parse error: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay)
+            print(f"  {label} ⚠ Attempt {attempt + 1}/{max_retries} - JSON parse error: {e}")
+            policy.record_failure('openai', e)
+            if attempt < max_retries - 1 and policy.wait(attempt, e, 'openai'):
+                metrics.add('llm_openai', retries=1)
+            else:
+                break
 
         except Exception as e:
-            print(f"  ⚠ Attempt {attempt + 1}/{max_retries} - OpenAI API error: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay)
+            print(f"  {label} ⚠ Attempt {attempt + 1}/{max_retries} - OpenAI API error: {e}")
+            policy.record_failure('openai', e)
+            if attempt < max_retries - 1 and policy.wait(attempt, e, 'openai'):
+                metrics.add('llm_openai', retries=1)
+            else:
+                break
 
-    print(f"✗ Failed to analyze results after {max_retries} attempts\n")
+    print(f"  {label} ✗ Failed to analyze results after {attempt + 1} attempts")
+    query_watermarks.get_watermarks().mark_failed(results)
     return []
 
 
-# ============================================================================
-# Events JSON Management
-# ============================================================================
-
-def load_events_json() -> Dict[str, List[Dict[str, Any]]]:
+def dedupe_events_by_link(event_lists: Iterable[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
     """
-    Load existing events.json file
+    Concatenate event lists in order, keeping the first event seen for each link
+
+    Args:
+        event_lists: Per-chunk or per-city event lists
 
     Returns:
-        dict: Events dictionary (date -> list of events)
+        list: Unique events
     """
-    events_path = Path(__file__).parent.parent / '_data' / 'events.json'
-
-    if events_path.exists():
-        with open(events_path, 'r', encoding='utf-8') as f:
-            events = json.load(f)
-        print(f"✓ Loaded existing events.json ({len(events)} dates)")
-        return events
-    else:
-        print("ℹ events.json doesn't exist yet, will create new file")
-        return {}
+    events = []
+    seen_links = set()
+    for event_list in event_lists:
+        for event in event_list:
+            if event['link'] in seen_links:
+                continue
+            seen_links.add(event['link'])
+            events.append(event)
+    return events
 
 
-def find_duplicate_by_link(events_dict: Dict[str, List[Dict[str, Any]]], link: str) -> Optional[tuple]:
+def analyze_with_openai(
+    results: List[Dict[str, Any]],
+    current_date: str,
+    api_key: str,
+    config: Dict[str, Any]
+) -> List[Dict[str, Any]]:
     """
-    Find an event by link across all dates
+    Send search results to OpenAI for event extraction and analysis
+
+    Results are split into chunks of at most `openai_config.chunk_token_budget`
+    estimated tokens, analyzed concurrently (up to
+    `openai_config.max_concurrent_requests` at a time), and the per-chunk
+    events are merged in order and deduplicated by link.
 
     Args:
-        events_dict: Events dictionary
-        link: URL to search for
+        results: List of Google search results
+        current_date: Current date in YYYY-MM-DD format
+        api_key: OpenAI API key
+        config: Configuration dictionary
 
     Returns:
-        tuple: (date, event_index) if found, None otherwise
+        list: List of extracted events
     """
-    for date, events_list in events_dict.items():
-        for idx, event in enumerate(events_list):
-            if event.get('link') == link:
-                return (date, idx)
-    return None
-
+    if not results:
+        print("⚠ No search results to analyze")
+        return []
 
-def merge_events(
-    events_dict: Dict[str, List[Dict[str, Any]]],
-    new_events: List[Dict[str, Any]],
-    current_date: str
-) -> Dict[str, List[Dict[str, Any]]]:
-    """
-    Merge new events into existing events dictionary
-    Updates duplicates (by link) or adds new events
+    openai_config = config['openai_config']
+    chunks = chunk_results_by_tokens(results, openai_config.get('chunk_token_budget', 6000))
+    max_workers = max(1, min(len(chunks), openai_config.get('max_concurrent_requests', 8)))
 
-    Args:
-        events_dict: Existing events dictionary
-        new_events: List of new events to merge
-        current_date: Current date string
+    print(f"🤖 Analyzing {len(results)} results with OpenAI ({openai_config['model']}) "
+          f"in {len(chunks)} chunk(s), {max_workers} at a time...")
 
-    Returns:
-        dict: Updated events dictionary
-    """
-    updates_count = 0
-    additions_count = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                analyze_chunk_with_openai, chunk, current_date, api_key, config,
+                f"[chunk {i}/{len(chunks)}]"
+            )
+            for i, chunk in enumerate(chunks, 1)
+        ]
+        chunk_events = [future.result() for future in futures]
 
-    for new_event in new_events:
-        link = new_event['link']
-        duplicate = find_duplicate_by_link(events_dict, link)
+    events = dedupe_events_by_link(chunk_events)
 
-        if duplicate:
-            # Update existing event
-            date, idx = duplicate
-            events_dict[date][idx] = new_event
-            updates_count += 1
-        else:
-            # Add new event under found_date
-            found_date = new_event['found_date']
-            if found_date not in events_dict:
-                events_dict[found_date] = []
-            events_dict[found_date].append(new_event)
-            additions_count += 1
+    duplicates = sum(len(chunk) for chunk in chunk_events) - len(events)
+    print(f"✓ Extracted {len(events)} unique events from {len(results)} search results "
+          f"({duplicates} duplicates dropped)\n")
+    return events
 
-    print(f"✓ Merged events: {additions_count} new, {updates_count} updated")
-    return events_dict
 
+# ============================================================================
+# X.AI (Grok) Search Integration
+# ============================================================================
 
-def cleanup_old_events(events_dict: Dict[str, List[Dict[str, Any]]], config: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+def fetch_events_with_xai(
+    location: str,
+    categories: List[str],
+    api_key: str,
+    current_date: str,
+    max_retries: int = 3,
+    label: str = "",
+    stream: bool = False
+) -> List[Dict[str, Any]]:
     """
-    Remove events older than retention period
+    Fetch events using X.AI (Grok) with real-time search capabilities
 
     Args:
-        events_dict: Events dictionary
+        location: Address or location string
+        categories: List of event categories
+        api_key: X.AI API key
+        current_date: Current date in YYYY-MM-DD format
+        max_retries: Maximum retry attempts
+        label: Prefix for progress messages (e.g. "[Gurnee IL]")
+        stream: Consume the completion as server-sent events and parse
+            array elements incrementally
+
+    Returns:
+        list: List of extracted events
+    """
+    prefix = f"{label} " if label else ""
+    print(f"\n🤖 {prefix}Fetching events using X.AI (Grok)...")
+
+    categories_str = ', '.join(categories)
+
+    prompt = f"""Current date: {current_date}
+
+Search and collect all events, incidents, and happenings within 15 miles of: {location}
+
+Categories to include:
+- Social events (community gatherings, festivals, concerts, shows)
+- Crime/Safety incidents (police reports, accidents, safety alerts)
+- Political & Economic news (local government, elections, economic developments)
+- Business updates (new businesses, closures, expansions, job fairs)
+- Manufacturing & Industry (factory news, industrial developments)
+
+Sources: News articles, social media, blogs, forums, municipal reports, event calendars
+
+Requirements:
+- ONLY include events from TODAY ({current_date}) or FUTURE dates
+- Skip past events completely
+- Extract specific dates when available
+- If no specific date mentioned, use "unknown"
+
+Return ONLY a valid JSON array with this exact structure:
+[
+  {{
+    "category": "one of: {categories_str}",
+    "title": "clear, concise event name",
+    "description": "2-3 sentences about the event",
+    "link": "source URL",
+    "tags": ["keyword1", "keyword2", "keyword3"],
+    "event_date": "YYYY-MM-DD or 'unknown'"
+  }}
+]
+
+IMPORTANT: Return ONLY the JSON array. No markdown, no code blocks, no explanations."""
+
+    payload = {
+        'model': 'grok-2-1212',
+        'messages': [
+            {
+                'role': 'system',
+                'content': 'You are a helpful assistant that searches for and extracts local events. Always return valid JSON arrays.'
+            },
+            {
+                'role': 'user',
+                'content': prompt
+            }
+        ],
+        'temperature': 0.3
+    }
+
+    # Identical prompts reuse the cached completion
+    cache = response_cache.get_cache()
+
+    metrics = run_metrics.get_metrics()
+    policy = retry_policy.get_policy()
+
+    # Stays -1 (no attempts) if max_retries is 0
+    attempt = -1
+    for attempt in range(max_retries):
+        try:
+            content = cache.get('xai', payload)
+            from_cache = content is not None
+            cacheable = not from_cache
+
+            if from_cache:
+                metrics.add('llm_xai', cache_hits=1)
+            elif not policy.allow('xai'):
+                print(f"✗ {prefix}X.AI circuit open, skipping\n")
+                return []
+            else:
+                metrics.add('llm_xai', requests=1, bytes_out=len(json.dumps(payload)))
+                response = http_clients.get_session().post(
+                    http_clients.endpoint('xai_chat_url'),
+                    headers={
+                        'Authorization': f'Bearer {api_key}',
+                        'Content-Type': 'application/json'
+                    },
+                    json=dict(payload, stream=True) if stream else payload,
+                    timeout=http_clients.llm_timeout(),
+                    stream=stream
+                )
+
+                response.raise_for_status()
+
+            if stream:
+                # Parse array elements as they arrive; a truncated or partly
+                # corrupt completion still gives up its good elements
+                pieces: Iterable[str] = [content] if from_cache else stream_xai_text(response, payload['model'])
+                events, raw_content, clean = extract_streamed_events(pieces, f"{prefix}X.AI")
+                cacheable = cacheable and clean
+            else:
+                if not from_cache:
+                    result = response.json()
+                    if result.get('usage'):
+                        metrics.add_usage(
+                            'llm_xai', payload['model'],
+                            result['usage'].get('prompt_tokens', 0), result['usage'].get('completion_tokens', 0)
+                        )
+
+                    # Parse the response
+                    content = result['choices'][0]['message']['content'].strip()
+                raw_content = content
+
+                # Remove markdown code blocks if present
+                if content.startswith('```'):
+                    content = content.split('```')[1]
+                    if content.startswith('json'):
+                        content = content[4:]
+                    content = content.strip()
+
+                # Parse JSON
+                events = json.loads(content)
+
+                if not isinstance(events, list):
+                    raise ValueError("X.AI did not return a list")
+
+            if not from_cache:
+                policy.record_success('xai')
+                metrics.add('llm_xai', bytes_in=len(raw_content.encode('utf-8')))
+            if cacheable:
+                cache.set('xai', payload, raw_content)
+
+            # Validate and filter events
+            required_fields = ['category', 'title', 'description', 'link', 'tags', 'event_date']
+            validated_events = []
+
+            for event in events:
+                if all(field in event for field in required_fields):
+                    # Filter out past events
+                    event_date = event.get('event_date', 'unknown')
+                    if event_date != 'unknown' and event_date < current_date:
+                        print(f"  {prefix}⚠ Skipping past event ({event_date}): {event.get('title', 'N/A')}")
+                        continue
+
+                    # If date is unknown, use current_date
+                    if event_date == 'unknown':
+                        event['event_date'] = current_date
+
+                    # Add found_date
+                    event['found_date'] = current_date
+                    validated_events.append(event)
+                else:
+                    print(f"  {prefix}⚠ Skipping invalid event (missing fields): {event.get('title', 'N/A')}")
+
+            print(f"✓ {prefix}Extracted {len(validated_events)} valid events from X.AI\n")
+            return validated_events
+
+        except json.JSONDecodeError as e:
+            print(f"  {prefix}⚠ Attempt {attempt + 1}/{max_retries} - JSON parse error: {e}")
+            policy.record_failure('xai', e)
+            if attempt < max_retries - 1 and policy.wait(attempt, e, 'xai'):
+                metrics.add('llm_xai', retries=1)
+            else:
+                break
+
+        except Exception as e:
+            print(f"  {prefix}⚠ Attempt {attempt + 1}/{max_retries} - X.AI API error: {e}")
+            policy.record_failure('xai', e)
+            if attempt < max_retries - 1 and policy.wait(attempt, e, 'xai'):
+                metrics.add('llm_xai', retries=1)
+            else:
+                break
+
+    print(f"✗ {prefix}Failed to fetch events from X.AI after {attempt + 1} attempts\n")
+    return []
+
+
+def fetch_events_with_xai_per_city(
+    cities: List[str],
+    categories: List[str],
+    api_key: str,
+    current_date: str,
+    config: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """
+    Fetch events from X.AI with one concurrent request per city
+
+    Covers each city in today's group individually instead of one prompt for
+    the whole radius. At most `xai_config.max_concurrent_requests` requests
+    run at once; results are merged in city order and deduplicated by link.
+
+    Args:
+        cities: Cities for today (from get_cities_for_today)
+        categories: List of event categories
+        api_key: X.AI API key
+        current_date: Current date in YYYY-MM-DD format
+        config: Configuration dictionary
+
+    Returns:
+        list: List of extracted events
+    """
+    xai_config = config.get('xai_config', {})
+    max_workers = max(1, min(len(cities), xai_config.get('max_concurrent_requests', 4)))
+    max_retries = config['openai_config']['max_retries']
+
+    print(f"\n🤖 Fetching events from X.AI for {len(cities)} cities, {max_workers} at a time...")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                fetch_events_with_xai, city, categories, api_key, current_date, max_retries,
+                f"[{city}]", xai_config.get('stream', False)
+            )
+            for city in cities
+        ]
+        city_events = [future.result() for future in futures]
+
+    # Neighbouring cities overlap, so keep only the first event per link
+    events = dedupe_events_by_link(city_events)
+
+    print(f"✓ Extracted {len(events)} unique events from X.AI across {len(cities)} cities\n")
+    return events
+
+
+def xai_enabled(config: Dict[str, Any], secrets: Dict[str, Any]) -> bool:
+    """
+    True if X.AI is an extra event source for this run
+
+    It is off unless `xai_config.enabled` is set, so a key in the
+    environment alone never adds a second paid provider to the daily job.
+
+    Args:
+        config: Configuration dictionary
+        secrets: Secrets from load_secrets()
+
+    Returns:
+        bool: Whether to fetch X.AI events
+    """
+    return bool(config.get('xai_config', {}).get('enabled', False) and secrets.get('xai_api_key'))
+
+
+def fetch_xai_events(
+    cities: List[str],
+    api_key: str,
+    current_date: str,
+    config: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """
+    Fetch X.AI events in the configured mode (`xai_config.mode`)
+
+    "per_city" sends one request per city in today's group; anything else
+    sends a single request for the whole configured location.
+
+    Args:
+        cities: Cities for today (from get_cities_for_today)
+        api_key: X.AI API key
+        current_date: Current date in YYYY-MM-DD format
+        config: Configuration dictionary
+
+    Returns:
+        list: List of extracted events
+    """
+    xai_config = config.get('xai_config', {})
+
+    if xai_config.get('mode') == 'per_city':
+        return fetch_events_with_xai_per_city(
+            cities=cities,
+            categories=config['categories'],
+            api_key=api_key,
+            current_date=current_date,
+            config=config
+        )
+
+    return fetch_events_with_xai(
+        location=config['location']['address'],
+        categories=config['categories'],
+        api_key=api_key,
+        current_date=current_date,
+        max_retries=config['openai_config']['max_retries'],
+        stream=xai_config.get('stream', False)
+    )
+
+
+# ============================================================================
+# Events JSON Management
+# ============================================================================
+
+class IndexedEvents(dict):
+    """
+    Events dictionary (date -> list of events) with a link index
+
+    Behaves exactly like the plain dict stored in events.json, but also keeps
+    `link_index` (link -> (date, event_index)) so duplicate lookups are O(1)
+    instead of a scan over every stored event.
+
+    When backed by an event store (sharded JSON or SQLite), only the dates
+    that have been touched are loaded; the link index covers the whole
+    store, and ensure_date() pulls in a date the first time it is needed.
+    A month is loaded in full only once it is marked dirty, since saving
+    rewrites the whole month.
+
+    A near-duplicate index (see near_duplicates.py) is built on first use,
+    from the store's persisted copy when there is one.
+    """
+
+    def __init__(self, *args, store: Union[ShardedEventStore, SQLiteEventStore, None] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.store = store
+        self.loaded_dates: Set[str] = set()
+        self.loaded_months: Set[str] = set()
+        self.dirty_months: Set[str] = set()
+        self.dropped_months: Set[str] = set()
+        # Retention cutoff for the SQLite store, applied when saving
+        self.delete_before: Optional[str] = None
+        self.link_index: Dict[str, tuple] = {}
+        self._near_duplicates: Optional[near_duplicates.NearDuplicateIndex] = None
+        # Prefilter threads can hit the first access concurrently
+        self._near_duplicates_lock = threading.Lock()
+        # Store generation this view was loaded at, and the merges/cleanups applied since
+        self.generation = 0
+        self.operations: List[Dict[str, Any]] = []
+
+        if store is not None:
+            self.generation = store.current_generation()
+            self.link_index = store.load_links()
+        else:
+            self.rebuild_index()
+
+    def rebuild_index(self):
+        """Rebuild the link index from scratch (first occurrence wins)"""
+        self.link_index = {}
+        for date, events_list in self.items():
+            for idx, event in enumerate(events_list):
+                link = event.get('link')
+                if link and link not in self.link_index:
+                    self.link_index[link] = (date, idx)
+        self._near_duplicates = None
+
+    def ensure_date(self, date: str):
+        """Load one date's events if they aren't loaded yet (no-op without a store)"""
+        if self.store is None or date in self.loaded_dates or month_of(date) in self.loaded_months:
+            return
+        events_list = self.store.load_date(date)
+        if events_list is not None:
+            self.setdefault(date, events_list)
+        self.loaded_dates.add(date)
+
+    def ensure_month(self, month: str):
+        """Load every date of a month that isn't loaded yet (no-op without a store)"""
+        if self.store is None or month in self.loaded_months:
+            return
+        for day, events_list in self.store.load_month(month).items():
+            if day not in self.loaded_dates:
+                self.setdefault(day, events_list)
+        self.loaded_months.add(month)
+
+    @property
+    def touched_months(self) -> Set[str]:
+        """Months with at least one loaded date"""
+        return self.loaded_months | {month_of(date) for date in self.loaded_dates}
+
+    def mark_dirty(self, date: str):
+        """Record that the shard holding `date` must be rewritten on save (loading the rest of it)"""
+        month = month_of(date)
+        self.ensure_month(month)
+        self.dirty_months.add(month)
+
+    def event_at(self, location: tuple) -> Optional[Dict[str, Any]]:
+        """Event at a (date, event_index) location, loading its shard if needed"""
+        date, idx = location
+        self.ensure_date(date)
+        events_list = self.get(date, [])
+        return events_list[idx] if idx < len(events_list) else None
+
+    def iter_stored_dates(self) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Every date with its events: the loaded ones as held in memory, the
+        rest read from the store one date at a time without being kept
+        """
+        yield from self.items()
+        if self.store is None:
+            return
+        for month in self.store.months:
+            if month in self.loaded_months:
+                continue
+            for date in self.store.dates_in_month(month):
+                if date not in self.loaded_dates:
+                    yield date, self.store.load_date(date) or []
+
+    def _load_near_duplicates(self) -> near_duplicates.NearDuplicateIndex:
+        """The store's persisted near-duplicate index, or a new one over every stored event"""
+        persisted = self.store.load_near_duplicates() if self.store is not None else None
+        if persisted is not None:
+            # Entries of removed events are dropped by cleanup (per date) or on lookup
+            return near_duplicates.NearDuplicateIndex.from_json(persisted)
+
+        # First run with this index: sign every stored event once
+        index = near_duplicates.NearDuplicateIndex()
+        for date, events_list in self.iter_stored_dates():
+            for idx, event in enumerate(events_list):
+                link = event.get('link')
+                if link and self.link_index.get(link) == (date, idx):
+                    index.add(link, event, date=date)
+        print(f"✓ Built near-duplicate index for {len(index)} events")
+        return index
+
+    @property
+    def near_duplicates(self) -> near_duplicates.NearDuplicateIndex:
+        """Near-duplicate index over every stored event, built on first access"""
+        with self._near_duplicates_lock:
+            if self._near_duplicates is None:
+                self._near_duplicates = self._load_near_duplicates()
+        return self._near_duplicates
+
+    def index_event(self, link: str, event: Dict[str, Any], replaces: Optional[str] = None):
+        """
+        Add or refresh an event in the near-duplicate index
+
+        Args:
+            link: Link the event is stored under
+            event: Event dictionary
+            replaces: Link of the event it overwrote, if any
+        """
+        if not near_duplicates.enabled():
+            return
+        if replaces and replaces != link:
+            self.near_duplicates.remove(replaces)
+        location = self.link_index.get(link)
+        self.near_duplicates.add(link, event, date=location[0] if location else '')
+
+    def unindex_event(self, link: str):
+        """Drop a removed event from the near-duplicate index (no-op if it isn't built)"""
+        if self._near_duplicates is not None:
+            self._near_duplicates.remove(link)
+
+    @property
+    def near_duplicates_built(self) -> bool:
+        """True if the near-duplicate index was built (and may have changed) this run"""
+        return self._near_duplicates is not None
+
+    def find_near_duplicate(self, event: Dict[str, Any]) -> Optional[tuple]:
+        """
+        Find a stored event that is the same as `event` under a different link
+
+        Matches either the same canonical link (tracking parameters, "www.",
+        fragments etc. ignored) or a title/description whose shingle Jaccard
+        similarity reaches the configured threshold. Events with different
+        known event dates never match, so recurring events stay separate.
+
+        Args:
+            event: Event to look up
+
+        Returns:
+            tuple: (date, event_index) of the stored event, None if there is none
+        """
+        if not near_duplicates.enabled():
+            return None
+
+        index = self.near_duplicates
+
+        same_page = index.same_page(event['link'])
+        if same_page is not None:
+            location = self.link_index.get(same_page)
+            if location is not None:
+                return location
+            index.remove(same_page)
+
+        event_shingles = near_duplicates.shingles(event)
+        event_date = event.get('event_date', 'unknown')
+        threshold = near_duplicates.similarity_threshold()
+        best, best_score = None, threshold
+
+        for key in index.candidates(near_duplicates.band_hashes(event_shingles)):
+            location = self.link_index.get(key)
+            existing = self.event_at(location) if location is not None else None
+            if existing is None:
+                index.remove(key)
+                continue
+
+            existing_date = existing.get('event_date', 'unknown')
+            if 'unknown' not in (event_date, existing_date) and event_date != existing_date:
+                continue
+
+            score = near_duplicates.jaccard(event_shingles, near_duplicates.shingles(existing))
+            if score >= best_score:
+                best, best_score = location, score
+
+        return best
+
+
+def open_event_store(config: Optional[Dict[str, Any]] = None) -> Union[ShardedEventStore, SQLiteEventStore]:
+    """
+    Open the event store backend selected by `storage_config.backend`
+
+    "json" (default) keeps per-month JSON shards under _events_store/;
+    "sqlite" keeps one indexed SQLite database (`storage_config.sqlite_path`
+    relative to scripts/, default _events_store/events.sqlite3, which is
+    per location). Either way the site still reads
+    the exported _data/events.json.
+
+    Args:
+        config: Configuration dictionary (optional)
+
+    Returns:
+        ShardedEventStore or SQLiteEventStore: Store with the shared interface
+    """
+    storage_config = (config or {}).get('storage_config', {})
+    backend = storage_config.get('backend', 'json')
+
+    if backend == 'sqlite':
+        if 'sqlite_path' in storage_config:
+            return SQLiteEventStore(BASE_PATH / storage_config['sqlite_path'])
+        return SQLiteEventStore(output_path('_events_store') / 'events.sqlite3')
+    if backend != 'json':
+        raise ValueError(f"Unknown storage backend: {backend}")
+    return ShardedEventStore(output_path('_events_store'))
+
+
+def load_events_json(config: Optional[Dict[str, Any]] = None) -> IndexedEvents:
+    """
+    Load the event store, materializing only today's and yesterday's dates
+
+    Events live in the backend chosen by open_event_store(): per-month
+    shards under _events_store/ (see event_store.py) or a SQLite database
+    (see sqlite_store.py). Only today's and yesterday's dates are read up
+    front, without parsing the rest of their months; other dates are loaded
+    on demand through IndexedEvents.ensure_date(). On first use a backend is
+    filled from the JSON shards or, failing that, from a legacy monolithic
+    _data/events.json.
+
+    Args:
+        config: Configuration dictionary (optional; selects the backend)
+
+    Returns:
+        IndexedEvents: Events dictionary (date -> list of events)
+    """
+    events_path = output_path('_data') / 'events.json'
+    store = open_event_store(config)
+
+    if not store.exists():
+        shards = ShardedEventStore(output_path('_events_store'))
+        if not isinstance(store, ShardedEventStore) and shards.exists():
+            store.import_events(shards.load_all(), shards.load_links())
+            print(f"✓ Migrated {len(store.months)} monthly shards into {type(store).__name__}")
+        elif events_path.exists():
+            with open(events_path, 'r', encoding='utf-8') as f:
+                legacy = IndexedEvents(json.load(f))
+            store.import_events(legacy, legacy.link_index)
+            print(f"✓ Migrated events.json into {len(store.months)} months")
+        else:
+            print("ℹ events.json doesn't exist yet, will create new file")
+
+    if store.journal.exists():
+        with store.lock():
+            # Re-read under the lock: another run may have saved (or already
+            # recovered) the store since it was opened above
+            store = store.reopen()
+            if recover_event_store(store):
+                print("⚠ Completed a save that was interrupted by a previous run")
+
+    events = IndexedEvents(store=store)
+    for days_ago in (0, 1):
+        events.ensure_date((datetime.now() - timedelta(days=days_ago)).strftime('%Y-%m-%d'))
+
+    total_dates = sum(shard['dates'] for shard in store.manifest['shards'].values())
+    print(f"✓ Loaded event store ({len(events)}/{total_dates} dates, {len(events.link_index)} links)")
+    return events
+
+
+def find_duplicate_by_link(events_dict: Dict[str, List[Dict[str, Any]]], link: str) -> Optional[tuple]:
+    """
+    Find an event by link across all dates
+
+    Uses the link index when events_dict is an IndexedEvents, otherwise
+    falls back to scanning every date.
+
+    Args:
+        events_dict: Events dictionary
+        link: URL to search for
+
+    Returns:
+        tuple: (date, event_index) if found, None otherwise
+    """
+    if isinstance(events_dict, IndexedEvents):
+        return events_dict.link_index.get(link)
+
+    for date, events_list in events_dict.items():
+        for idx, event in enumerate(events_list):
+            if event.get('link') == link:
+                return (date, idx)
+    return None
+
+
+def merge_events(
+    events_dict: Dict[str, List[Dict[str, Any]]],
+    new_events: List[Dict[str, Any]],
+    current_date: str
+) -> IndexedEvents:
+    """
+    Merge new events into existing events dictionary
+    Updates duplicates (by link) or adds new events
+
+    An event that is a near-duplicate of a stored one (same page under a
+    different URL, or the same story from another outlet) is not added;
+    its link is recorded as an alias of the stored event instead.
+
+    Args:
+        events_dict: Existing events dictionary
+        new_events: List of new events to merge
+        current_date: Current date string
+
+    Returns:
+        IndexedEvents: Updated events dictionary with its link index kept current
+    """
+    if not isinstance(events_dict, IndexedEvents):
+        events_dict = IndexedEvents(events_dict)
+    events_dict.operations.append({'op': 'merge', 'events': new_events, 'current_date': current_date})
+
+    updates_count = 0
+    additions_count = 0
+    near_duplicates_count = 0
+
+    for new_event in new_events:
+        link = new_event['link']
+        duplicate = find_duplicate_by_link(events_dict, link)
+
+        if duplicate:
+            # Update existing event
+            date, idx = duplicate
+            events_dict.ensure_date(date)
+            replaced_link = events_dict[date][idx].get('link')
+            events_dict[date][idx] = new_event
+            events_dict.index_event(link, new_event, replaces=replaced_link)
+            events_dict.mark_dirty(date)
+            updates_count += 1
+            continue
+
+        near_duplicate = events_dict.find_near_duplicate(new_event)
+        if near_duplicate:
+            # Same event under another URL: keep the stored one, remember the alias
+            events_dict.link_index[link] = near_duplicate
+            near_duplicates_count += 1
+        else:
+            # Add new event under found_date
+            found_date = new_event['found_date']
+            events_dict.ensure_date(found_date)
+            if found_date not in events_dict:
+                events_dict[found_date] = []
+            events_dict[found_date].append(new_event)
+            events_dict.link_index[link] = (found_date, len(events_dict[found_date]) - 1)
+            events_dict.index_event(link, new_event)
+            events_dict.mark_dirty(found_date)
+            additions_count += 1
+
+    print(f"✓ Merged events: {additions_count} new, {updates_count} updated, "
+          f"{near_duplicates_count} near-duplicates skipped")
+    return events_dict
+
+
+def cleanup_old_events(events_dict: Dict[str, List[Dict[str, Any]]], config: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Remove events older than retention period
+
+    For a store-backed IndexedEvents, months entirely before the cutoff are
+    dropped without being loaded and only the boundary month is trimmed
+    (and only loaded if it still holds dates before the cutoff).
+    The SQLite store deletes everything before the cutoff in one ranged
+    DELETE instead, issued by save_events_json() under the store lock and
+    journaled like the other changes.
+
+    Args:
+        events_dict: Events dictionary
         config: Configuration dictionary
 
     Returns:
@@ -473,54 +1840,230 @@ def cleanup_old_events(events_dict: Dict[str, List[Dict[str, Any]]], config: Dic
     keep_days = config['data_retention']['keep_days']
     cutoff_date = (datetime.now() - timedelta(days=keep_days)).strftime('%Y-%m-%d')
 
+    if isinstance(events_dict, IndexedEvents):
+        events_dict.operations.append({'op': 'cleanup', 'keep_days': keep_days})
+    store = events_dict.store if isinstance(events_dict, IndexedEvents) else None
+    dropped_count = 0
+
+    if isinstance(store, SQLiteEventStore):
+        dropped_count = store.count_dates_before(cutoff_date)
+        events_dict.delete_before = max(events_dict.delete_before or '', cutoff_date)
+        events_dict.link_index.discard_before(cutoff_date)
+        for date in [date for date in events_dict.keys() if date < cutoff_date]:
+            del events_dict[date]
+        if events_dict.near_duplicates_built:
+            events_dict.near_duplicates.discard_before(cutoff_date)
+
+        if dropped_count:
+            print(f"✓ Cleaned up {dropped_count} dates older than {keep_days} days")
+        return events_dict
+
+    if store is not None:
+        # Whole months past the cutoff are dropped without being loaded
+        old_months = store.months_before(cutoff_date) - events_dict.touched_months
+        dropped_count = sum(store.manifest['shards'][month]['dates'] for month in old_months)
+        events_dict.dropped_months |= old_months
+
+        # The boundary month's old dates have to be loaded to be trimmed
+        for date in store.dates_in_month(month_of(cutoff_date)):
+            if date < cutoff_date:
+                events_dict.ensure_date(date)
+
     dates_to_remove = [date for date in events_dict.keys() if date < cutoff_date]
 
     for date in dates_to_remove:
+        if isinstance(events_dict, IndexedEvents):
+            events_dict.mark_dirty(date)
         del events_dict[date]
 
-    if dates_to_remove:
-        print(f"✓ Cleaned up {len(dates_to_remove)} dates older than {keep_days} days")
+    if isinstance(events_dict, IndexedEvents) and isinstance(events_dict.link_index, ShardedLinkIndex):
+        # Stale entries are filtered out while links.json is rewritten, not deleted one by one
+        events_dict.link_index.discard_before(cutoff_date)
+        if events_dict.near_duplicates_built:
+            events_dict.near_duplicates.discard_before(cutoff_date)
+    elif isinstance(events_dict, IndexedEvents):
+        # Only entries pointing at a removed date are stale; a copy of the
+        # link on a kept date (legacy data can hold duplicates) takes over
+        stale_links = {link for link, (date, _) in events_dict.link_index.items() if date < cutoff_date}
+        retained: Dict[str, tuple] = {}
+        if stale_links:
+            for date in sorted(events_dict.keys(), reverse=True):
+                for idx, event in enumerate(events_dict[date]):
+                    if event.get('link') in stale_links:
+                        retained.setdefault(event['link'], (date, idx))
+        for link in stale_links:
+            if link in retained:
+                events_dict.link_index[link] = retained[link]
+            else:
+                del events_dict.link_index[link]
+                events_dict.unindex_event(link)
+
+    removed_count = len(dates_to_remove) + dropped_count
+    if removed_count:
+        print(f"✓ Cleaned up {removed_count} dates older than {keep_days} days")
+
+    return events_dict
+
 
+def replay_operations(events_dict: IndexedEvents, operations: List[Dict[str, Any]]) -> IndexedEvents:
+    """
+    Re-apply this run's merges and cleanups to a freshly loaded store
+
+    Args:
+        events_dict: Events loaded from the current state of the store
+        operations: IndexedEvents.operations of the stale copy
+
+    Returns:
+        IndexedEvents: The events with every operation applied
+    """
+    for operation in operations:
+        if operation['op'] == 'merge':
+            events_dict = merge_events(events_dict, operation['events'], operation['current_date'])
+        elif operation['op'] == 'cleanup':
+            retention = {'data_retention': {'cleanup_enabled': True, 'keep_days': operation['keep_days']}}
+            events_dict = cleanup_old_events(events_dict, retention)
     return events_dict
 
 
-def save_events_json(events_dict: Dict[str, List[Dict[str, Any]]]):
+def write_event_store(events_dict: IndexedEvents) -> bool:
+    """
+    Write a store-backed IndexedEvents' changes (the caller holds the store lock)
+
+    The changes (dirty months in full, dropped months, the SQLite retention
+    cutoff, link index updates) are journaled before any store file is touched and the journal is
+    cleared last, so a save interrupted in between is redone by
+    recover_event_store() on the next load.
+
+    Args:
+        events_dict: Events to save
+
+    Returns:
+        bool: True if _data/events.json was regenerated
+    """
+    store = events_dict.store
+    changed = bool(events_dict.operations)
+    if changed:
+        store.journal.write({
+            'dropped_months': sorted(events_dict.dropped_months),
+            'delete_before': events_dict.delete_before,
+            'months': {
+                month: {date: day for date, day in events_dict.items() if month_of(date) == month}
+                for month in events_dict.dirty_months
+            },
+            'links': events_dict.link_index.pending_changes()
+        })
+
+    store.drop_months(events_dict.dropped_months)
+    store.save_months(events_dict, events_dict.dirty_months)
+    store.save_links(events_dict.link_index)
+    if events_dict.delete_before:
+        store.delete_before(events_dict.delete_before)
+        events_dict.delete_before = None
+    if events_dict.near_duplicates_built:
+        store.save_near_duplicates(events_dict.near_duplicates.to_json())
+    events_dict.dirty_months.clear()
+    events_dict.dropped_months.clear()
+
+    exported = published_output.export_store(store, output_path('_data') / 'events.json')
+    if changed:
+        store.bump_generation()
+        store.journal.clear()
+        events_dict.generation = store.current_generation()
+        events_dict.operations.clear()
+    return exported
+
+
+def recover_event_store(store: Union[ShardedEventStore, SQLiteEventStore]) -> bool:
+    """
+    Redo a save that was interrupted after its journal was written
+
+    Args:
+        store: Event store (the caller holds its lock)
+
+    Returns:
+        bool: True if a journal was found and applied
+    """
+    record = store.journal.read()
+    if record is None:
+        return False
+
+    months = record['months']
+    store.drop_months(record['dropped_months'])
+    store.save_months({date: day for shard in months.values() for date, day in shard.items()}, months)
+    link_index = store.load_links()
+    link_index.restore_changes(record['links'])
+    store.save_links(link_index)
+    if record.get('delete_before'):
+        store.delete_before(record['delete_before'])
+    published_output.export_store(store, output_path('_data') / 'events.json', force=True)
+
+    store.bump_generation()
+    store.journal.clear()
+    return True
+
+
+def save_events_json(events_dict: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
     """
     Save events dictionary to _data/events.json with sorted dates
 
+    A store-backed IndexedEvents writes only its dirty month shards and the
+    link index, then regenerates _data/events.json only if a shard changed.
+    Writes happen under the store's lock; if another run saved the store
+    after these events were loaded, this run's merges and cleanups are
+    replayed onto the newer state instead of overwriting it. Every file is
+    replaced atomically.
+
     Args:
         events_dict: Events dictionary to save
+
+    Returns:
+        dict: The saved events (a reloaded IndexedEvents if merges were replayed)
     """
-    events_path = Path(__file__).parent.parent / '_data' / 'events.json'
+    events_path = output_path('_data') / 'events.json'
+
+    if isinstance(events_dict, IndexedEvents) and events_dict.store is not None:
+        with events_dict.store.lock():
+            store = events_dict.store
+            if events_dict.operations and store.current_generation() != events_dict.generation:
+                print(f"⚠ Event store changed since it was loaded, replaying {len(events_dict.operations)} "
+                      f"operation(s) onto the newer state")
+                events_dict = replay_operations(IndexedEvents(store=store.reopen()), events_dict.operations)
+                store = events_dict.store
+
+            written = len(events_dict.dirty_months)
+            exported = write_event_store(events_dict)
+
+        total_dates = sum(shard['dates'] for shard in store.manifest['shards'].values())
+        total_events = sum(shard['events'] for shard in store.manifest['shards'].values())
+        print(f"✓ Saved event store: {written} shard(s) written, {total_dates} dates, {total_events} total events"
+              f"{' (events.json regenerated)' if exported else ''}")
+        return events_dict
 
     # Sort by date (descending)
     sorted_events = dict(sorted(events_dict.items(), reverse=True))
 
-    with open(events_path, 'w', encoding='utf-8') as f:
-        json.dump(sorted_events, f, indent=2, ensure_ascii=False)
+    published_output.write_json(events_path, sorted_events)
 
     total_events = sum(len(events) for events in sorted_events.values())
     print(f"✓ Saved events.json: {len(sorted_events)} dates, {total_events} total events")
+    return events_dict
 
 
 # ============================================================================
 # Markdown Archive Generation
 # ============================================================================
 
-def create_markdown_for_date(date: str, events: List[Dict[str, Any]]):
+def render_markdown_for_date(date: str, events: List[Dict[str, Any]]) -> str:
     """
-    Create markdown archive file for a specific date
+    Render the markdown archive page for a specific date
 
     Args:
         date: Date string (YYYY-MM-DD)
         events: List of events for this date
-    """
-    md_path = Path(__file__).parent.parent / '_event_archives' / f'{date}.md'
-
-    # Don't overwrite if already exists
-    if md_path.exists():
-        return
 
+    Returns:
+        str: Markdown with Jekyll front matter
+    """
     # Group events by category
     by_category = {}
     for event in events:
@@ -562,81 +2105,685 @@ def create_markdown_for_date(date: str, events: List[Dict[str, Any]]):
             lines.append("---")
             lines.append("")
 
-    # Write file
-    with open(md_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines))
+    return '\n'.join(lines)
+
+
+def create_markdown_for_date(date: str, events: List[Dict[str, Any]], overwrite: bool = False):
+    """
+    Create markdown archive file for a specific date
+
+    Args:
+        date: Date string (YYYY-MM-DD)
+        events: List of events for this date
+        overwrite: Re-render even if the archive file already exists
+    """
+    md_path = output_path('_event_archives') / f'{date}.md'
+
+    # Don't overwrite if already exists
+    if md_path.exists() and not overwrite:
+        return
+
+    with atomic_io.atomic_write(md_path) as f:
+        f.write(render_markdown_for_date(date, events))
 
     print(f"✓ Created markdown archive: {md_path.name}")
 
 
+def events_content_hash(events: List[Dict[str, Any]]) -> str:
+    """
+    Stable hash of a date's events, used to detect archive changes
+
+    Args:
+        events: List of events for one date
+
+    Returns:
+        str: SHA-256 hex digest of the canonical JSON form
+    """
+    canonical = json.dumps(events, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def stored_dates(events_dict: Dict[str, List[Dict[str, Any]]]) -> Set[str]:
+    """
+    Every date in the history, including dates of an event store not loaded into memory
+
+    Args:
+        events_dict: Events dictionary (IndexedEvents or plain dict)
+
+    Returns:
+        set: Dates in YYYY-MM-DD format
+    """
+    dates = set(events_dict.keys())
+    store = getattr(events_dict, 'store', None)
+    if store is not None:
+        for month in store.months:
+            dates.update(store.dates_in_month(month))
+    return dates
+
+
+def update_markdown_archives(events_dict: Dict[str, List[Dict[str, Any]]]) -> int:
+    """
+    Re-render archives only for dates whose events are new or changed
+
+    A manifest of per-date content hashes (_event_archives/.manifest.json)
+    records what each archive was rendered from, so unchanged dates are
+    skipped without touching their files. Dates no longer stored (e.g.
+    removed by cleanup_old_events) are dropped from it.
+
+    Args:
+        events_dict: Events dictionary (only the loaded dates are considered)
+
+    Returns:
+        int: Number of archive files written
+    """
+    archives_path = output_path('_event_archives')
+    manifest_path = archives_path / '.manifest.json'
+
+    manifest: Dict[str, str] = {}
+    if manifest_path.exists():
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    written = 0
+    for date in sorted(events_dict.keys()):
+        content_hash = events_content_hash(events_dict[date])
+        if manifest.get(date) == content_hash and (archives_path / f'{date}.md').exists():
+            continue
+
+        create_markdown_for_date(date, events_dict[date], overwrite=True)
+        manifest[date] = content_hash
+        written += 1
+
+    dates = stored_dates(events_dict)
+    removed = [date for date in manifest if date not in dates]
+    for date in removed:
+        del manifest[date]
+
+    if written or removed:
+        atomic_io.write_json(manifest_path, dict(sorted(manifest.items())), indent=2)
+
+    print(f"✓ Markdown archives: {written} written, {len(events_dict) - written} unchanged")
+    return written
+
+
+def _rebuild_archive(task: Tuple[str, List[Dict[str, Any]], str]) -> Tuple[str, bool, float, str]:
+    """
+    Render one date's archive and write it if the output changed (process pool worker)
+
+    Args:
+        task: (date, events, archives directory)
+
+    Returns:
+        tuple: (date, whether the file was written, render time in seconds,
+                events_content_hash() of the events for the manifest)
+    """
+    date, events, archives_dir = task
+    start = time.perf_counter()
+    content = render_markdown_for_date(date, events).encode('utf-8')
+    render_seconds = time.perf_counter() - start
+
+    md_path = Path(archives_dir) / f'{date}.md'
+    try:
+        existing_hash = hashlib.sha256(md_path.read_bytes()).hexdigest()
+    except OSError:
+        existing_hash = None
+    changed = existing_hash != hashlib.sha256(content).hexdigest()
+    if changed:
+        with atomic_io.atomic_write(md_path, 'wb') as f:
+            f.write(content)
+    return date, changed, render_seconds, events_content_hash(events)
+
+
+def rebuild_markdown_archives(
+    store: Union[ShardedEventStore, SQLiteEventStore],
+    max_workers: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Re-render the archive of every stored date, e.g. after a template change
+
+    Dates are rendered in a process pool. A file is only replaced (atomically)
+    when the hash of the new output differs from the file on disk, so a
+    rebuild that changes nothing writes nothing. The render time of every
+    date is printed, followed by a summary. The content-hash manifest used
+    by update_markdown_archives() is rewritten with exactly the stored dates.
+
+    Args:
+        store: Event store to render from
+        max_workers: Worker processes (default: one per CPU)
+
+    Returns:
+        dict: {'dates', 'written', 'unchanged'} counts
+    """
+    archives_path = output_path('_event_archives')
+    manifest_path = archives_path / '.manifest.json'
+    archives_path.mkdir(parents=True, exist_ok=True)
+
+    # Every stored date is rendered, so the manifest is rebuilt from scratch
+    manifest: Dict[str, str] = {}
+
+    def tasks() -> Iterator[Tuple[str, List[Dict[str, Any]], str]]:
+        for month in sorted(store.months):
+            for date, events in sorted(store.load_month(month).items()):
+                yield date, events, str(archives_path)
+
+    max_workers = max(1, max_workers or os.cpu_count() or 1)
+    print(f"\n🗂  Rebuilding markdown archives in {archives_path} ({max_workers} worker processes)...")
+
+    start = time.perf_counter()
+    timings: List[Tuple[float, str]] = []
+    written = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for date, changed, render_seconds, content_hash in executor.map(_rebuild_archive, tasks(), chunksize=8):
+            manifest[date] = content_hash
+            timings.append((render_seconds, date))
+            written += changed
+            print(f"  {date}  {render_seconds * 1000:8.2f} ms  {'written' if changed else 'unchanged'}")
+    elapsed = time.perf_counter() - start
+
+    atomic_io.write_json(manifest_path, dict(sorted(manifest.items())), indent=2)
+
+    print(f"✓ Rebuilt {len(timings)} archives in {elapsed:.2f}s: {written} written, {len(timings) - written} unchanged")
+    if timings:
+        ordered = sorted(timings)
+        p50 = ordered[len(ordered) // 2][0]
+        p90 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))][0]
+        slowest_seconds, slowest_date = ordered[-1]
+        print(f"ℹ Render time per date: p50 {p50 * 1000:.2f} ms, p90 {p90 * 1000:.2f} ms, "
+              f"max {slowest_seconds * 1000:.2f} ms ({slowest_date})")
+
+    return {'dates': len(timings), 'written': written, 'unchanged': len(timings) - written}
+
+
+def write_run_report(metrics: run_metrics.RunMetrics, config: Dict[str, Any], status: str):
+    """
+    Write the run's stage metrics to _data/run_report.json (next to events.json)
+
+    Args:
+        metrics: Metrics collected during the run
+        config: Configuration dictionary (may be empty if loading failed)
+        status: "success" or an error description
+    """
+    report_path = output_path('_data') / 'run_report.json'
+    pricing = config.get('metrics_config', {}).get('pricing')
+
+    try:
+        report = metrics.write_report(
+            report_path, pricing=pricing, status=status, retry=retry_policy.get_policy().summary()
+        )
+    except OSError as e:
+        print(f"⚠ Could not write run report: {e}")
+        return
+
+    totals = report['totals']
+    cost = f", ${totals['cost_usd']:.4f}" if totals['cost_usd'] is not None else ""
+    print(f"ℹ Run report: {report['wall_seconds']}s, {totals['requests']} requests, "
+          f"{totals['retries']} retries, {totals['prompt_tokens']}+{totals['completion_tokens']} tokens{cost}")
+
+
 # ============================================================================
-# Main Execution
+# Async Pipeline Mode
 # ============================================================================
 
-def main():
-    """Main execution function"""
+async def run_async_pipeline(
+    queries: List[str],
+    cities: List[str],
+    secrets: Dict[str, str],
+    config: Dict[str, Any],
+    current_date: str
+) -> Tuple[IndexedEvents, int]:
+    """
+    Search, analyze and merge as overlapping stages of one asyncio pipeline
+
+    Search results are streamed into a queue as each query completes. A
+    batcher runs them through the ResultPrefilter and cuts them into analysis batches of `openai_config.chunk_token_budget`
+    estimated tokens and starts each batch as soon as it is full, so OpenAI
+    analysis runs while searches are still in flight. Extracted events (and
+    X.AI events, fetched alongside) are merged as they arrive, into a store
+    loaded concurrently with the first searches.
+
+    The blocking API calls run on a thread pool; concurrency is still capped
+    by `google_config.max_workers` and `openai_config.max_concurrent_requests`.
+    Unlike the sequential mode, results count towards `total_results_limit`
+    in completion order rather than query order.
+
+    Args:
+        queries: Search queries
+        cities: Cities for today (for X.AI per-city mode)
+        secrets: API keys from load_secrets()
+        config: Configuration dictionary
+        current_date: Current date in YYYY-MM-DD format
+
+    Returns:
+        tuple: (merged events dictionary, number of unique new events merged)
+    """
+    google_config = config['google_config']
+    openai_config = config['openai_config']
+    total_limit = google_config.get('total_results_limit', 50)
+    search_workers = max(1, google_config.get('max_workers', 5))
+    llm_workers = max(1, openai_config.get('max_concurrent_requests', 8))
+    batch_budget = openai_config.get('chunk_token_budget', 6000)
+    limiter = make_search_limiter(google_config, search_workers)
+
+    print(f"\n🔀 Async pipeline: {search_workers} search workers, {llm_workers} analysis workers")
+
+    loop = asyncio.get_running_loop()
+    results_queue: asyncio.Queue = asyncio.Queue()
+    events_queue: asyncio.Queue = asyncio.Queue()
+    search_slots = asyncio.Semaphore(search_workers)
+    llm_slots = asyncio.Semaphore(llm_workers)
+    fetched_count = 0
+
+    with ThreadPoolExecutor(max_workers=search_workers + llm_workers + 2) as executor:
+
+        def run_blocking(func, *args):
+            return loop.run_in_executor(executor, func, *args)
+
+        # The store is loaded while the first searches are in flight
+        store_loaded = run_blocking(load_events_json, config)
+        prefilter: Optional[ResultPrefilter] = None
+
+        def is_known(link: str) -> bool:
+            # Pages fetched before the store is loaded can't be checked against it
+            return prefilter is not None and prefilter.is_known(link)
+
+        async def search(index: int, query: str):
+            nonlocal fetched_count
+            async with search_slots:
+                # Queries still waiting when the limit is hit are skipped entirely
+                if fetched_count >= total_limit:
+                    return
+                print(f"  [{index + 1}/{len(queries)}] Querying: {query[:60]}...")
+                results = await run_blocking(
+                    fetch_google_results, query, secrets['google_api_key'], secrets['google_search_engine_id'],
+                    google_config['results_per_query'], openai_config['max_retries'], limiter,
+                    is_known, lambda: fetched_count >= total_limit, google_config.get('pages_in_flight', 2)
+                )
+
+            results = results[:max(0, total_limit - fetched_count)]
+            fetched_count += len(results)
+            if results:
+                await results_queue.put(results)
+
+        async def search_all():
+            await asyncio.gather(*(search(i, query) for i, query in enumerate(queries)))
+            await results_queue.put(None)
+
+        async def analyze(batch: List[Dict[str, Any]], number: int):
+            async with llm_slots:
+                events = await run_blocking(
+                    analyze_chunk_with_openai, batch, current_date, secrets['openai_api_key'], config,
+                    f"[batch {number}]"
+                )
+            await events_queue.put(events)
+
+        async def batch_results():
+            batch: List[Dict[str, Any]] = []
+            batch_tokens = 0
+            tasks = []
+            nonlocal prefilter
+            prefilter = ResultPrefilter(await store_loaded, config)
+
+            while True:
+                results = await results_queue.get()
+                if results is None:
+                    break
+                for result in prefilter.filter(results):
+                    tokens = estimate_tokens(format_search_result(result))
+                    if batch and batch_tokens + tokens > batch_budget:
+                        tasks.append(asyncio.ensure_future(analyze(batch, len(tasks) + 1)))
+                        batch = []
+                        batch_tokens = 0
+                    batch.append(result)
+                    batch_tokens += tokens
+
+            if batch:
+                tasks.append(asyncio.ensure_future(analyze(batch, len(tasks) + 1)))
+            print(f"✓ {prefilter.summary()}")
+            if not tasks:
+                print("⚠ No search results to analyze")
+            await asyncio.gather(*tasks)
+
+        async def fetch_xai():
+            events = await run_blocking(fetch_xai_events, cities, secrets['xai_api_key'], current_date, config)
+            await events_queue.put(events)
+
+        async def produce():
+            producers = [search_all(), batch_results()]
+            if xai_enabled(config, secrets):
+                producers.append(fetch_xai())
+            try:
+                await asyncio.gather(*producers)
+            finally:
+                await events_queue.put(None)
+
+        async def merge() -> Tuple[IndexedEvents, int]:
+            events_dict = await store_loaded
+            seen_links: Set[str] = set()
+            merged_count = 0
+
+            while True:
+                events = await events_queue.get()
+                if events is None:
+                    break
+                # Keep the first event that arrives for each link
+                unique = [event for event in events if event['link'] not in seen_links]
+                seen_links.update(event['link'] for event in unique)
+                if unique:
+                    events_dict = merge_events(events_dict, unique, current_date)
+                    merged_count += len(unique)
+
+            return events_dict, merged_count
+
+        _, (events_dict, merged_count) = await asyncio.gather(produce(), merge())
+
+    skipped = query_watermarks.get_watermarks().skipped
+    if skipped:
+        print(f"  ℹ Skipped {skipped} results already returned on earlier runs")
+    print(f"✓ Async pipeline merged {merged_count} unique new events\n")
+    return events_dict, merged_count
+
+
+# ============================================================================
+# Multi-Location Runs
+# ============================================================================
+
+def _init_location_worker(search_limiter: SharedTokenBucket):
+    """Process pool initializer: adopt the parent's shared Google rate limiter"""
+    global _shared_search_limiter
+    _shared_search_limiter = search_limiter
+
+
+def run_location(config: Dict[str, Any], secrets: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Run the pipeline for one location (in a worker process)
+
+    Output is buffered and returned rather than printed, so the logs of
+    locations running side by side don't interleave.
+
+    Args:
+        config: Configuration for the location, from location_configs()
+        secrets: API keys from load_secrets()
+
+    Returns:
+        dict: {'name', 'code', 'status', 'log'}
+    """
+    global OUTPUT_NAMESPACE
+    OUTPUT_NAMESPACE = config['output_namespace']
+
+    log = io.StringIO()
+    metrics = run_metrics.reset()
+    status = 'success'
+    code = 1
+
+    with contextlib.redirect_stdout(log):
+        try:
+            with metrics.stage('load_config'):
+                configure_services(config)
+            code = run_pipeline(config, secrets, metrics)
+        except Exception as e:
+            status = f'error: {e}'
+            print(f"❌ ERROR: {e}")
+            import traceback
+            traceback.print_exc(file=sys.stdout)
+        finally:
+            write_run_report(metrics, config, status)
+
+    return {'name': config['location_name'], 'code': code, 'status': status, 'log': log.getvalue()}
+
+
+def run_locations(locations: List[Dict[str, Any]], secrets: Dict[str, str], config: Dict[str, Any]) -> int:
+    """
+    Run every location in parallel worker processes
+
+    Workers share one Google rate limiter (built from the top-level
+    `google_config`) and the on-disk response cache, so identical queries
+    from different locations are fetched once. At most
+    `pipeline_config.max_location_workers` (default: one per CPU) run at a
+    time. Each location's log is printed when it finishes.
+
+    Args:
+        locations: Per-location configurations from location_configs()
+        secrets: API keys from load_secrets()
+        config: Top-level configuration dictionary
+
+    Returns:
+        int: 0 if every location succeeded, 1 otherwise
+    """
+    google_config = config.get('google_config', {})
+    search_workers = max(1, google_config.get('max_workers', 5))
+    max_workers = config.get('pipeline_config', {}).get('max_location_workers', os.cpu_count() or 1)
+    max_workers = max(1, min(len(locations), max_workers))
+    limiter = SharedTokenBucket(
+        rate=google_config.get('requests_per_second', 5.0),
+        capacity=google_config.get('burst', search_workers)
+    )
+
+    print(f"🔀 Running {len(locations)} locations ({max_workers} worker processes)")
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_location_worker, initargs=(limiter,)
+    ) as executor:
+        futures = {executor.submit(run_location, location, secrets): location for location in locations}
+        for future in as_completed(futures):
+            name = futures[future]['location_name']
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. killed); run_location catches everything else
+                result = {'name': name, 'code': 1, 'status': f'error: {e}', 'log': ''}
+            results[name] = result
+
+            print()
+            print("-" * 70)
+            print(f"📍 {name}")
+            print("-" * 70)
+            print(result['log'], end='')
+
+    print()
     print("=" * 70)
-    print("🎉 LOCAL EVENTS FETCHER")
+    for location in locations:
+        result = results[location['location_name']]
+        mark = '✓' if result['code'] == 0 else '✗'
+        print(f"{mark} {result['name']} ({location['output_namespace']}): {result['status']}")
     print("=" * 70)
-    print()
 
-    try:
-        # 1. Load configuration and secrets
-        config = load_config()
-        secrets = load_secrets()
+    failed = [name for name, result in results.items() if result['code'] != 0]
+    if failed:
+        print(f"❌ {len(failed)} of {len(locations)} locations failed: {', '.join(sorted(failed))}")
+        return 1
+    print("✅ SUCCESS: Events fetched and saved for all locations!")
+    return 0
+
+
+# ============================================================================
+# Main Execution
+# ============================================================================
 
-        # 2. Determine cities for today
-        cities = get_cities_for_today(config)
+def run_pipeline(config: Dict[str, Any], secrets: Dict[str, str], metrics: run_metrics.RunMetrics) -> int:
+    """
+    Search, analyze, merge and save the events for one location
 
-        # 3. Build search queries
-        queries = build_queries(cities, config)
+    Args:
+        config: Configuration dictionary (services already configured)
+        secrets: API keys from load_secrets()
+        metrics: Metrics for the run
 
-        # 4. Fetch search results from Google
-        search_results = fetch_all_search_results(
-            queries=queries,
-            api_key=secrets['google_api_key'],
-            search_engine_id=secrets['google_search_engine_id'],
-            config=config
-        )
+    Returns:
+        int: Exit code (0 on success)
+    """
+    # 2. Determine cities for today
+    cities = get_cities_for_today(config)
+
+    # 3. Build search queries
+    queries = build_queries(cities, config)
+    current_date = datetime.now().strftime('%Y-%m-%d')
+
+    if config.get('pipeline_config', {}).get('mode') == 'async':
+        # 4-6. Search, analysis and merging overlap in one asyncio pipeline
+        with metrics.stage('pipeline'):
+            events_dict, new_count = asyncio.run(
+                run_async_pipeline(queries, cities, secrets, config, current_date)
+            )
+
+        if not new_count:
+            print("ℹ No events found today")
+            # Still save to preserve data
+            with metrics.stage('save_events_json'):
+                save_events_json(events_dict)
+                query_watermarks.get_watermarks().save()
+            return 0
+    else:
+        # 4. Load existing events
+        with metrics.stage('load_events_json'):
+            events_dict = load_events_json(config)
+        prefilter = ResultPrefilter(events_dict, config)
+
+        # 4b. Fetch search results from Google, paging until nothing new turns up
+        with metrics.stage('search'):
+            search_results = fetch_all_search_results(
+                queries=queries,
+                api_key=secrets['google_api_key'],
+                search_engine_id=secrets['google_search_engine_id'],
+                config=config,
+                is_known=prefilter.is_known
+            )
+
+        # 4c. Drop results not worth analyzing
+        with metrics.stage('prefilter'):
+            search_results = prefilter.filter(search_results)
+            print(f"✓ {prefilter.summary()}")
 
         # 5. Analyze results with OpenAI
-        current_date = datetime.now().strftime('%Y-%m-%d')
-        new_events = analyze_with_openai(
-            results=search_results,
-            current_date=current_date,
-            api_key=secrets['openai_api_key'],
-            config=config
-        )
+        with metrics.stage('llm_openai'):
+            new_events = analyze_with_openai(
+                results=search_results,
+                current_date=current_date,
+                api_key=secrets['openai_api_key'],
+                config=config
+            )
+
+        # 5b. Add events from X.AI (Grok) when enabled in xai_config
+        if xai_enabled(config, secrets):
+            with metrics.stage('llm_xai'):
+                new_events.extend(fetch_xai_events(cities, secrets['xai_api_key'], current_date, config))
 
         if not new_events:
             print("ℹ No events found today")
             # Still save to preserve data
-            events_dict = load_events_json()
-            save_events_json(events_dict)
+            with metrics.stage('save_events_json'):
+                save_events_json(events_dict)
+                query_watermarks.get_watermarks().save()
             return 0
 
-        # 6. Load existing events and merge
-        events_dict = load_events_json()
-        events_dict = merge_events(events_dict, new_events, current_date)
+        # 6. Merge into the existing events
+        with metrics.stage('merge_events'):
+            events_dict = merge_events(events_dict, new_events, current_date)
 
-        # 7. Cleanup old events (if enabled)
+    # 7. Cleanup old events (if enabled)
+    with metrics.stage('cleanup_old_events'):
         events_dict = cleanup_old_events(events_dict, config)
 
-        # 8. Save updated events.json
-        save_events_json(events_dict)
+    # 8. Save updated events.json
+    with metrics.stage('save_events_json'):
+        events_dict = save_events_json(events_dict)
+        query_watermarks.get_watermarks().save()
+
+    # 9. Re-render markdown archives for new or changed dates
+    with metrics.stage('archives'):
+        update_markdown_archives(events_dict)
+
+    cache = response_cache.get_cache()
+    print(f"ℹ Response cache: {cache.hits} hits, {cache.misses} misses")
 
-        # 9. Create markdown archive for yesterday (if not exists)
-        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-        if yesterday in events_dict:
-            create_markdown_for_date(yesterday, events_dict[yesterday])
+    print()
+    print("=" * 70)
+    print("✅ SUCCESS: Events fetched and saved!")
+    print("=" * 70)
+    return 0
 
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description="Fetch local events into events.json and the markdown archives")
+    parser.add_argument('--rebuild-archives', action='store_true',
+                        help="Re-render every markdown archive from the event store, without fetching")
+    parser.add_argument('--workers', type=int,
+                        help="Worker processes for --rebuild-archives (default: one per CPU)")
+    return parser.parse_args(argv)
+
+
+def rebuild_archives(max_workers: Optional[int] = None) -> int:
+    """
+    Re-render the markdown archives of every location from its event store
+
+    Args:
+        max_workers: Worker processes (default: one per CPU)
+
+    Returns:
+        int: Exit code (0 on success)
+    """
+    global OUTPUT_NAMESPACE
+
+    print("=" * 70)
+    print("🗂  MARKDOWN ARCHIVE REBUILD")
+    print("=" * 70)
+    print()
+
+    try:
+        config = load_config()
+        for location_config in location_configs(config) or [config]:
+            OUTPUT_NAMESPACE = location_config.get('output_namespace')
+            if OUTPUT_NAMESPACE:
+                print(f"\n📍 {location_config['location_name']}")
+            events_dict = load_events_json(location_config)
+            rebuild_markdown_archives(events_dict.store, max_workers)
+        return 0
+
+    except Exception as e:
         print()
         print("=" * 70)
-        print("✅ SUCCESS: Events fetched and saved!")
+        print(f"❌ ERROR: {e}")
         print("=" * 70)
-        return 0
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main execution function"""
+    args = parse_args(argv)
+    if args.rebuild_archives:
+        return rebuild_archives(args.workers)
+
+    print("=" * 70)
+    print("🎉 LOCAL EVENTS FETCHER")
+    print("=" * 70)
+    print()
+
+    metrics = run_metrics.reset()
+    config: Dict[str, Any] = {}
+    status = 'success'
+
+    try:
+        # 1. Load configuration and secrets
+        with metrics.stage('load_config'):
+            config = load_config()
+            secrets = load_secrets()
+            locations = location_configs(config)
+            configure_services(config)
+
+        # Several locations: each runs steps 2-9 in its own worker process
+        if locations:
+            code = run_locations(locations, secrets, config)
+            if code:
+                status = 'error: location failures (see the per-location run reports)'
+            return code
+
+        return run_pipeline(config, secrets, metrics)
 
     except Exception as e:
+        status = f'error: {e}'
         print()
         print("=" * 70)
         print(f"❌ ERROR: {e}")
@@ -645,6 +2792,9 @@ def main():
         traceback.print_exc()
         return 1
 
+    finally:
+        write_run_report(metrics, config, status)
+
 
 if __name__ == '__main__':
     sys.exit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Crash-Safe File Writes
+======================
+
+Helpers for writing the event history without ever leaving a truncated
+file behind, and for keeping overlapping runs from clobbering each other:
+
+- atomic_write() / write_json(): write to a temporary file in the same
+  directory, fsync it, then rename it over the target, so readers see
+  either the old file or the new one, never a partial write
+- FileLock: advisory lock (flock) serializing writers of one store
+- MergeJournal: the changes a save is about to make, written before the
+  store is touched and removed once every file is in place, so an
+  interrupted save can be redone by the next run
+"""
+
+import contextlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locking, writes are still atomic
+    fcntl = None
+
+DEFAULT_LOCK_TIMEOUT = 600.0
+
+
+def fsync_directory(directory: Path):
+    """Flush a directory entry change (a rename) to disk where the platform allows it"""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextlib.contextmanager
+def atomic_write(path: Path, mode: str = 'w', encoding: Optional[str] = 'utf-8') -> Iterator[Any]:
+    """
+    Open a temporary file that replaces `path` only when the block completes
+
+    Args:
+        path: Target file
+        mode: 'w' (text) or 'wb' (binary)
+        encoding: Text encoding (ignored for binary mode)
+
+    Yields:
+        file: Writable file object; if the block raises, the target is left untouched
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f'.{path.name}.', suffix='.tmp', dir=str(path.parent))
+    try:
+        # mkstemp creates the file owner-only; keep the target's usual permissions
+        os.chmod(tmp_name, path.stat().st_mode & 0o777 if path.exists() else 0o644)
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+        raise
+    fsync_directory(path.parent)
+
+
+def write_json(path: Path, data: Any, **dump_kwargs: Any):
+    """
+    Atomically write `data` as JSON
+
+    Args:
+        path: Target file
+        data: JSON-serializable value
+        **dump_kwargs: Passed to json.dump (indent, ensure_ascii, separators, ...)
+    """
+    with atomic_write(path) as f:
+        json.dump(data, f, **dump_kwargs)
+
+
+class FileLock:
+    """
+    Exclusive advisory lock on a lock file, held for the duration of a `with` block
+
+    Other processes using the same lock file wait (up to `timeout` seconds)
+    instead of writing concurrently. Locks are per process: don't nest two
+    FileLocks on the same path.
+    """
+
+    def __init__(self, path: Path, timeout: float = DEFAULT_LOCK_TIMEOUT, poll_interval: float = 0.1):
+        self.path = Path(path)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._fd: Optional[int] = None
+
+    def acquire(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            deadline = time.monotonic() + self.timeout
+            waiting = False
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        os.close(fd)
+                        raise TimeoutError(f"Timed out after {self.timeout:g}s waiting for {self.path}")
+                    if not waiting:
+                        print(f"ℹ Waiting for another run to release {self.path}")
+                        waiting = True
+                    time.sleep(self.poll_interval)
+
+        # Record the holder for anyone inspecting a stuck lock
+        os.ftruncate(fd, 0)
+        os.write(fd, f'{os.getpid()}\n'.encode('ascii'))
+        self._fd = fd
+
+    def release(self):
+        if self._fd is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class MergeJournal:
+    """
+    Write-ahead record of the changes a save is about to make
+
+    The journal is written (atomically) before any store file changes and
+    cleared after the last one is in place. If it is still there when the
+    store is next opened, the save was interrupted; the recorded changes
+    are absolute (full month contents, link index entries), so redoing them
+    over a partly written store is safe.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def write(self, changes: Dict[str, Any]):
+        write_json(self.path, {'started': time.time(), 'pid': os.getpid(), 'changes': changes},
+                   ensure_ascii=False, separators=(',', ':'))
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Journaled changes, or None if there is no (readable) journal"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)['changes']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def clear(self):
+        with contextlib.suppress(FileNotFoundError):
+            self.path.unlink()
+        fsync_directory(self.path.parent)
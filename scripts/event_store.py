@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+"""
+Sharded Event Store
+===================
+
+Stores the event history as one JSON file per month plus a small manifest,
+so a daily run only reads and rewrites the months it actually touches
+instead of the whole history.
+
+Layout under the store root:
+
+    manifest.json        {"version": 2, "shards": {"2025-11": {"dates": 21, "events": 71}},
+                          "aggregate_stale": false, "links": 71}
+    links.json           link -> [date, index] for every stored event, one
+                         entry per line sorted by link (see ShardedLinkIndex)
+    near_duplicates.json link -> canonical link and LSH band hashes (see near_duplicates.py)
+    shards/2025-11.json  {date: [events]} for that month, newest date first
+    journal.json         operations of a save in progress (see atomic_io.MergeJournal)
+    .lock                advisory lock held by the run writing the store
+
+Every file is replaced atomically (temporary file, fsync, rename), and the
+manifest's "generation" counts committed saves so a run can tell whether
+another one wrote the store after it was loaded.
+
+The site-facing aggregate (one events.json with every date) is rebuilt only
+when a shard has changed since the last export, by concatenating the shard
+files' text without parsing them (or, for the minified form, re-encoding
+them one at a time).
+
+Single dates can be read without parsing the rest of their month: a
+memory-mapped scan of the shard finds where each date's list starts and
+ends (shards are written with indent=2, so top-level date keys are the
+only lines indented by exactly two spaces), and load_date() seeks to and
+decodes just that range. The link index is read the same way, by binary
+search over the memory-mapped links.json, so startup parses neither the
+history nor the full set of links.
+"""
+
+import json
+import mmap
+import re
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from atomic_io import DEFAULT_LOCK_TIMEOUT, FileLock, MergeJournal, atomic_write, write_json
+
+# Version 2: links.json is sorted, one entry per line
+MANIFEST_VERSION = 2
+
+EventsDict = Dict[str, List[Dict[str, Any]]]
+
+DATE_KEY = re.compile(rb'^  "(\d{4}-\d{2}-\d{2})": ', re.MULTILINE)
+
+
+def month_of(date: str) -> str:
+    """Shard key (YYYY-MM) for a YYYY-MM-DD date string"""
+    return date[:7]
+
+
+def encode_link(link: str) -> bytes:
+    """A link as the JSON string key written to links.json (also its sort key)"""
+    return json.dumps(link, ensure_ascii=False).encode('utf-8')
+
+
+def encode_location(location: tuple) -> bytes:
+    """A (date, event_index) location as the JSON array written to links.json"""
+    return json.dumps(list(location), separators=(',', ':')).encode('utf-8')
+
+
+class ShardedEventStore:
+    """
+    Per-month event shards with a manifest and an optional link index
+
+    Shards are loaded on demand and cached; save_months() writes only the
+    months it is given and marks the aggregate as stale.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.shards_dir = self.root / 'shards'
+        self.manifest_path = self.root / 'manifest.json'
+        self.links_path = self.root / 'links.json'
+        self.near_duplicates_path = self.root / 'near_duplicates.json'
+        self._shards: Dict[str, EventsDict] = {}
+        self._offsets: Dict[str, Optional[Dict[str, Tuple[int, int]]]] = {}
+        self.manifest = self._read_manifest()
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {'version': MANIFEST_VERSION, 'shards': {}, 'aggregate_stale': True}
+
+    def exists(self) -> bool:
+        """True if the store has been initialized on disk"""
+        return self.manifest_path.exists()
+
+    @property
+    def months(self) -> List[str]:
+        """All stored months, newest first"""
+        return sorted(self.manifest['shards'], reverse=True)
+
+    def months_before(self, cutoff_date: str) -> Set[str]:
+        """Months whose every date is strictly older than cutoff_date"""
+        cutoff_month = month_of(cutoff_date)
+        return {month for month in self.months if month < cutoff_month}
+
+    def shard_path(self, month: str) -> Path:
+        return self.shards_dir / f'{month}.json'
+
+    def load_month(self, month: str) -> EventsDict:
+        """
+        Load one month's shard (cached after the first read)
+
+        Args:
+            month: Month key (YYYY-MM)
+
+        Returns:
+            dict: date -> list of events for that month (empty if absent)
+        """
+        if month not in self._shards:
+            path = self.shard_path(month)
+            if path.exists():
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._shards[month] = json.load(f)
+            else:
+                self._shards[month] = {}
+        return self._shards[month]
+
+    def date_offsets(self, month: str) -> Optional[Dict[str, Tuple[int, int]]]:
+        """
+        Byte range of each date's event list in a month's shard file
+
+        Args:
+            month: Month key (YYYY-MM)
+
+        Returns:
+            dict: date -> (start, end) offsets, or None if the file isn't in
+                the layout save_months() writes
+        """
+        if month not in self._offsets:
+            offsets: Optional[Dict[str, Tuple[int, int]]] = {}
+            path = self.shard_path(month)
+            if path.exists() and path.stat().st_size > 0:
+                with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    matches = list(DATE_KEY.finditer(mapped))
+                    for i, match in enumerate(matches):
+                        end = matches[i + 1].start() if i + 1 < len(matches) else len(mapped)
+                        offsets[match.group(1).decode('ascii')] = (match.end(), end)
+                    if not matches and mapped.find(b'"') != -1:
+                        offsets = None
+            self._offsets[month] = offsets
+        return self._offsets[month]
+
+    def dates_in_month(self, month: str) -> List[str]:
+        """Dates stored in a month's shard, without loading its events"""
+        if month in self._shards:
+            return list(self._shards[month])
+        offsets = self.date_offsets(month)
+        if offsets is None:
+            return list(self.load_month(month))
+        return list(offsets)
+
+    def load_date(self, date: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Load one date's events, decoding only that part of its shard
+
+        Args:
+            date: Date string (YYYY-MM-DD)
+
+        Returns:
+            list: Events stored for that date, or None if there are none
+        """
+        month = month_of(date)
+        if month in self._shards:
+            return self._shards[month].get(date)
+
+        offsets = self.date_offsets(month)
+        if offsets is None:
+            return self.load_month(month).get(date)
+        if date not in offsets:
+            return None
+
+        start, end = offsets[date]
+        with open(self.shard_path(month), 'rb') as f:
+            f.seek(start)
+            raw = f.read(end - start)
+        # The slice runs up to the next key: drop the separator (or the closing brace)
+        return json.loads(raw.rstrip(b' \r\n,}').decode('utf-8'))
+
+    def load_months(self, months: Iterable[str]) -> EventsDict:
+        """Load several months and return their dates merged into one dict"""
+        events: EventsDict = {}
+        for month in months:
+            events.update(self.load_month(month))
+        return events
+
+    def load_all(self) -> EventsDict:
+        """Load every shard (full history)"""
+        return self.load_months(self.months)
+
+    def load_links(self) -> 'ShardedLinkIndex':
+        """
+        Open the persisted link index
+
+        A links.json from a version 1 store (one unsorted line) is rewritten
+        in the sorted layout first.
+
+        Returns:
+            ShardedLinkIndex: link -> (date, event_index), looked up per link
+                instead of loaded into memory
+        """
+        if self.links_path.exists() and self.manifest.get('version', 1) < 2:
+            with open(self.links_path, 'r', encoding='utf-8') as f:
+                self.save_links({link: tuple(entry) for link, entry in json.load(f).items()})
+        return ShardedLinkIndex(self)
+
+    def save_links(self, link_index: Dict[str, tuple]):
+        """Persist the link index (only the pending changes if it is this store's ShardedLinkIndex)"""
+        if isinstance(link_index, ShardedLinkIndex) and link_index.store is self:
+            link_index.flush()
+            return
+
+        entries = sorted((encode_link(link), encode_location(location)) for link, location in link_index.items())
+        self._write_links(entries)
+
+    def _write_links(self, entries: Iterable[Tuple[bytes, bytes]]):
+        """Write sorted (encoded link, encoded location) pairs to links.json and record the count"""
+        count = 0
+        with atomic_write(self.links_path, 'wb') as f:
+            f.write(b'{\n')
+            for key, value in entries:
+                f.write((b',\n' if count else b'') + key + b':' + value)
+                count += 1
+            f.write(b'\n}\n' if count else b'}\n')
+
+        self.manifest['version'] = MANIFEST_VERSION
+        self.manifest['links'] = count
+        self._write_manifest()
+
+    def load_near_duplicates(self) -> Optional[Dict[str, str]]:
+        """
+        Load the persisted near-duplicate index
+
+        Returns:
+            dict: Serialized NearDuplicateIndex, or None if it was never saved
+        """
+        if not self.near_duplicates_path.exists():
+            return None
+        with open(self.near_duplicates_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_near_duplicates(self, data: Dict[str, str]):
+        """Persist the serialized near-duplicate index"""
+        write_json(self.near_duplicates_path, data, ensure_ascii=False, separators=(',', ':'))
+
+    def save_months(self, events: EventsDict, months: Iterable[str]):
+        """
+        Rewrite the given months' shards from `events` and update the manifest
+
+        Dates in `events` outside `months` are ignored; a month with no dates
+        left is removed from the store.
+
+        Args:
+            events: date -> list of events (must contain every date of each month)
+            months: Months to write
+        """
+        months = set(months)
+        if not months:
+            return
+
+        self.shards_dir.mkdir(parents=True, exist_ok=True)
+
+        for month in months:
+            shard = dict(sorted(
+                ((date, day) for date, day in events.items() if month_of(date) == month),
+                reverse=True
+            ))
+            self._shards[month] = shard
+            self._offsets.pop(month, None)
+            path = self.shard_path(month)
+
+            if not shard:
+                if path.exists():
+                    path.unlink()
+                self.manifest['shards'].pop(month, None)
+                continue
+
+            write_json(path, shard, indent=2, ensure_ascii=False)
+
+            self.manifest['shards'][month] = {
+                'dates': len(shard),
+                'events': sum(len(day) for day in shard.values())
+            }
+
+        self.manifest['aggregate_stale'] = True
+        self._write_manifest()
+
+    def drop_months(self, months: Iterable[str]):
+        """Delete whole month shards without loading them"""
+        months = set(months)
+        if not months:
+            return
+
+        for month in months:
+            path = self.shard_path(month)
+            if path.exists():
+                path.unlink()
+            self._shards.pop(month, None)
+            self._offsets.pop(month, None)
+            self.manifest['shards'].pop(month, None)
+        self.manifest['aggregate_stale'] = True
+        self._write_manifest()
+
+    def _write_manifest(self):
+        write_json(self.manifest_path, self.manifest, indent=2)
+
+    def lock(self, timeout: float = DEFAULT_LOCK_TIMEOUT) -> FileLock:
+        """Advisory lock serializing writers of this store (use as a context manager)"""
+        return FileLock(self.root / '.lock', timeout)
+
+    @property
+    def journal(self) -> MergeJournal:
+        """Write-ahead journal of the save in progress"""
+        return MergeJournal(self.root / 'journal.json')
+
+    def current_generation(self) -> int:
+        """Number of saves committed to disk (re-read, so changes by other processes show)"""
+        return int(self._read_manifest().get('generation', 0))
+
+    def bump_generation(self):
+        """Record that a save has been committed"""
+        self.manifest['generation'] = self.current_generation() + 1
+        self._write_manifest()
+
+    def reopen(self) -> 'ShardedEventStore':
+        """A fresh handle on the same store, without this one's cached shards"""
+        return ShardedEventStore(self.root)
+
+    def import_events(self, events: EventsDict, link_index: Optional[Dict[str, tuple]] = None):
+        """
+        Initialize the store from a monolithic date -> events dict
+
+        Args:
+            events: Full event history
+            link_index: Optional link index to persist alongside
+        """
+        self.save_months(events, {month_of(date) for date in events})
+        if link_index is not None:
+            self.save_links(link_index)
+
+    def export_aggregate(self, path: Path, force: bool = False, compact: bool = False) -> bool:
+        """
+        Regenerate the site-facing aggregate if any shard changed since the last export
+
+        Shard files are already pretty-printed JSON objects, so the indented
+        aggregate is assembled from their text without parsing, producing the
+        same output as json.dump(all_events, indent=2) over newest-first
+        dates. The compact (minified) form re-encodes one shard at a time.
+
+        Args:
+            path: Aggregate events.json to write
+            force: Rewrite even if the aggregate is up to date
+            compact: Write minified JSON instead of indented
+
+        Returns:
+            bool: True if the aggregate was rewritten
+        """
+        path = Path(path)
+        if not force and not self.manifest.get('aggregate_stale', True) and path.exists():
+            return False
+
+        # One shard in memory at a time
+        with atomic_write(path) as out:
+            written = False
+            for month in self.months:
+                with open(self.shard_path(month), 'r', encoding='utf-8') as f:
+                    if compact:
+                        body = ','.join(
+                            f'{json.dumps(date)}:{json.dumps(events, ensure_ascii=False, separators=(",", ":"))}'
+                            for date, events in json.load(f).items()
+                        )
+                    else:
+                        body = f.read().strip()[1:-1].strip('\n')
+                if body.strip():
+                    out.write(('{' if compact else '{\n') if not written else (',' if compact else ',\n'))
+                    out.write(body)
+                    written = True
+            out.write(('}' if compact else '\n}') if written else '{}')
+
+        self.manifest['aggregate_stale'] = False
+        self._write_manifest()
+        return True
+
+
+
+class ShardedLinkIndex(MutableMapping):
+    """
+    link -> (date, event_index) mapping read straight from links.json
+
+    links.json holds one `"link":["date",index]` entry per line, sorted by
+    the encoded link, so a lookup is a binary search over the memory-mapped
+    file rather than a parse of every link up front. Changes are buffered
+    and merged into the file in one sorted pass by flush() (called from
+    ShardedEventStore.save_links).
+    """
+
+    def __init__(self, store: ShardedEventStore):
+        self.store = store
+        self._pending: Dict[str, Optional[tuple]] = {}
+        self._cutoff: Optional[str] = None
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+
+    def _mapped(self) -> Optional[mmap.mmap]:
+        if self._map is None:
+            path = self.store.links_path
+            if not path.exists() or path.stat().st_size == 0:
+                return None
+            self._file = open(path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def close(self):
+        """Release the memory map (reopened on the next lookup)"""
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = self._file = None
+
+    @staticmethod
+    def _split(line: bytes) -> Tuple[bytes, bytes]:
+        # The key is a JSON string, so an unescaped '":[' can only be where it ends
+        split = line.rfind(b'":[')
+        return line[:split + 1], line[split + 2:].rstrip(b',')
+
+    def _stored(self, link: str) -> Optional[tuple]:
+        """Location recorded in links.json, ignoring pending changes"""
+        mapped = self._mapped()
+        if mapped is None:
+            return None
+        target = encode_link(link)
+
+        # lo and hi always sit at the start of a line; the first and last lines are the braces
+        lo, hi = mapped.find(b'\n') + 1, mapped.rfind(b'}')
+        while lo < hi:
+            newline = mapped.rfind(b'\n', lo, (lo + hi) // 2)
+            start = newline + 1 if newline != -1 else lo
+            end = mapped.find(b'\n', start, hi)
+            end = hi if end == -1 else end
+            key, value = self._split(mapped[start:end])
+            if key == target:
+                location = tuple(json.loads(value))
+                return None if self._cutoff and location[0] < self._cutoff else location
+            if key < target:
+                lo = end + 1
+            else:
+                hi = start
+        return None
+
+    def _entries(self) -> Iterator[Tuple[bytes, bytes]]:
+        """(encoded link, encoded location) pairs of links.json, in file order"""
+        mapped = self._mapped()
+        if mapped is None:
+            return
+        cutoff = self._cutoff.encode('ascii') if self._cutoff else None
+        position, end = mapped.find(b'\n') + 1, mapped.rfind(b'}')
+        while position < end:
+            line_end = mapped.find(b'\n', position, end)
+            line_end = end if line_end == -1 else line_end
+            line = mapped[position:line_end]
+            position = line_end + 1
+            if not line:
+                continue
+            key, value = self._split(line)
+            # value is ["YYYY-MM-DD",index]
+            if cutoff is None or value[2:12] >= cutoff:
+                yield key, value
+
+    def __getitem__(self, link: str) -> tuple:
+        location = self._pending[link] if link in self._pending else self._stored(link)
+        if location is None:
+            raise KeyError(link)
+        return location
+
+    def __setitem__(self, link: str, location: tuple):
+        self._pending[link] = tuple(location)
+
+    def __delitem__(self, link: str):
+        self[link]
+        self._pending[link] = None
+
+    def __iter__(self) -> Iterator[str]:
+        for link, _ in self.items():
+            yield link
+
+    def items(self) -> Iterator[Tuple[str, tuple]]:
+        """Stream (link, location) pairs without loading the whole file"""
+        for key, value in self._entries():
+            link = json.loads(key)
+            if link not in self._pending:
+                yield link, tuple(json.loads(value))
+        for link, location in list(self._pending.items()):
+            if location is not None:
+                yield link, location
+
+    def __len__(self) -> int:
+        count = self.store.manifest.get('links') if self._cutoff is None else None
+        if count is None:
+            count = sum(1 for _ in self._entries())
+        for link, location in self._pending.items():
+            count += (location is not None) - (self._stored(link) is not None)
+        return count
+
+    def pending_changes(self) -> Dict[str, Any]:
+        """Buffered changes in JSON-serializable form (for a save journal)"""
+        return {
+            'set': {link: list(location) for link, location in self._pending.items() if location is not None},
+            'delete': [link for link, location in self._pending.items() if location is None],
+            'cutoff': self._cutoff
+        }
+
+    def restore_changes(self, changes: Dict[str, Any]):
+        """Buffer changes recorded by pending_changes() again"""
+        if changes.get('cutoff'):
+            self.discard_before(changes['cutoff'])
+        for link, location in changes['set'].items():
+            self._pending[link] = tuple(location)
+        for link in changes['delete']:
+            self._pending[link] = None
+
+    def discard_before(self, cutoff_date: str):
+        """Forget every entry dated before cutoff_date (dropped from links.json on the next flush)"""
+        self._cutoff = max(self._cutoff or '', cutoff_date)
+        for link, location in list(self._pending.items()):
+            if location is not None and location[0] < cutoff_date:
+                del self._pending[link]
+
+    def flush(self):
+        """Merge buffered changes into links.json"""
+        if not self._pending and self._cutoff is None and self.store.links_path.exists():
+            return
+
+        changes = sorted(
+            (encode_link(link), None if location is None else encode_location(location))
+            for link, location in self._pending.items()
+        )
+
+        def merged() -> Iterator[Tuple[bytes, bytes]]:
+            i = 0
+            for key, value in self._entries():
+                while i < len(changes) and changes[i][0] < key:
+                    if changes[i][1] is not None:
+                        yield changes[i]
+                    i += 1
+                if i < len(changes) and changes[i][0] == key:
+                    if changes[i][1] is not None:
+                        yield changes[i]
+                    i += 1
+                else:
+                    yield key, value
+            for change in changes[i:]:
+                if change[1] is not None:
+                    yield change
+
+        self.store._write_links(merged())
+        self.close()
+        self._pending.clear()
+        self._cutoff = None
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Clients
+===================
+
+One keep-alive, connection-pooled requests.Session and one cached OpenAI
+client per API key, shared by every script that talks to Google Custom
+Search, X.AI or OpenAI, so repeated calls reuse TCP+TLS connections
+instead of opening a new one per request.
+
+Settings come from the optional "http_config" section of config/events.json:
+
+    "http_config": {
+        "pool_size": 10,
+        "connect_timeout_seconds": 10,
+        "read_timeout_seconds": 30,
+        "llm_timeout_seconds": 120
+    }
+
+Chat-completion calls use llm_timeout_seconds as their read timeout, since
+a long completion legitimately takes much longer than a search request.
+
+The API endpoints can be overridden (e.g. to point at the local mock server
+used by the benchmarks) with "google_search_url", "xai_chat_url" and
+"openai_base_url" in the same section.
+"""
+
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 30.0
+DEFAULT_LLM_TIMEOUT = 120.0
+
+DEFAULT_ENDPOINTS = {
+    'google_search_url': 'https://www.googleapis.com/customsearch/v1',
+    'xai_chat_url': 'https://api.x.ai/v1/chat/completions',
+    'openai_base_url': None
+}
+
+_settings: Dict[str, Any] = {
+    'pool_size': DEFAULT_POOL_SIZE,
+    'connect_timeout_seconds': DEFAULT_CONNECT_TIMEOUT,
+    'read_timeout_seconds': DEFAULT_READ_TIMEOUT,
+    'llm_timeout_seconds': DEFAULT_LLM_TIMEOUT,
+    **DEFAULT_ENDPOINTS
+}
+_session: Optional['PooledSession'] = None
+_openai_clients: Dict[Tuple[str, Optional[int]], Any] = {}
+_lock = threading.Lock()
+
+
+class PooledSession(requests.Session):
+    """
+    requests.Session with a sized connection pool and a default timeout
+
+    Any call that doesn't pass `timeout` explicitly gets the configured
+    (connect, read) timeout, so no request can hang indefinitely.
+    """
+
+    def __init__(self, pool_size: int, timeout: Tuple[float, float]):
+        super().__init__()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def configure(http_config: Optional[Dict[str, Any]] = None):
+    """
+    Apply pool size and timeout settings, resetting any existing clients
+
+    Args:
+        http_config: The "http_config" section of the configuration (optional)
+    """
+    global _session
+
+    with _lock:
+        _settings.update(http_config or {})
+        if _session is not None:
+            _session.close()
+        _session = None
+        for client in _openai_clients.values():
+            client.close()
+        _openai_clients.clear()
+
+
+def get_session() -> PooledSession:
+    """
+    Get the shared pooled session, creating it on first use
+
+    Returns:
+        PooledSession: Session shared across all API calls in this process
+    """
+    global _session
+
+    with _lock:
+        if _session is None:
+            _session = PooledSession(
+                pool_size=int(_settings['pool_size']),
+                timeout=(float(_settings['connect_timeout_seconds']), float(_settings['read_timeout_seconds']))
+            )
+        return _session
+
+
+def endpoint(name: str) -> Optional[str]:
+    """
+    Get the configured URL for an API endpoint
+
+    Args:
+        name: "google_search_url", "xai_chat_url" or "openai_base_url"
+
+    Returns:
+        str: Endpoint URL (None for openai_base_url means the SDK default)
+    """
+    return _settings[name]
+
+
+def llm_timeout() -> Tuple[float, float]:
+    """
+    Get the (connect, read) timeout for chat-completion requests
+
+    Returns:
+        tuple: Timeout to pass to session calls against LLM endpoints
+    """
+    return (float(_settings['connect_timeout_seconds']), float(_settings['llm_timeout_seconds']))
+
+
+def get_openai_client(api_key: str, max_retries: Optional[int] = None):
+    """
+    Get a cached OpenAI client for the given API key
+
+    The client owns an httpx connection pool sized like the shared session,
+    so it is built once per process and reused across calls and retries.
+
+    Args:
+        api_key: OpenAI API key
+        max_retries: Retries done by the SDK itself; pass 0 when the caller
+            retries through a RetryPolicy. None keeps the SDK default.
+
+    Returns:
+        OpenAI: Reusable OpenAI client
+    """
+    with _lock:
+        client = _openai_clients.get((api_key, max_retries))
+        if client is None:
+            import httpx
+            from openai import DefaultHttpxClient, OpenAI
+
+            pool_size = int(_settings['pool_size'])
+            options: Dict[str, Any] = {} if max_retries is None else {'max_retries': max_retries}
+            client = OpenAI(
+                api_key=api_key,
+                base_url=_settings['openai_base_url'],
+                **options,
+                http_client=DefaultHttpxClient(
+                    limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+                    timeout=httpx.Timeout(
+                        float(_settings['llm_timeout_seconds']),
+                        connect=float(_settings['connect_timeout_seconds'])
+                    )
+                )
+            )
+            _openai_clients[(api_key, max_retries)] = client
+        return client
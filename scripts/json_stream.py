@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Streaming JSON Array Extraction
+===============================
+
+Incremental parser for the JSON arrays LLMs return, fed one streamed chunk
+at a time. Each array element is decoded as soon as it is complete, so
+valid events are available while the completion is still arriving, and a
+truncated or partly corrupt array still yields every element that parses.
+
+Anything before the opening '[' (markdown code fences, a "json" language
+tag, whitespace) is ignored.
+"""
+
+import json
+from typing import Any, Iterable, Iterator, List, Optional
+
+
+class JSONArrayStreamParser:
+    """
+    Incremental parser for the elements of a top-level JSON array
+
+    Call feed() with each text chunk; it returns the elements completed by
+    that chunk. Elements that fail to decode are counted in `errors` and
+    skipped rather than failing the whole array.
+    """
+
+    def __init__(self):
+        self.items: List[Any] = []
+        self.errors = 0
+        self.started = False
+        self.complete = False
+        self._chunks: List[str] = []
+        self._buffer = ''
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._element_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far"""
+        return ''.join(self._chunks)
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Consume a text chunk
+
+        Args:
+            chunk: Next piece of the streamed completion
+
+        Returns:
+            list: Array elements completed by this chunk
+        """
+        self._chunks.append(chunk)
+        if self.complete:
+            return []
+
+        self._buffer += chunk
+        completed = []
+
+        while self._pos < len(self._buffer) and not self.complete:
+            char = self._buffer[self._pos]
+
+            if not self.started:
+                if char == '[':
+                    self.started = True
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif self._depth == 0 and char in ',]':
+                self._emit(completed)
+                if char == ']':
+                    self.complete = True
+            else:
+                if self._element_start is None and not char.isspace():
+                    self._element_start = self._pos
+                if char == '"':
+                    self._in_string = True
+                elif char in '{[':
+                    self._depth += 1
+                elif char in '}]' and self._depth > 0:
+                    self._depth -= 1
+
+            self._pos += 1
+
+        # Keep only the unfinished element in the buffer
+        keep_from = self._element_start if self._element_start is not None else self._pos
+        self._buffer = self._buffer[keep_from:]
+        self._pos -= keep_from
+        if self._element_start is not None:
+            self._element_start = 0
+
+        return completed
+
+    def _emit(self, completed: List[Any]):
+        if self._element_start is None:
+            return
+
+        element = self._buffer[self._element_start:self._pos]
+        self._element_start = None
+        try:
+            item = json.loads(element)
+        except json.JSONDecodeError:
+            self.errors += 1
+            return
+
+        self.items.append(item)
+        completed.append(item)
+
+
+def iter_json_array_items(chunks: Iterable[str], parser: Optional[JSONArrayStreamParser] = None) -> Iterator[Any]:
+    """
+    Yield array elements from a stream of text chunks as they complete
+
+    Args:
+        chunks: Iterable of text pieces (e.g. streamed completion deltas)
+        parser: Optional parser to use, so the caller can inspect errors/text afterwards
+
+    Yields:
+        Each successfully decoded array element
+    """
+    parser = parser or JSONArrayStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Event Detection
+==============================
+
+MinHash / LSH index for spotting the same event reported under different
+URLs: several outlets covering one story, or one page linked with
+different tracking parameters.
+
+Each event gets:
+
+- a canonical link (lowercased host without "www.", no fragment, no
+  tracking parameters, sorted query, no trailing slash), matched exactly
+- a MinHash signature over word-pair shingles of its normalized title and
+  description, split into LSH bands
+
+A lookup only compares against events sharing at least one band bucket, so
+it stays sublinear in the size of the store; candidates are then confirmed
+with the exact shingle Jaccard similarity.
+
+Settings come from the optional "dedup_config" section of config/events.json:
+
+    "dedup_config": {
+        "near_duplicates": true,
+        "similarity_threshold": 0.6
+    }
+"""
+
+import hashlib
+import random
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 2
+
+DEFAULT_THRESHOLD = 0.6
+
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    'ref', 'ref_src', 'ref_url', 'cmpid', 'ocid', 'src', 'share', 'smid', 'cid'
+}
+TRACKING_PREFIXES = ('utm_', 'hsa_', '_hs')
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it',
+    'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'will', 'with'
+}
+
+_MASK64 = (1 << 64) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(NUM_PERM)]
+_WORD = re.compile(r'[a-z0-9]+')
+
+_settings: Dict[str, Any] = {
+    'near_duplicates': True,
+    'similarity_threshold': DEFAULT_THRESHOLD
+}
+
+
+def configure(dedup_config: Optional[Dict[str, Any]] = None):
+    """
+    Apply the "dedup_config" section of the configuration
+
+    Args:
+        dedup_config: Settings to override (optional)
+    """
+    _settings.update(dedup_config or {})
+
+
+def enabled() -> bool:
+    """True if near-duplicate detection is turned on"""
+    return bool(_settings['near_duplicates'])
+
+
+def similarity_threshold() -> float:
+    """Minimum shingle Jaccard similarity for two events to count as the same"""
+    return float(_settings['similarity_threshold'])
+
+
+def canonicalize_link(link: str) -> str:
+    """
+    Normalize a URL so trivially different links to the same page compare equal
+
+    Args:
+        link: Event URL
+
+    Returns:
+        str: Canonical form (the input, stripped, if it doesn't parse as a URL)
+    """
+    link = (link or '').strip()
+    try:
+        parts = urlsplit(link)
+    except ValueError:
+        return link
+    if not parts.netloc:
+        return link
+
+    host = parts.hostname or ''
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and not ((parts.scheme == 'http' and parts.port == 80) or
+                           (parts.scheme == 'https' and parts.port == 443)):
+        host = f'{host}:{parts.port}'
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip('/') or '/'
+
+    # http and https versions of a page are the same page
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+
+def shingles(event: Dict[str, Any]) -> Set[str]:
+    """
+    Word-pair shingles of an event's normalized title and description
+
+    Args:
+        event: Event dictionary
+
+    Returns:
+        set: Shingles (single words for very short texts)
+    """
+    text = f"{event.get('title', '')} {event.get('description', '')}".lower()
+    words = [word for word in _WORD.findall(text) if word not in STOPWORDS]
+    if len(words) < SHINGLE_SIZE:
+        return set(words)
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """Exact Jaccard similarity of two shingle sets"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def band_hashes(shingle_set: Set[str]) -> List[str]:
+    """
+    MinHash signature of a shingle set, reduced to one hash per LSH band
+
+    Args:
+        shingle_set: Shingles from shingles()
+
+    Returns:
+        list: BANDS hex strings (empty if there are no shingles)
+    """
+    if not shingle_set:
+        return []
+
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for shingle in shingle_set
+    ]
+    signature = [min(((a * h + b) & _MASK64) >> 32 for h in hashes) for a, b in _PERMUTATIONS]
+
+    return [
+        hashlib.blake2b(
+            b''.join(value.to_bytes(4, 'big') for value in signature[band * ROWS:(band + 1) * ROWS]),
+            digest_size=4
+        ).hexdigest()
+        for band in range(BANDS)
+    ]
+
+
+class NearDuplicateIndex:
+    """
+    LSH buckets over event signatures, keyed by each event's stored link
+
+    The index only proposes candidates; the caller confirms them against
+    the stored events (see IndexedEvents.find_near_duplicate). Entries whose
+    event has since been removed are pruned as they are encountered.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, Tuple[str, List[str], str]] = {}
+        self.by_canonical: Dict[str, str] = {}
+        self.by_date: Dict[str, Set[str]] = {}
+        self.buckets: Dict[Tuple[int, str], Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def add(self, key: str, event: Dict[str, Any], bands: Optional[List[str]] = None, date: str = ''):
+        """
+        Index an event (replacing any previous entry for the same key)
+
+        Args:
+            key: Stored link of the event
+            event: Event dictionary
+            bands: Precomputed band hashes (computed from the event if omitted)
+            date: Date the event is stored under, used by discard_before()
+        """
+        self.remove(key)
+        if bands is None:
+            bands = band_hashes(shingles(event))
+        self._insert(key, canonicalize_link(event.get('link', key)), bands, date)
+
+    def _insert(self, key: str, canonical: str, bands: List[str], date: str):
+        self.entries[key] = (canonical, bands, date)
+        self.by_canonical.setdefault(canonical, key)
+        if date:
+            self.by_date.setdefault(date, set()).add(key)
+        for band, value in enumerate(bands):
+            self.buckets.setdefault((band, value), set()).add(key)
+
+    def remove(self, key: str):
+        """Drop an event from the index (no-op if absent)"""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        canonical, bands, date = entry
+        if self.by_canonical.get(canonical) == key:
+            del self.by_canonical[canonical]
+        if date in self.by_date:
+            self.by_date[date].discard(key)
+            if not self.by_date[date]:
+                del self.by_date[date]
+        for band, value in enumerate(bands):
+            bucket = self.buckets.get((band, value))
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self.buckets[(band, value)]
+
+    def discard_before(self, cutoff_date: str) -> int:
+        """
+        Drop every entry stored under a date before cutoff_date
+
+        Entries saved without a date (older index files) are left to the
+        lazy pruning of lookups.
+
+        Returns:
+            int: Number of entries dropped
+        """
+        keys = [key for date in self.by_date if date < cutoff_date for key in self.by_date[date]]
+        for key in keys:
+            self.remove(key)
+        return len(keys)
+
+    def same_page(self, link: str) -> Optional[str]:
+        """Key of an indexed event whose canonical link equals this link's, if any"""
+        return self.by_canonical.get(canonicalize_link(link))
+
+    def candidates(self, bands: List[str]) -> Set[str]:
+        """Keys sharing at least one LSH band bucket with the given band hashes"""
+        found: Set[str] = set()
+        for band, value in enumerate(bands):
+            found |= self.buckets.get((band, value), set())
+        return found
+
+    def to_json(self) -> Dict[str, str]:
+        """Compact serialization: key -> "date<TAB>canonical link<TAB>concatenated band hashes\""""
+        return {
+            key: f"{date}\t{canonical}\t{''.join(bands)}"
+            for key, (canonical, bands, date) in self.entries.items()
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, str]) -> 'NearDuplicateIndex':
+        """Inverse of to_json()"""
+        index = cls()
+        for key, value in data.items():
+            head, _, packed = value.rpartition('\t')
+            # Older files have no date field: "canonical link<TAB>band hashes"
+            date, canonical = head.split('\t', 1) if '\t' in head else ('', head)
+            index._insert(key, canonical, [packed[i:i + 8] for i in range(0, len(packed), 8)], date)
+        return index
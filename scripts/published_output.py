@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Published Data Files
+====================
+
+The JSON the site serves (the aggregate events.json, the day files and
+the site indexes) is written in one canonical form, minified UTF-8.
+Compression is normally left to the host or CDN at serve time. For a
+host that can only send precompressed files, "compress" adds siblings
+next to each file (.gitignore keeps them out of the repository, so turn
+this on in the build that deploys the site, not in the data commit):
+
+    events.json      minified JSON
+    events.json.gz   gzip, without timestamp or file name, so identical
+                     data always gives identical bytes
+    events.json.br   Brotli (only if the optional `brotli` package is installed)
+
+Files are rewritten only when their content changes. Minified files make
+unreadable text diffs; .gitattributes sends them through a "prettyjson"
+diff driver, which shows them indented once it is set up locally:
+
+    git config diff.prettyjson.textconv "python3 -m json.tool --no-ensure-ascii"
+
+Settings come from the optional "output_config" section of config/events.json:
+
+    "output_config": {
+        "minify": true,
+        "compress": [],
+        "gzip_level": 6,
+        "brotli_quality": 7
+    }
+"""
+
+import contextlib
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from atomic_io import atomic_write
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only .gz siblings are written
+    brotli = None
+
+CHUNK_SIZE = 1 << 20
+SIBLING_SUFFIXES = ('.gz', '.br')
+
+_settings: Dict[str, Any] = {
+    'minify': True,
+    'compress': [],
+    'gzip_level': 6,
+    'brotli_quality': 7
+}
+
+
+def configure(output_config: Optional[Dict[str, Any]] = None):
+    """
+    Apply the "output_config" section of the configuration
+
+    Args:
+        output_config: Settings to override (optional)
+    """
+    _settings.update(output_config or {})
+
+
+def minify() -> bool:
+    """True if published JSON is written minified (otherwise indented)"""
+    return bool(_settings['minify'])
+
+
+def encode(data: Any) -> bytes:
+    """Canonical bytes of a published JSON value"""
+    if minify():
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _formats() -> List[str]:
+    return [fmt for fmt in _settings['compress'] if fmt == 'gz' or (fmt == 'br' and brotli is not None)]
+
+
+def write_compressed(path: Path):
+    """
+    (Re)write the precompressed siblings of a file from its current content
+
+    Siblings of formats that are turned off are removed, so a stale
+    .gz/.br never outlives a change to its source.
+
+    Args:
+        path: Published file
+    """
+    path = Path(path)
+    formats = _formats()
+
+    if 'gz' in formats:
+        with atomic_write(path.with_name(path.name + '.gz'), 'wb') as out, \
+                gzip.GzipFile(filename='', mode='wb', fileobj=out, mtime=0,
+                              compresslevel=_settings['gzip_level']) as gz, \
+                open(path, 'rb') as src:
+            while chunk := src.read(CHUNK_SIZE):
+                gz.write(chunk)
+
+    if 'br' in formats:
+        compressor = brotli.Compressor(quality=_settings['brotli_quality'])
+        with atomic_write(path.with_name(path.name + '.br'), 'wb') as out, open(path, 'rb') as src:
+            while chunk := src.read(CHUNK_SIZE):
+                out.write(compressor.process(chunk))
+            out.write(compressor.finish())
+
+    for suffix in SIBLING_SUFFIXES:
+        if suffix[1:] not in formats:
+            with contextlib.suppress(FileNotFoundError):
+                path.with_name(path.name + suffix).unlink()
+
+
+def siblings_missing(path: Path) -> bool:
+    """True if a precompressed sibling that should exist does not"""
+    path = Path(path)
+    return any(not path.with_name(f'{path.name}.{fmt}').exists() for fmt in _formats())
+
+
+def write_bytes(path: Path, data: bytes) -> bool:
+    """
+    Publish already-encoded content, touching nothing if it is unchanged
+
+    Args:
+        path: Published file
+        data: Encoded content
+
+    Returns:
+        bool: True if the file was rewritten
+    """
+    path = Path(path)
+    try:
+        unchanged = path.read_bytes() == data
+    except OSError:
+        unchanged = False
+
+    if not unchanged:
+        with atomic_write(path, 'wb') as f:
+            f.write(data)
+    if not unchanged or siblings_missing(path):
+        write_compressed(path)
+    return not unchanged
+
+
+def write_json(path: Path, data: Any) -> bool:
+    """
+    Publish a JSON value (and its precompressed siblings, if enabled)
+
+    Args:
+        path: Published file
+        data: JSON-serializable value
+
+    Returns:
+        bool: True if the file was rewritten
+    """
+    return write_bytes(path, encode(data))
+
+
+def remove(path: Path):
+    """Delete a published file and its precompressed siblings"""
+    path = Path(path)
+    for name in [path.name] + [path.name + suffix for suffix in SIBLING_SUFFIXES]:
+        with contextlib.suppress(FileNotFoundError):
+            path.with_name(name).unlink()
+
+
+def export_store(store, path: Path, force: bool = False) -> bool:
+    """
+    Export a store's aggregate events.json in published form
+
+    Args:
+        store: Event store (ShardedEventStore or SQLiteEventStore)
+        path: Aggregate file
+        force: Rewrite even if the aggregate is up to date
+
+    Returns:
+        bool: True if the aggregate was rewritten
+    """
+    exported = store.export_aggregate(path, force=force, compact=minify())
+    if exported or siblings_missing(path):
+        write_compressed(path)
+    return exported
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Event History Query Tool
+========================
+
+Command-line queries against the SQLite event store (sqlite_store.py),
+answered from its indexes without loading the history into memory.
+
+Usage:
+    python scripts/query_events.py --from 2026-01-01 --to 2026-01-31 --category Community
+    python scripts/query_events.py --tag concert --event-from 2026-06-01 --limit 20
+    python scripts/query_events.py --link https://example.com/story --format json
+    python scripts/query_events.py --search "farmers market"
+    python scripts/query_events.py --stats
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+from sqlite_store import SQLiteEventStore
+
+DEFAULT_DB = Path(__file__).parent / '_events_store' / 'events.sqlite3'
+
+
+def print_stats(store: SQLiteEventStore):
+    """Print per-month counts and the most common categories and tags"""
+    manifest = store.manifest
+    total = sum(shard['events'] for shard in manifest['shards'].values())
+    print(f"{total} events on {sum(shard['dates'] for shard in manifest['shards'].values())} dates")
+    for month, shard in sorted(manifest['shards'].items(), reverse=True):
+        print(f"  {month}: {shard['events']:>6} events, {shard['dates']:>3} dates")
+
+    print("\nCategories:")
+    for row in store.conn.execute(
+        'SELECT category, COUNT(*) AS n FROM events GROUP BY category ORDER BY n DESC'
+    ):
+        print(f"  {row['n']:>6}  {row['category']}")
+
+    print("\nTop tags:")
+    for row in store.conn.execute(
+        'SELECT tag, COUNT(*) AS n FROM event_tags GROUP BY tag ORDER BY n DESC LIMIT 20'
+    ):
+        print(f"  {row['n']:>6}  {row['tag']}")
+
+
+def print_table(events: List[Dict[str, Any]]):
+    for event in events:
+        print(f"{event['date']}  {event.get('category', ''):<16} {event.get('title', '')}")
+        print(f"{'':12}{event.get('link', '')}")
+    print(f"\n{len(events)} events")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', type=Path, default=DEFAULT_DB, help='SQLite store to query')
+    parser.add_argument('--from', dest='date_from', help='First date bucket (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='date_to', help='Last date bucket (YYYY-MM-DD)')
+    parser.add_argument('--event-from', help='Earliest event_date')
+    parser.add_argument('--event-to', help='Latest event_date')
+    parser.add_argument('--category', help='Exact category')
+    parser.add_argument('--tag', help='Exact tag')
+    parser.add_argument('--link', help='Exact link')
+    parser.add_argument('--search', help='Text to look for in titles and descriptions')
+    parser.add_argument('--limit', type=int, help='Maximum number of events')
+    parser.add_argument('--format', choices=('table', 'json'), default='table')
+    parser.add_argument('--stats', action='store_true', help='Show counts instead of events')
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"✗ No event store at {args.db}", file=sys.stderr)
+        sys.exit(1)
+
+    store = SQLiteEventStore(args.db)
+    try:
+        if args.stats:
+            print_stats(store)
+            return
+
+        events = store.find_events(
+            date_from=args.date_from,
+            date_to=args.date_to,
+            category=args.category,
+            tag=args.tag,
+            link=args.link,
+            event_from=args.event_from,
+            event_to=args.event_to,
+            text=args.search,
+            limit=args.limit
+        )
+        if args.format == 'json':
+            json.dump(events, sys.stdout, indent=2, ensure_ascii=False)
+            print()
+        else:
+            print_table(events)
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Per-Query Search Watermarks
+===========================
+
+Remembers, for every search query, up to when its results have been
+dealt with and which of its result links were analyzed. The next run then
+asks Google only for pages indexed since then (the `dateRestrict`
+parameter, with one day of overlap) and drops results whose links were
+already analyzed, so a daily run only sends genuinely new results on to
+the LLM.
+
+A link is only recorded once its result has been analyzed (see
+mark_analyzed()), and a query's watermark only moves forward when every
+new result it returned was either analyzed or passed over by the
+prefilter. Results cut by the run's result limit or lost to a failed LLM
+call are therefore fetched again next time. Results passed over by the
+prefilter (already stored, off-topic, near-duplicate) are not recorded,
+but don't hold the watermark back.
+
+Watermarks live next to the event store (_events_store/query_watermarks.json)
+and are saved only after the run's events are, so a run that fails part
+way sees the same results again next time. A run whose analysis failed
+outright leaves them untouched.
+
+Settings come from the optional "watermark_config" section of
+config/events.json:
+
+    "watermark_config": {
+        "enabled": true,
+        "max_links_per_query": 200,
+        "expire_days": 30
+    }
+
+Queries not saved for `expire_days` are forgotten (and fetched without
+a date restriction when they come back).
+"""
+
+import json
+import math
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from atomic_io import write_json
+
+WATERMARKS_VERSION = 2
+DEFAULT_MAX_LINKS = 200
+DEFAULT_EXPIRE_DAYS = 30
+DAY_SECONDS = 86400
+
+
+class QueryWatermarks:
+    """
+    Thread-safe store of the watermark and analyzed links of each query
+
+    The file is read on first use; fetches and their outcome are recorded
+    in memory and written by save().
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path],
+        max_links: int = DEFAULT_MAX_LINKS,
+        expire_days: float = DEFAULT_EXPIRE_DAYS,
+        enabled: bool = True
+    ):
+        self.path = Path(path) if path else None
+        self.max_links = max(1, max_links)
+        self.expire_days = expire_days
+        self.enabled = enabled and self.path is not None
+        self.skipped = 0
+        self.failed = 0
+        self._queries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._seen: Dict[str, set] = {}
+        self._fetched: Dict[str, Dict[str, Any]] = {}
+        self._analyzed: set = set()
+        self._passed_over: set = set()
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        # Caller holds self._lock
+        if self._queries is None:
+            self._queries = {}
+            if self.path.exists():
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        self._queries = json.load(f).get('queries', {})
+                except (OSError, ValueError) as e:
+                    print(f"⚠ Ignoring unreadable query watermarks {self.path}: {e}")
+        return self._queries
+
+    def date_restrict(self, query: str) -> Optional[str]:
+        """
+        Google `dateRestrict` value covering everything since the query's last fetch
+
+        Args:
+            query: Search query
+
+        Returns:
+            str: e.g. "d2", or None if the query has no (live) watermark
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._load().get(query)
+        if not entry or entry.get('fetched_at') is None:
+            return None
+
+        elapsed = time.time() - entry['fetched_at']
+        if elapsed > self.expire_days * DAY_SECONDS:
+            return None
+        # One extra day: Google's index dates are coarse and may lag
+        return f"d{max(1, math.ceil(elapsed / DAY_SECONDS)) + 1}"
+
+    def filter_new(self, query: str, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Record a fetch and drop the results already analyzed for the query
+
+        Args:
+            query: Search query
+            results: Results with a 'link'
+
+        Returns:
+            list: Results with links not analyzed on earlier runs nor
+                  returned earlier in this one, in order
+        """
+        if not self.enabled:
+            return results
+
+        with self._lock:
+            if query not in self._seen:
+                entry = self._load().get(query) or {}
+                self._seen[query] = set(entry.get('links', []))
+            seen = self._seen[query]
+
+            new_results = [result for result in results if result.get('link') not in seen]
+            self.skipped += len(results) - len(new_results)
+            seen.update(result.get('link') for result in new_results)
+
+            fetched = self._fetched.setdefault(query, {'fetched_at': time.time(), 'links': []})
+            fetched['links'].extend(result['link'] for result in new_results if result.get('link'))
+
+        return new_results
+
+    def mark_analyzed(self, results: List[Dict[str, Any]]):
+        """Record results the LLM analyzed successfully (their links are saved)"""
+        if self.enabled:
+            with self._lock:
+                self._analyzed.update(result.get('link') for result in results)
+
+    def mark_passed_over(self, results: List[Dict[str, Any]]):
+        """Record results the prefilter dropped (not saved, but dealt with)"""
+        if self.enabled:
+            with self._lock:
+                self._passed_over.update(result.get('link') for result in results)
+
+    def mark_failed(self, results: List[Dict[str, Any]]):
+        """Record results whose analysis failed (they are fetched again next run)"""
+        if self.enabled:
+            with self._lock:
+                self.failed += len(results)
+
+    def save(self):
+        """Merge this run's analyzed links into the file and drop expired queries"""
+        if not self.enabled or not self._fetched:
+            return
+        if self.failed and not self._analyzed:
+            print("⚠ Search result analysis failed; query watermarks left unchanged")
+            return
+
+        with self._lock:
+            queries = self._load()
+            now = time.time()
+            for query, fetched in self._fetched.items():
+                entry = queries.get(query, {})
+                analyzed = [link for link in fetched['links'] if link in self._analyzed]
+                # Newest first, so the cap keeps the most recent links
+                links = list(dict.fromkeys(analyzed[::-1] + entry.get('links', [])))[:self.max_links]
+
+                # Move the watermark only if no new result was left unhandled
+                handled = all(link in self._analyzed or link in self._passed_over for link in fetched['links'])
+                fetched_at = fetched['fetched_at'] if handled else entry.get('fetched_at')
+
+                if links or fetched_at is not None:
+                    queries[query] = {'fetched_at': fetched_at, 'saved_at': now, 'links': links}
+
+            horizon = now - self.expire_days * DAY_SECONDS
+            self._queries = {
+                q: entry for q, entry in queries.items()
+                if entry.get('saved_at', entry.get('fetched_at') or 0) >= horizon
+            }
+            self._fetched = {}
+            self._seen = {}
+            self._analyzed = set()
+            self._passed_over = set()
+            self.failed = 0
+
+            write_json(self.path, {'version': WATERMARKS_VERSION, 'queries': self._queries},
+                       ensure_ascii=False, separators=(',', ':'))
+
+
+_watermarks = QueryWatermarks(None, enabled=False)
+
+
+def configure(watermark_config: Optional[Dict[str, Any]], path: Path) -> QueryWatermarks:
+    """
+    Create the process-wide watermark store from the "watermark_config" section
+
+    Args:
+        watermark_config: Watermark settings (optional, defaults apply)
+        path: Watermark file
+
+    Returns:
+        QueryWatermarks: The configured store
+    """
+    global _watermarks
+
+    watermark_config = watermark_config or {}
+    _watermarks = QueryWatermarks(
+        path=path,
+        max_links=int(watermark_config.get('max_links_per_query', DEFAULT_MAX_LINKS)),
+        expire_days=float(watermark_config.get('expire_days', DEFAULT_EXPIRE_DAYS)),
+        enabled=watermark_config.get('enabled', True)
+    )
+    return _watermarks
+
+
+def get_watermarks() -> QueryWatermarks:
+    """
+    Get the process-wide watermark store (disabled until configured)
+
+    Returns:
+        QueryWatermarks: Shared store
+    """
+    return _watermarks
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Request Rate Limiting
+=====================
+
+Token buckets that pace requests to rate-limited APIs (Google Custom
+Search allows a fixed number of queries per second per key):
+
+- TokenBucket: shared by the threads of one process
+- SharedTokenBucket: state in shared memory, so worker processes started
+  after it was created (one per location) all draw from the same budget
+"""
+
+import multiprocessing
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter
+
+    Tokens refill continuously at `rate` per second up to `capacity`.
+    Each call to acquire() consumes one token, blocking until one is available.
+    """
+
+    _clock = staticmethod(time.monotonic)
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = self._clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it"""
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait_time = (1 - self._tokens) / self.rate
+
+            time.sleep(wait_time)
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    TokenBucket whose state lives in shared memory
+
+    Created in the parent process before the location workers start, so
+    every worker draws from one request budget instead of each getting
+    its own.
+    """
+
+    # time.monotonic() has no defined reference point across processes
+    _clock = staticmethod(time.time)
+
+    def __init__(self, rate: float, capacity: int = 1, context=None):
+        context = context or multiprocessing.get_context()
+        self._shared_tokens = context.RawValue('d', 0.0)
+        self._shared_updated = context.RawValue('d', 0.0)
+        super().__init__(rate, capacity)
+        self._lock = context.Lock()
+
+    @property
+    def _tokens(self) -> float:
+        return self._shared_tokens.value
+
+    @_tokens.setter
+    def _tokens(self, value: float):
+        self._shared_tokens.value = value
+
+    @property
+    def _updated(self) -> float:
+        return self._shared_updated.value
+
+    @_updated.setter
+    def _updated(self, value: float):
+        self._shared_updated.value = value
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+On-Disk Response Cache
+======================
+
+Content-addressed cache for search results and LLM completions, so a
+rerun of the daily job (workflow_dispatch or a retry after a failure)
+doesn't pay again for identical requests.
+
+Entries are stored as JSON files named by the SHA-256 of their key, expire
+after a TTL, and the oldest entries are evicted once the cache grows past
+its size limit. Settings come from the optional "cache_config" section of
+config/events.json:
+
+    "cache_config": {
+        "enabled": true,
+        "directory": ".cache/responses",
+        "ttl_hours": 24,
+        "max_size_mb": 50
+    }
+
+A relative directory is resolved against the scripts/ directory.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_DIRECTORY = Path(__file__).parent / '.cache' / 'responses'
+DEFAULT_TTL_HOURS = 24
+DEFAULT_MAX_SIZE_MB = 50
+
+
+class ResponseCache:
+    """
+    Content-addressed JSON cache with TTL and size-based eviction
+
+    Keys are any JSON-serializable value; they are hashed together with a
+    namespace ("google", "openai", ...) to locate the entry file.
+    """
+
+    def __init__(self, directory: Path, ttl_seconds: float, max_bytes: int, enabled: bool = True):
+        self.directory = Path(directory)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(namespace: str, key: Any) -> str:
+        """Hash a namespace and JSON-serializable key into a hex digest"""
+        payload = json.dumps([namespace, key], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, digest: str) -> Path:
+        return self.directory / digest[:2] / f'{digest}.json'
+
+    def get(self, namespace: str, key: Any) -> Optional[Any]:
+        """
+        Look up a cached value
+
+        Args:
+            namespace: Cache namespace (e.g. "google", "openai")
+            key: JSON-serializable key
+
+        Returns:
+            The cached value, or None on a miss or expired entry
+        """
+        if not self.enabled:
+            return None
+
+        path = self._path(self.make_key(namespace, key))
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        if time.time() - entry.get('created', 0) > self.ttl_seconds:
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        # Touch so eviction drops least recently used entries first
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return entry['value']
+
+    def set(self, namespace: str, key: Any, value: Any):
+        """
+        Store a value, evicting old entries if the cache is over its size limit
+
+        Args:
+            namespace: Cache namespace (e.g. "google", "openai")
+            key: JSON-serializable key
+            value: JSON-serializable value
+        """
+        if not self.enabled:
+            return
+
+        path = self._path(self.make_key(namespace, key))
+        data = json.dumps({'created': time.time(), 'value': value}, ensure_ascii=False).encode('utf-8')
+
+        try:
+            old_size = path.stat().st_size
+        except OSError:
+            old_size = 0
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"  ⚠ Could not write cache entry: {e}")
+            return
+
+        with self._lock:
+            if self._size is not None:
+                self._size += len(data) - old_size
+        self._evict_if_needed()
+
+    def _remove(self, path: Path):
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size -= size
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        # Worker processes share the directory, so an entry listed by glob
+        # may be gone (evicted or expired elsewhere) by the time it is stat'ed
+        entries = []
+        for path in self.directory.glob('*/*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict_if_needed(self):
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            if self._size <= self.max_bytes:
+                return
+
+            # Drop least recently used entries until 90% of the limit
+            entries = sorted(self._entries(), key=lambda e: e[0])
+            target = self.max_bytes * 0.9
+            for _, size, path in entries:
+                if self._size <= target:
+                    break
+                try:
+                    path.unlink()
+                    self._size -= size
+                except OSError:
+                    pass
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def configure(cache_config: Optional[Dict[str, Any]] = None) -> ResponseCache:
+    """
+    Create the process-wide cache from the "cache_config" section
+
+    Args:
+        cache_config: Cache settings (optional, defaults apply)
+
+    Returns:
+        ResponseCache: The configured cache
+    """
+    global _cache
+
+    cache_config = cache_config or {}
+    directory = Path(cache_config.get('directory', DEFAULT_DIRECTORY))
+    if not directory.is_absolute():
+        directory = Path(__file__).parent / directory
+
+    _cache = ResponseCache(
+        directory=directory,
+        ttl_seconds=float(cache_config.get('ttl_hours', DEFAULT_TTL_HOURS)) * 3600,
+        max_bytes=int(float(cache_config.get('max_size_mb', DEFAULT_MAX_SIZE_MB)) * 1024 * 1024),
+        enabled=cache_config.get('enabled', True)
+    )
+    return _cache
+
+
+def get_cache() -> ResponseCache:
+    """
+    Get the process-wide cache, configuring it with defaults on first use
+
+    Returns:
+        ResponseCache: Shared cache instance
+    """
+    if _cache is None:
+        return configure()
+    return _cache
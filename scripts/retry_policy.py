@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Shared Retry Policy
+===================
+
+One retry policy for every API the pipeline calls (Google Custom Search,
+OpenAI, X.AI):
+
+- Exponential backoff with full jitter between attempts
+- HTTP 429/503 "Retry-After" headers are honoured exactly
+- A per-run retry budget (total seconds spent waiting), so a flaky
+  provider can't burn minutes of CI time
+- A circuit breaker per endpoint: after repeated provider failures
+  (connection errors, timeouts, 5xx) further calls fail fast until a
+  cool-down has passed
+
+Client errors other than 408/429 (e.g. 401 bad API key) are not retried.
+
+Settings come from the optional "retry_config" section of config/events.json:
+
+    "retry_config": {
+        "base_delay_seconds": 1,
+        "max_delay_seconds": 30,
+        "budget_seconds": 180,
+        "breaker_failure_threshold": 5,
+        "breaker_cooldown_seconds": 60
+    }
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import requests
+
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 30.0
+DEFAULT_BUDGET = 180.0
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_COOLDOWN = 60.0
+
+RETRYABLE_STATUS = {408, 429}
+
+
+def status_code_of(error: BaseException) -> Optional[int]:
+    """HTTP status carried by a requests or OpenAI SDK exception, if any"""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """
+    Delay requested by the server through a Retry-After header
+
+    Args:
+        error: Exception raised by a requests or OpenAI SDK call
+
+    Returns:
+        float: Seconds to wait, or None if the server didn't say
+    """
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+
+    value = headers.get('retry-after-ms')
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+
+    value = headers.get('retry-after')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def is_provider_failure(error: BaseException) -> bool:
+    """True for errors that mean the provider is unreachable or failing (5xx, connection, timeout)"""
+    status = status_code_of(error)
+    if status is not None:
+        return status >= 500
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                          ConnectionError, TimeoutError)):
+        return True
+    # OpenAI SDK wraps transport errors as APIConnectionError / APITimeoutError
+    return type(error).__name__ in ('APIConnectionError', 'APITimeoutError')
+
+
+def is_retryable(error: BaseException) -> bool:
+    """False for client errors that will fail the same way again (400, 401, 403, 404, ...)"""
+    status = status_code_of(error)
+    if status is None:
+        return True
+    return status >= 500 or status in RETRYABLE_STATUS
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one endpoint
+
+    Closed: calls go through. After `threshold` consecutive provider
+    failures it opens and calls fail fast for `cooldown` seconds; then one
+    trial call is let through (half-open), which closes it on success or
+    re-opens it on failure.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        """True if a call may be made now"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.cooldown or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class RetryPolicy:
+    """
+    Backoff, retry budget and per-endpoint circuit breakers for one run
+
+    Typical use inside an attempt loop:
+
+        if not policy.allow('xai'):
+            break                      # provider is down, fail fast
+        try:
+            ...
+            policy.record_success('xai')
+        except Exception as e:
+            policy.record_failure('xai', e)
+            if attempt < max_retries - 1 and policy.wait(attempt, e, 'xai'):
+                continue
+            break
+    """
+
+    def __init__(
+        self,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        budget_seconds: float = DEFAULT_BUDGET,
+        breaker_threshold: int = DEFAULT_BREAKER_THRESHOLD,
+        breaker_cooldown: float = DEFAULT_BREAKER_COOLDOWN,
+        seed: Optional[int] = None
+    ):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_seconds = budget_seconds
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.budget_used = 0.0
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        with self._lock:
+            if endpoint not in self.breakers:
+                self.breakers[endpoint] = CircuitBreaker(self.breaker_threshold, self.breaker_cooldown)
+            return self.breakers[endpoint]
+
+    def allow(self, endpoint: str) -> bool:
+        """False if the endpoint's circuit breaker is open (skip the call)"""
+        return self.breaker(endpoint).allow()
+
+    def record_success(self, endpoint: str):
+        self.breaker(endpoint).record_success()
+
+    def record_failure(self, endpoint: str, error: BaseException):
+        """
+        Count a failed call
+
+        Only provider failures (5xx, connection, timeout) trip the breaker;
+        any other error means the provider answered, so it counts as up.
+        """
+        if is_provider_failure(error):
+            self.breaker(endpoint).record_failure()
+        else:
+            self.breaker(endpoint).record_success()
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """
+        Delay before the next attempt
+
+        Args:
+            attempt: Zero-based number of the attempt that just failed
+            error: The exception it raised
+
+        Returns:
+            float: The server's Retry-After if given, otherwise a full-jitter
+                exponential backoff capped at max_delay
+        """
+        requested = retry_after_seconds(error) if error is not None else None
+        if requested is not None:
+            return requested
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        with self._lock:
+            return self._random.uniform(0, ceiling)
+
+    def wait(self, attempt: int, error: BaseException, endpoint: str) -> bool:
+        """
+        Sleep before retrying, if a retry is worthwhile
+
+        Args:
+            attempt: Zero-based number of the attempt that just failed
+            error: The exception it raised
+            endpoint: Endpoint name (e.g. "google", "openai", "xai")
+
+        Returns:
+            bool: True after sleeping; False if the caller should give up
+                (non-retryable error, open circuit or exhausted budget)
+        """
+        if not is_retryable(error) or self.breaker(endpoint).is_open:
+            return False
+
+        delay = self.backoff(attempt, error)
+        with self._lock:
+            if self.budget_used + delay > self.budget_seconds:
+                return False
+            self.budget_used += delay
+
+        time.sleep(delay)
+        return True
+
+    def summary(self) -> Dict[str, Any]:
+        """Budget used and breaker states, for the run report"""
+        return {
+            'budget_seconds': self.budget_seconds,
+            'budget_used_seconds': round(self.budget_used, 3),
+            'open_circuits': sorted(name for name, breaker in self.breakers.items() if breaker.is_open)
+        }
+
+
+_policy = RetryPolicy()
+
+
+def configure(retry_config: Optional[Dict[str, Any]] = None) -> RetryPolicy:
+    """
+    Start a fresh policy (new budget, closed breakers) from the "retry_config" section
+
+    Args:
+        retry_config: The "retry_config" section of the configuration (optional)
+
+    Returns:
+        RetryPolicy: The new process-wide policy
+    """
+    global _policy
+    retry_config = retry_config or {}
+    _policy = RetryPolicy(
+        base_delay=float(retry_config.get('base_delay_seconds', DEFAULT_BASE_DELAY)),
+        max_delay=float(retry_config.get('max_delay_seconds', DEFAULT_MAX_DELAY)),
+        budget_seconds=float(retry_config.get('budget_seconds', DEFAULT_BUDGET)),
+        breaker_threshold=int(retry_config.get('breaker_failure_threshold', DEFAULT_BREAKER_THRESHOLD)),
+        breaker_cooldown=float(retry_config.get('breaker_cooldown_seconds', DEFAULT_BREAKER_COOLDOWN))
+    )
+    return _policy
+
+
+def get_policy() -> RetryPolicy:
+    """Get the process-wide retry policy"""
+    return _policy
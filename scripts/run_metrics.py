@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Run Metrics
+===========
+
+Per-stage instrumentation for a pipeline run: wall time, request and retry
+counts, bytes sent/received, cache hits and the prompt/completion token
+usage reported by the LLM APIs. At the end of a run the metrics are written
+as a JSON report.
+
+Token cost is computed only for models listed in the optional
+"metrics_config.pricing" section of config/events.json (USD per million
+tokens), since provider prices change:
+
+    "metrics_config": {
+        "pricing": {
+            "gpt-5-mini": {"prompt_per_million": 0.25, "completion_per_million": 2.0}
+        }
+    }
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+COUNTERS = (
+    'calls', 'requests', 'retries', 'cache_hits',
+    'bytes_in', 'bytes_out', 'prompt_tokens', 'completion_tokens'
+)
+
+
+class RunMetrics:
+    """
+    Thread-safe collector of per-stage timings and counters
+
+    Stages are named freely; the same name can be timed with stage() in
+    main() and receive counters via add()/add_usage() from worker threads.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now(timezone.utc)
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, name: str) -> Dict[str, Any]:
+        if name not in self.stages:
+            self.stages[name] = {'wall_seconds': 0.0, **{counter: 0 for counter in COUNTERS}, 'models': {}}
+        return self.stages[name]
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a block of code as (part of) the named stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                entry = self._entry(name)
+                entry['wall_seconds'] += elapsed
+                entry['calls'] += 1
+
+    def add(self, name: str, **counters: int):
+        """
+        Add to a stage's counters
+
+        Args:
+            name: Stage name
+            **counters: Increments for any of COUNTERS (e.g. requests=1, bytes_in=512)
+        """
+        with self._lock:
+            entry = self._entry(name)
+            for counter, value in counters.items():
+                entry[counter] += value
+
+    def add_usage(self, name: str, model: str, prompt_tokens: int, completion_tokens: int):
+        """
+        Record token usage returned by an LLM API
+
+        Args:
+            name: Stage name
+            model: Model the tokens were billed against
+            prompt_tokens: Prompt (input) tokens
+            completion_tokens: Completion (output) tokens
+        """
+        with self._lock:
+            entry = self._entry(name)
+            entry['prompt_tokens'] += prompt_tokens
+            entry['completion_tokens'] += completion_tokens
+            usage = entry['models'].setdefault(model, {'prompt_tokens': 0, 'completion_tokens': 0})
+            usage['prompt_tokens'] += prompt_tokens
+            usage['completion_tokens'] += completion_tokens
+
+    def report(self, pricing: Optional[Dict[str, Dict[str, float]]] = None, **extra: Any) -> Dict[str, Any]:
+        """
+        Build the run report
+
+        Args:
+            pricing: model -> {"prompt_per_million", "completion_per_million"} in USD
+            **extra: Additional top-level fields (e.g. status)
+
+        Returns:
+            dict: JSON-serializable report
+        """
+        pricing = pricing or {}
+
+        with self._lock:
+            stages = json.loads(json.dumps(self.stages))
+
+        totals = {counter: sum(stage[counter] for stage in stages.values()) for counter in COUNTERS[1:]}
+        cost = 0.0
+        priced = False
+
+        for stage in stages.values():
+            stage['wall_seconds'] = round(stage['wall_seconds'], 3)
+            for model, usage in stage['models'].items():
+                if model in pricing:
+                    price = pricing[model]
+                    usage['cost_usd'] = round(
+                        usage['prompt_tokens'] * price.get('prompt_per_million', 0) / 1_000_000
+                        + usage['completion_tokens'] * price.get('completion_per_million', 0) / 1_000_000,
+                        6
+                    )
+                    cost += usage['cost_usd']
+                    priced = True
+
+        finished_at = datetime.now(timezone.utc)
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'finished_at': finished_at.isoformat(timespec='seconds'),
+            'wall_seconds': round((finished_at - self.started_at).total_seconds(), 3),
+            **extra,
+            'totals': {**totals, 'cost_usd': round(cost, 6) if priced else None},
+            'stages': stages
+        }
+
+    def write_report(self, path: Path, pricing: Optional[Dict[str, Dict[str, float]]] = None, **extra: Any) -> Dict[str, Any]:
+        """
+        Write the run report as JSON
+
+        Args:
+            path: Report file path
+            pricing: See report()
+            **extra: See report()
+
+        Returns:
+            dict: The report that was written
+        """
+        report = self.report(pricing, **extra)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        return report
+
+
+_metrics = RunMetrics()
+
+
+def get_metrics() -> RunMetrics:
+    """Get the process-wide metrics collector"""
+    return _metrics
+
+
+def reset() -> RunMetrics:
+    """Start a fresh collector (e.g. at the beginning of a run)"""
+    global _metrics
+    _metrics = RunMetrics()
+    return _metrics
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Precomputed Site Indexes
+========================
+
+Small JSON files written next to the aggregate events.json, so a page can
+fetch just the slice it shows instead of parsing the whole history:
+
+    index/manifest.json              counts and file names of everything below
+    index/latest.json                the newest `latest_count` events
+    index/category/<slug>.json       events of one category
+    index/tag/<slug>.json            events carrying one tag
+    index/event-month/<YYYY-MM>.json events taking place in one month
+
+Every entry is a stored event with its "found_date". Files list the newest
+finds first, except event-month files, which are ordered by event_date.
+Events without a parseable event_date ("unknown") only appear in the
+other indexes.
+
+Files are published like events.json (minified, with .gz/.br siblings,
+see published_output.py) and only rewritten when their content changes,
+so an unchanged index keeps its HTTP cache validators and makes no git
+diff. Files of categories, tags or months that no longer have events
+are removed.
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import published_output
+
+DEFAULT_LATEST_COUNT = 50
+INDEX_DIRECTORY = 'index'
+
+EVENT_MONTH = re.compile(r'^(\d{4}-\d{2})')
+
+
+def slugify(name: str) -> str:
+    """File name for a category or tag ("Road Closure" -> "road-closure")"""
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+class _Group:
+    """Events of one index file, and the names (categories or tags) mapped to it"""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.events: List[Dict[str, Any]] = []
+        self._ids = set()
+
+    def add(self, name: str, event: Dict[str, Any]):
+        if name not in self.names:
+            self.names.append(name)
+        # Two tags with the same slug share a file; list each event once
+        if id(event) not in self._ids:
+            self._ids.add(id(event))
+            self.events.append(event)
+
+
+def build_site_indexes(store, latest_count: int = DEFAULT_LATEST_COUNT) -> Dict[str, Any]:
+    """
+    Group every stored event into the index files
+
+    Args:
+        store: Event store (ShardedEventStore or SQLiteEventStore)
+        latest_count: Number of events in latest.json
+
+    Returns:
+        dict: Relative file path -> content, including "manifest.json"
+    """
+    categories: Dict[str, _Group] = {}
+    tags: Dict[str, _Group] = {}
+    event_months: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+    latest: List[Dict[str, Any]] = []
+    total = 0
+    updated = None
+
+    # Months and dates newest first, so every list comes out newest first
+    for month in store.months:
+        shard = store.load_month(month)
+        for date in sorted(shard, reverse=True):
+            updated = updated or date
+            for stored in shard[date]:
+                event = stored if 'found_date' in stored else {**stored, 'found_date': date}
+                total += 1
+                if len(latest) < latest_count:
+                    latest.append(event)
+
+                category = event.get('category')
+                if category and slugify(category):
+                    categories.setdefault(slugify(category), _Group()).add(category, event)
+                for tag in event.get('tags') or []:
+                    if isinstance(tag, str) and slugify(tag):
+                        tags.setdefault(slugify(tag), _Group()).add(tag, event)
+
+                match = EVENT_MONTH.match(str(event.get('event_date') or ''))
+                if match:
+                    event_months.setdefault(match.group(1), []).append((str(event['event_date']), event))
+
+    files: Dict[str, Any] = {'latest.json': latest}
+    manifest: Dict[str, Any] = {
+        'updated': updated,
+        'events': total,
+        'latest': {'file': 'latest.json', 'count': len(latest)},
+        'categories': {},
+        'tags': {},
+        'event_months': {}
+    }
+
+    for kind, groups in (('category', categories), ('tag', tags)):
+        section = manifest['categories' if kind == 'category' else 'tags']
+        for slug, group in sorted(groups.items()):
+            file = f'{kind}/{slug}.json'
+            files[file] = group.events
+            for name in group.names:
+                section[name] = {'file': file, 'count': len(group.events)}
+
+    for month, dated in sorted(event_months.items()):
+        file = f'event-month/{month}.json'
+        # Stable sort: same-day events keep the newest-found-first order
+        files[file] = [event for _, event in sorted(dated, key=lambda item: item[0])]
+        manifest['event_months'][month] = {'file': file, 'count': len(dated)}
+
+    files['manifest.json'] = manifest
+    return files
+
+
+def write_site_indexes(store, directory: Path, latest_count: int = DEFAULT_LATEST_COUNT) -> Dict[str, int]:
+    """
+    Write the index files under `directory`/index/, touching only changed files
+
+    Args:
+        store: Event store (ShardedEventStore or SQLiteEventStore)
+        directory: Directory holding the aggregate events.json
+        latest_count: Number of events in latest.json
+
+    Returns:
+        dict: {'files', 'written', 'removed'} counts
+    """
+    root = Path(directory) / INDEX_DIRECTORY
+    files = build_site_indexes(store, latest_count)
+
+    written = 0
+    # The manifest last, so it never points at a file that isn't there yet
+    for name in sorted(files, key=lambda name: name == 'manifest.json'):
+        if published_output.write_json(root / name, files[name]):
+            written += 1
+
+    removed = 0
+    for path in root.glob('*/*.json'):
+        if path.relative_to(root).as_posix() not in files:
+            published_output.remove(path)
+            removed += 1
+
+    return {'files': len(files), 'written': written, 'removed': removed}
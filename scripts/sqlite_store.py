@@ -0,0 +1,632 @@
+#!/usr/bin/env python3
+"""
+SQLite Event Store
+==================
+
+Columnar alternative to the sharded JSON store: one row per event in a
+single SQLite file, with indexes for date ranges and categories. It exposes
+the same interface as ShardedEventStore (months, load_month, load_date,
+save_months, drop_months, load_links, export_aggregate, ...), so
+IndexedEvents and the load/merge/cleanup/save functions work unchanged on
+either backend.
+
+Compared with pretty-printed JSON, the history takes a fraction of the disk
+space, months load without parsing unrelated dates, and date/category
+queries (query_events, find_events) run against indexes. The events.json
+the site reads is still exported as JSON.
+
+Beyond the shared interface, the SQLite store never needs the whole history
+in memory: the link index is looked up per link (SQLiteLinkIndex), saving a
+month upserts its rows, and retention cleanup is one ranged DELETE
+(delete_before).
+
+Schema:
+
+    events(date, position, category, title, description, link, tags,
+           event_date, found_date, extra)
+        date/position: the date bucket and list index in events.json
+        tags: JSON array; extra: JSON object of any non-standard fields
+        indexed on link, found_date, event_date and category
+    event_tags(tag, date, position)    one row per tag, kept in sync by triggers
+    links(link, date, position)        persisted link index
+    near_duplicates(link, value)       persisted near-duplicate index
+    meta(key, value)                   schema version, aggregate_stale flag, generation
+"""
+
+import json
+import sqlite3
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from atomic_io import DEFAULT_LOCK_TIMEOUT, FileLock, MergeJournal, write_json
+
+EventsDict = Dict[str, List[Dict[str, Any]]]
+
+EVENT_FIELDS = ('category', 'title', 'description', 'link', 'tags', 'event_date', 'found_date')
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    date TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    category TEXT,
+    title TEXT,
+    description TEXT,
+    link TEXT,
+    tags TEXT,
+    event_date TEXT,
+    found_date TEXT,
+    extra TEXT,
+    PRIMARY KEY (date, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_events_category ON events(category, date);
+CREATE INDEX IF NOT EXISTS idx_events_link ON events(link);
+CREATE INDEX IF NOT EXISTS idx_events_found_date ON events(found_date);
+CREATE INDEX IF NOT EXISTS idx_events_event_date ON events(event_date);
+CREATE TABLE IF NOT EXISTS event_tags (
+    tag TEXT NOT NULL,
+    date TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (tag, date, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_event_tags_event ON event_tags(date, position);
+CREATE TRIGGER IF NOT EXISTS events_tags_insert AFTER INSERT ON events BEGIN
+    INSERT OR IGNORE INTO event_tags (tag, date, position)
+        SELECT value, NEW.date, NEW.position FROM json_each(NEW.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS events_tags_update AFTER UPDATE OF tags ON events BEGIN
+    DELETE FROM event_tags WHERE date = OLD.date AND position = OLD.position;
+    INSERT OR IGNORE INTO event_tags (tag, date, position)
+        SELECT value, NEW.date, NEW.position FROM json_each(NEW.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS events_tags_delete AFTER DELETE ON events BEGIN
+    DELETE FROM event_tags WHERE date = OLD.date AND position = OLD.position;
+END;
+CREATE TABLE IF NOT EXISTS links (
+    link TEXT PRIMARY KEY,
+    date TEXT NOT NULL,
+    position INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_links_date ON links(date);
+CREATE TABLE IF NOT EXISTS near_duplicates (
+    link TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+"""
+
+
+def month_range(month: str) -> Tuple[str, str]:
+    """[start, end) date-string bounds for a YYYY-MM month"""
+    year, mon = int(month[:4]), int(month[5:7])
+    following = f'{year + 1:04d}-01' if mon == 12 else f'{year:04d}-{mon + 1:02d}'
+    return f'{month}-01', f'{following}-01'
+
+
+def event_to_row(date: str, position: int, event: Dict[str, Any]) -> tuple:
+    """Flatten an event dict into an events-table row"""
+    extra = {key: value for key, value in event.items() if key not in EVENT_FIELDS}
+    return (
+        date, position,
+        event.get('category'), event.get('title'), event.get('description'), event.get('link'),
+        json.dumps(event['tags'], ensure_ascii=False) if 'tags' in event else None,
+        event.get('event_date'), event.get('found_date'),
+        json.dumps(extra, ensure_ascii=False) if extra else None
+    )
+
+
+def row_to_event(row: sqlite3.Row) -> Dict[str, Any]:
+    """Rebuild the event dict (standard fields first, in events.json order)"""
+    event: Dict[str, Any] = {}
+    for field in EVENT_FIELDS:
+        value = row[field]
+        if value is None:
+            continue
+        event[field] = json.loads(value) if field == 'tags' else value
+    if row['extra']:
+        event.update(json.loads(row['extra']))
+    return event
+
+
+class SQLiteEventStore:
+    """
+    Event history in one SQLite database, interchangeable with ShardedEventStore
+
+    Months are still the unit IndexedEvents loads and rewrites, but each one
+    is a ranged query on the (date, position) primary key rather than a file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.root = self.path.parent
+        self._existed = self.path.exists()
+        self._shards: Dict[str, EventsDict] = {}
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Link lookups also come from search worker threads, and the async
+        # pipeline loads the store on one (SQLite serializes the access)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        version = int(self._meta('schema_version', '1'))
+        if version >= SCHEMA_VERSION:
+            return
+        with self.conn:
+            # Version 1 databases have events but no tag rows yet
+            self.conn.execute(
+                'INSERT OR IGNORE INTO event_tags (tag, date, position) '
+                'SELECT json_each.value, events.date, events.position FROM events, json_each(events.tags)'
+            )
+            self._set_meta('schema_version', str(SCHEMA_VERSION))
+
+    def close(self):
+        self.conn.close()
+
+    def lock(self, timeout: float = DEFAULT_LOCK_TIMEOUT) -> FileLock:
+        """Advisory lock serializing writers of this store (use as a context manager)"""
+        return FileLock(self.root / '.lock', timeout)
+
+    @property
+    def journal(self) -> MergeJournal:
+        """Write-ahead journal of the save in progress"""
+        return MergeJournal(self.root / 'journal.json')
+
+    def current_generation(self) -> int:
+        """Number of saves committed to the database (including by other processes)"""
+        return int(self._meta('generation', '0'))
+
+    def bump_generation(self):
+        """Record that a save has been committed"""
+        with self.conn:
+            self._set_meta('generation', str(self.current_generation() + 1))
+
+    def reopen(self) -> 'SQLiteEventStore':
+        """A fresh handle on the same database, without this one's cached months"""
+        self.close()
+        return SQLiteEventStore(self.path)
+
+    def exists(self) -> bool:
+        """True if the store held data before this process opened it"""
+        return self._existed or self.conn.execute('SELECT 1 FROM events LIMIT 1').fetchone() is not None
+
+    @property
+    def manifest(self) -> Dict[str, Any]:
+        """Per-month date/event counts, in the same shape as the sharded store's manifest"""
+        rows = self.conn.execute(
+            'SELECT substr(date, 1, 7) AS month, COUNT(DISTINCT date) AS dates, COUNT(*) AS events '
+            'FROM events GROUP BY month'
+        )
+        return {
+            'shards': {row['month']: {'dates': row['dates'], 'events': row['events']} for row in rows},
+            'aggregate_stale': self._meta('aggregate_stale', 'true') == 'true'
+        }
+
+    def _meta(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row['value'] if row else default
+
+    def _set_meta(self, key: str, value: str):
+        self.conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    @property
+    def months(self) -> List[str]:
+        """All stored months, newest first"""
+        rows = self.conn.execute('SELECT DISTINCT substr(date, 1, 7) AS month FROM events ORDER BY month DESC')
+        return [row['month'] for row in rows]
+
+    def months_before(self, cutoff_date: str) -> Set[str]:
+        """Months whose every date is strictly older than cutoff_date"""
+        cutoff_month = cutoff_date[:7]
+        return {month for month in self.months if month < cutoff_month}
+
+    def _select(self, where: str = '', params: tuple = ()) -> Iterator[sqlite3.Row]:
+        return self.conn.execute(f'SELECT * FROM events {where} ORDER BY date DESC, position', params)
+
+    def _group(self, rows: Iterable[sqlite3.Row]) -> EventsDict:
+        events: EventsDict = {}
+        for row in rows:
+            events.setdefault(row['date'], []).append(row_to_event(row))
+        return events
+
+    def load_month(self, month: str) -> EventsDict:
+        """
+        Load one month (cached after the first read)
+
+        Args:
+            month: Month key (YYYY-MM)
+
+        Returns:
+            dict: date -> list of events for that month (empty if absent)
+        """
+        if month not in self._shards:
+            start, end = month_range(month)
+            self._shards[month] = self._group(self._select('WHERE date >= ? AND date < ?', (start, end)))
+        return self._shards[month]
+
+    def dates_in_month(self, month: str) -> List[str]:
+        """Dates stored in a month, without loading their events"""
+        start, end = month_range(month)
+        rows = self.conn.execute(
+            'SELECT DISTINCT date FROM events WHERE date >= ? AND date < ? ORDER BY date DESC', (start, end)
+        )
+        return [row['date'] for row in rows]
+
+    def load_date(self, date: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Load one date's events
+
+        Args:
+            date: Date string (YYYY-MM-DD)
+
+        Returns:
+            list: Events stored for that date, or None if there are none
+        """
+        month = date[:7]
+        if month in self._shards:
+            return self._shards[month].get(date)
+        return self._group(self._select('WHERE date = ?', (date,))).get(date)
+
+    def load_months(self, months: Iterable[str]) -> EventsDict:
+        """Load several months and return their dates merged into one dict"""
+        events: EventsDict = {}
+        for month in months:
+            events.update(self.load_month(month))
+        return events
+
+    def load_all(self) -> EventsDict:
+        """Load the full history"""
+        return self.load_months(self.months)
+
+    def query_events(
+        self,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        category: Optional[str] = None
+    ) -> EventsDict:
+        """
+        Events in an inclusive date range, optionally of one category
+
+        Args:
+            date_from: First date (YYYY-MM-DD), unbounded if None
+            date_to: Last date (YYYY-MM-DD), unbounded if None
+            category: Exact category name
+
+        Returns:
+            dict: date -> list of matching events, newest date first
+        """
+        clauses, params = [], []
+        if date_from:
+            clauses.append('date >= ?')
+            params.append(date_from)
+        if date_to:
+            clauses.append('date <= ?')
+            params.append(date_to)
+        if category:
+            clauses.append('category = ?')
+            params.append(category)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return self._group(self._select(where, tuple(params)))
+
+    def load_links(self) -> 'SQLiteLinkIndex':
+        """
+        Open the persisted link index
+
+        Returns:
+            SQLiteLinkIndex: link -> (date, event_index), looked up per link
+                instead of loaded into memory
+        """
+        return SQLiteLinkIndex(self)
+
+    def save_links(self, link_index: Dict[str, tuple]):
+        """Persist the link index (only the pending changes if it is this store's SQLiteLinkIndex)"""
+        if isinstance(link_index, SQLiteLinkIndex) and link_index.store is self:
+            link_index.flush()
+            return
+
+        with self.conn:
+            self.conn.execute('DELETE FROM links')
+            self.conn.executemany(
+                'INSERT INTO links (link, date, position) VALUES (?, ?, ?)',
+                ((link, date, position) for link, (date, position) in link_index.items())
+            )
+
+    def load_near_duplicates(self) -> Optional[Dict[str, str]]:
+        """
+        Load the persisted near-duplicate index
+
+        Returns:
+            dict: Serialized NearDuplicateIndex, or None if it was never saved
+        """
+        if self._meta('near_duplicates_saved') != 'true':
+            return None
+        # Entries for links that are no longer stored are left out
+        rows = self.conn.execute(
+            'SELECT near_duplicates.link, value FROM near_duplicates JOIN links USING (link)'
+        )
+        return {row['link']: row['value'] for row in rows}
+
+    def save_near_duplicates(self, data: Dict[str, str]):
+        """Persist the serialized near-duplicate index"""
+        with self.conn:
+            self.conn.execute('DELETE FROM near_duplicates')
+            self.conn.executemany('INSERT INTO near_duplicates (link, value) VALUES (?, ?)', data.items())
+            self._set_meta('near_duplicates_saved', 'true')
+
+    def save_months(self, events: EventsDict, months: Iterable[str]):
+        """
+        Upsert the given months' rows from `events`
+
+        Each event is inserted or updated in place by (date, position); rows
+        past the end of a date's list and dates no longer present are
+        deleted. Dates in `events` outside `months` are ignored.
+
+        Args:
+            events: date -> list of events (must contain every date of each month)
+            months: Months to write
+        """
+        months = set(months)
+        if not months:
+            return
+
+        with self.conn:
+            for month in months:
+                start, end = month_range(month)
+                shard = {date: day for date, day in events.items() if start <= date < end}
+                self._shards[month] = shard
+
+                self.conn.executemany(
+                    'INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (date, position) DO UPDATE SET '
+                    'category = excluded.category, title = excluded.title, description = excluded.description, '
+                    'link = excluded.link, tags = excluded.tags, event_date = excluded.event_date, '
+                    'found_date = excluded.found_date, extra = excluded.extra '
+                    'WHERE (category, title, description, link, tags, event_date, found_date, extra) '
+                    'IS NOT (excluded.category, excluded.title, excluded.description, excluded.link, '
+                    'excluded.tags, excluded.event_date, excluded.found_date, excluded.extra)',
+                    (event_to_row(date, position, event)
+                     for date, day in shard.items() for position, event in enumerate(day))
+                )
+                self.conn.executemany(
+                    'DELETE FROM events WHERE date = ? AND position >= ?',
+                    ((date, len(day)) for date, day in shard.items())
+                )
+                stored_dates = [row['date'] for row in self.conn.execute(
+                    'SELECT DISTINCT date FROM events WHERE date >= ? AND date < ?', (start, end)
+                )]
+                self.conn.executemany(
+                    'DELETE FROM events WHERE date = ?',
+                    ((date,) for date in stored_dates if date not in shard)
+                )
+            self._set_meta('aggregate_stale', 'true')
+
+    def drop_months(self, months: Iterable[str]):
+        """Delete whole months without loading them"""
+        months = set(months)
+        if not months:
+            return
+
+        with self.conn:
+            for month in months:
+                start, end = month_range(month)
+                self.conn.execute('DELETE FROM events WHERE date >= ? AND date < ?', (start, end))
+                self._shards.pop(month, None)
+            self._set_meta('aggregate_stale', 'true')
+
+    def count_dates_before(self, cutoff_date: str) -> int:
+        """Number of stored dates before cutoff_date"""
+        return self.conn.execute(
+            'SELECT COUNT(DISTINCT date) FROM events WHERE date < ?', (cutoff_date,)
+        ).fetchone()[0]
+
+    def delete_before(self, cutoff_date: str) -> int:
+        """
+        Retention cleanup as ranged DELETEs: every event, link and
+        near-duplicate entry dated before cutoff_date
+
+        Args:
+            cutoff_date: First date to keep (YYYY-MM-DD)
+
+        Returns:
+            int: Number of dates removed
+        """
+        with self.conn:
+            removed = self.count_dates_before(cutoff_date)
+            self.conn.execute('DELETE FROM events WHERE date < ?', (cutoff_date,))
+            self.conn.execute(
+                'DELETE FROM near_duplicates WHERE link IN (SELECT link FROM links WHERE date < ?)', (cutoff_date,)
+            )
+            self.conn.execute('DELETE FROM links WHERE date < ?', (cutoff_date,))
+            if removed:
+                self._set_meta('aggregate_stale', 'true')
+
+        for month in [month for month in self._shards if month_range(month)[0] < cutoff_date]:
+            self._shards[month] = {
+                date: day for date, day in self._shards[month].items() if date >= cutoff_date
+            }
+        return removed
+
+    def find_events(
+        self,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        category: Optional[str] = None,
+        tag: Optional[str] = None,
+        link: Optional[str] = None,
+        event_from: Optional[str] = None,
+        event_to: Optional[str] = None,
+        text: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Indexed event search
+
+        Args:
+            date_from / date_to: Inclusive range of the date bucket (found date)
+            category: Exact category
+            tag: Exact tag
+            link: Exact link
+            event_from / event_to: Inclusive range of event_date
+            text: Substring of the title or description (case-insensitive, not indexed)
+            limit: Maximum number of events
+
+        Returns:
+            list: Matching events, newest first, each with its "date" bucket added
+        """
+        clauses, params = [], []
+        for clause, value in (
+            ('events.date >= ?', date_from), ('events.date <= ?', date_to),
+            ('category = ?', category), ('link = ?', link),
+            ('event_date >= ?', event_from), ('event_date <= ?', event_to)
+        ):
+            if value:
+                clauses.append(clause)
+                params.append(value)
+        if tag:
+            clauses.append('(events.date, events.position) IN '
+                           '(SELECT date, position FROM event_tags WHERE tag = ?)')
+            params.append(tag)
+        if text:
+            clauses.append("(title LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\')")
+            pattern = '%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            params.extend([pattern, pattern])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        if limit:
+            where += ' ORDER BY date DESC, position LIMIT ?'
+            params.append(limit)
+            rows = self.conn.execute(f'SELECT * FROM events {where}', tuple(params))
+        else:
+            rows = self._select(where, tuple(params))
+        return [{'date': row['date'], **row_to_event(row)} for row in rows]
+
+    def import_events(self, events: EventsDict, link_index: Optional[Dict[str, tuple]] = None):
+        """
+        Initialize the store from a date -> events dict
+
+        Args:
+            events: Full event history
+            link_index: Optional link index to persist alongside
+        """
+        self.save_months(events, {date[:7] for date in events})
+        if link_index is not None:
+            self.save_links(link_index)
+
+    def export_aggregate(self, path: Path, force: bool = False, compact: bool = False) -> bool:
+        """
+        Regenerate the site-facing events.json if the store changed since the last export
+
+        Args:
+            path: Aggregate events.json to write
+            force: Rewrite even if the aggregate is up to date
+            compact: Write minified JSON instead of indented
+
+        Returns:
+            bool: True if the aggregate was rewritten
+        """
+        path = Path(path)
+        if not force and self._meta('aggregate_stale', 'true') != 'true' and path.exists():
+            return False
+
+        if compact:
+            write_json(path, self._group(self._select()), separators=(',', ':'), ensure_ascii=False)
+        else:
+            write_json(path, self._group(self._select()), indent=2, ensure_ascii=False)
+
+        with self.conn:
+            self._set_meta('aggregate_stale', 'false')
+        return True
+
+
+class SQLiteLinkIndex(MutableMapping):
+    """
+    link -> (date, event_index) mapping backed by the links table
+
+    Lookups go to the indexed table one link at a time, so the full index
+    never has to be in memory. Changes are buffered and written by flush()
+    (called from SQLiteEventStore.save_links), so the table never points
+    at events that haven't been saved yet.
+    """
+
+    def __init__(self, store: SQLiteEventStore):
+        self.store = store
+        self._pending: Dict[str, Optional[tuple]] = {}
+        # Rows before this date are deleted when the store is saved; hide them until then
+        self._cutoff = ''
+
+    def __getitem__(self, link: str) -> tuple:
+        if link in self._pending:
+            location = self._pending[link]
+            if location is None:
+                raise KeyError(link)
+            return location
+        row = self.store.conn.execute(
+            'SELECT date, position FROM links WHERE link = ? AND date >= ?', (link, self._cutoff)
+        ).fetchone()
+        if row is None:
+            raise KeyError(link)
+        return (row['date'], row['position'])
+
+    def __setitem__(self, link: str, location: tuple):
+        self._pending[link] = tuple(location)
+
+    def __delitem__(self, link: str):
+        self[link]
+        self._pending[link] = None
+
+    def __iter__(self) -> Iterator[str]:
+        for row in self.store.conn.execute('SELECT link FROM links WHERE date >= ?', (self._cutoff,)):
+            if row['link'] not in self._pending:
+                yield row['link']
+        for link, location in list(self._pending.items()):
+            if location is not None:
+                yield link
+
+    def __len__(self) -> int:
+        count = self.store.conn.execute('SELECT COUNT(*) FROM links WHERE date >= ?', (self._cutoff,)).fetchone()[0]
+        for link, location in self._pending.items():
+            stored = self.store.conn.execute(
+                'SELECT 1 FROM links WHERE link = ? AND date >= ?', (link, self._cutoff)
+            ).fetchone() is not None
+            count += (location is not None) - stored
+        return count
+
+    def pending_changes(self) -> Dict[str, Any]:
+        """Buffered changes in JSON-serializable form (for a save journal)"""
+        return {
+            'set': {link: list(location) for link, location in self._pending.items() if location is not None},
+            'delete': [link for link, location in self._pending.items() if location is None]
+        }
+
+    def restore_changes(self, changes: Dict[str, Any]):
+        """Buffer changes recorded by pending_changes() again"""
+        for link, location in changes['set'].items():
+            self._pending[link] = tuple(location)
+        for link in changes['delete']:
+            self._pending[link] = None
+
+    def discard_before(self, cutoff_date: str):
+        """Forget entries dated before cutoff_date (the table is purged by delete_before)"""
+        self._cutoff = max(self._cutoff, cutoff_date)
+        for link, location in list(self._pending.items()):
+            if location is not None and location[0] < cutoff_date:
+                del self._pending[link]
+
+    def flush(self):
+        """Write buffered changes to the links table"""
+        with self.store.conn:
+            self.store.conn.executemany(
+                'INSERT OR REPLACE INTO links (link, date, position) VALUES (?, ?, ?)',
+                ((link, location[0], location[1]) for link, location in self._pending.items() if location is not None)
+            )
+            self.store.conn.executemany(
+                'DELETE FROM links WHERE link = ?',
+                ((link,) for link, location in self._pending.items() if location is None)
+            )
+        self._pending.clear()
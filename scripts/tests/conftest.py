@@ -0,0 +1,10 @@
+"""Make the scripts/ modules and fetch_events importable from the tests"""
+
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+for path in (SCRIPTS_DIR, SCRIPTS_DIR / '_site'):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
@@ -0,0 +1,123 @@
+"""Tests for the sharded link index and journaled saves of event_store.py"""
+
+import json
+
+import pytest
+
+from event_store import ShardedEventStore, ShardedLinkIndex
+
+
+def make_event(link, date, title='Event'):
+    return {
+        'category': 'News', 'title': title, 'description': 'd', 'link': link,
+        'tags': [], 'event_date': 'unknown', 'found_date': date
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ShardedEventStore(tmp_path / '_events_store')
+
+
+def test_link_index_binary_search(store):
+    links = {f'https://example.com/{i:03d}': ('2026-10-01', i) for i in range(200)}
+    links['https://example.com/"quoted"'] = ('2026-09-30', 0)
+    links['https://example.com/ünïcode'] = ('2026-09-29', 1)
+    store.save_links(links)
+
+    index = store.load_links()
+    assert isinstance(index, ShardedLinkIndex)
+    for link, location in links.items():
+        assert index[link] == location
+    assert index.get('https://example.com/') is None
+    assert index.get('https://example.com/0000') is None
+    assert index.get('https://example.com/999') is None
+    assert len(index) == len(links)
+
+
+def test_link_index_empty_store(store):
+    index = store.load_links()
+    assert index.get('https://example.com/1') is None
+    assert len(index) == 0
+
+
+def test_link_index_flush_merges_pending_changes(store):
+    store.save_links({
+        'https://b.example/': ('2026-10-01', 0),
+        'https://d.example/': ('2026-10-02', 0),
+        'https://f.example/': ('2026-10-03', 0)
+    })
+
+    index = store.load_links()
+    index['https://a.example/'] = ('2026-10-04', 0)
+    index['https://d.example/'] = ('2026-10-04', 1)
+    index['https://z.example/'] = ('2026-10-04', 2)
+    del index['https://f.example/']
+    # Pending changes are visible before the flush
+    assert index['https://d.example/'] == ('2026-10-04', 1)
+    assert 'https://f.example/' not in index
+    store.save_links(index)
+
+    lines = store.links_path.read_bytes().splitlines()[1:-1]
+    keys = [json.loads(line.rsplit(b':[', 1)[0]) for line in lines]
+    assert keys == sorted(keys)
+
+    reopened = store.reopen().load_links()
+    assert dict(reopened.items()) == {
+        'https://a.example/': ('2026-10-04', 0),
+        'https://b.example/': ('2026-10-01', 0),
+        'https://d.example/': ('2026-10-04', 1),
+        'https://z.example/': ('2026-10-04', 2)
+    }
+    assert len(reopened) == 4
+
+
+def test_link_index_discard_before(store):
+    store.save_links({
+        'https://old.example/': ('2026-08-31', 0),
+        'https://new.example/': ('2026-09-01', 0)
+    })
+
+    index = store.load_links()
+    index['https://pending-old.example/'] = ('2026-08-15', 0)
+    index.discard_before('2026-09-01')
+    assert index.get('https://old.example/') is None
+    assert index.get('https://pending-old.example/') is None
+    store.save_links(index)
+
+    assert dict(store.reopen().load_links().items()) == {'https://new.example/': ('2026-09-01', 0)}
+
+
+def test_interrupted_save_is_replayed(tmp_path, monkeypatch):
+    import fetch_events
+
+    monkeypatch.setattr(fetch_events, 'BASE_PATH', tmp_path)
+    monkeypatch.setattr(fetch_events, 'OUTPUT_NAMESPACE', None)
+    monkeypatch.setitem(fetch_events.near_duplicates._settings, 'near_duplicates', False)
+    (tmp_path / '_data').mkdir()
+    (tmp_path / '_data' / 'events.json').write_text(
+        json.dumps({'2026-10-17': [make_event('https://old.example/', '2026-10-17')]})
+    )
+
+    events = fetch_events.load_events_json()
+    events = fetch_events.merge_events(events, [make_event('https://new.example/', '2026-10-18')], '2026-10-18')
+
+    # Crash after the journal and the shards are written, before the link index
+    def interrupted(self, link_index):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as patch:
+        patch.setattr(ShardedEventStore, 'save_links', interrupted)
+        with pytest.raises(KeyboardInterrupt):
+            fetch_events.save_events_json(events)
+    assert events.store.journal.exists()
+
+    recovered = fetch_events.load_events_json()
+    assert not recovered.store.journal.exists()
+    assert recovered.link_index['https://new.example/'] == ('2026-10-18', 0)
+    assert fetch_events.find_duplicate_by_link(recovered, 'https://old.example/') == ('2026-10-17', 0)
+
+    exported = json.loads((tmp_path / '_data' / 'events.json').read_text())
+    assert [event['link'] for day in exported.values() for event in day] == [
+        'https://new.example/', 'https://old.example/'
+    ]
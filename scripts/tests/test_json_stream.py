@@ -0,0 +1,46 @@
+"""Tests for the streaming JSON array parser of json_stream.py"""
+
+from json_stream import JSONArrayStreamParser, iter_json_array_items
+
+
+def feed_chars(parser, text):
+    items = []
+    for char in text:
+        items.extend(parser.feed(char))
+    return items
+
+
+def test_elements_are_emitted_as_they_complete():
+    parser = JSONArrayStreamParser()
+    assert parser.feed('```json\n[{"a": 1}, {"b"') == [{'a': 1}]
+    assert parser.feed(': "x, ]"}, 3') == [{'b': 'x, ]'}]
+    assert parser.feed(']\n```') == [3]
+    assert parser.complete
+    assert parser.items == [{'a': 1}, {'b': 'x, ]'}, 3]
+    assert parser.errors == 0
+
+
+def test_bad_element_is_skipped_and_parsing_recovers():
+    text = '[{"title": "ok"}, {"title": "broken",}, {"title": "also \\"ok\\""}, nope, [1, 2]]'
+    parser = JSONArrayStreamParser()
+    items = feed_chars(parser, text)
+
+    assert items == [{'title': 'ok'}, {'title': 'also "ok"'}, [1, 2]]
+    assert parser.errors == 2
+    assert parser.complete
+    assert parser.text == text
+
+
+def test_truncated_array_keeps_completed_elements():
+    parser = JSONArrayStreamParser()
+    items = list(iter_json_array_items(['[{"n": 1}, {"n": 2}, {"n"', ': 3'], parser))
+
+    assert items == [{'n': 1}, {'n': 2}]
+    assert not parser.complete
+
+
+def test_input_after_the_array_is_ignored():
+    parser = JSONArrayStreamParser()
+    assert parser.feed('[1]') == [1]
+    assert parser.feed(', [2]') == []
+    assert parser.items == [1]
@@ -0,0 +1,109 @@
+"""Tests for the retry budget and circuit breakers of retry_policy.py"""
+
+import pytest
+import requests
+
+import retry_policy
+from retry_policy import CircuitBreaker, RetryPolicy
+
+
+class Clock:
+    """Stands in for time.monotonic() and time.sleep()"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f'HTTP {status_code}')
+        self.status_code = status_code
+        self.response = type('Response', (), {'status_code': status_code, 'headers': headers or {}})()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(retry_policy.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(retry_policy.time, 'sleep', clock.sleep)
+    return clock
+
+
+def test_retry_budget_is_shared_and_exhausted(clock):
+    policy = RetryPolicy(base_delay=4, max_delay=4, budget_seconds=10, seed=1)
+    error = HTTPError(429, {'retry-after': '4'})
+
+    assert policy.wait(0, error, 'google')
+    assert policy.wait(0, error, 'openai')
+    # A third 4 s wait would go past the 10 s budget
+    assert not policy.wait(0, error, 'google')
+    assert clock.slept == [4.0, 4.0]
+    assert policy.summary()['budget_used_seconds'] == 8.0
+
+
+def test_backoff_is_jittered_and_capped(clock):
+    policy = RetryPolicy(base_delay=1, max_delay=5, budget_seconds=1000, seed=7)
+    for attempt in range(8):
+        assert 0 <= policy.backoff(attempt) <= min(5, 2 ** attempt)
+
+
+def test_client_errors_are_not_retried(clock):
+    policy = RetryPolicy(budget_seconds=1000)
+    assert not policy.wait(0, HTTPError(401), 'openai')
+    assert policy.wait(0, HTTPError(503, {'retry-after': '0'}), 'openai')
+    assert clock.slept == [0.0]
+
+
+def test_circuit_breaker_transitions(clock):
+    breaker = CircuitBreaker(threshold=3, cooldown=60)
+
+    # Closed until three consecutive failures
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert not breaker.is_open
+    breaker.record_failure()
+    assert breaker.is_open
+
+    # Open: calls fail fast until the cool-down has passed
+    assert not breaker.allow()
+    clock.now += 59
+    assert not breaker.allow()
+
+    # Half-open: a single trial call, whose failure re-opens the breaker
+    clock.now += 1
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.is_open
+    assert not breaker.allow()
+
+    # A successful trial closes it again
+    clock.now += 60
+    assert breaker.allow()
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.allow() and breaker.allow()
+
+
+def test_policy_trips_breaker_only_on_provider_failures(clock):
+    policy = RetryPolicy(breaker_threshold=2, breaker_cooldown=30, budget_seconds=1000)
+
+    policy.record_failure('xai', HTTPError(400))
+    policy.record_failure('xai', requests.exceptions.ConnectionError())
+    assert policy.allow('xai')
+    policy.record_failure('xai', HTTPError(502))
+    assert not policy.allow('xai')
+    assert policy.summary()['open_circuits'] == ['xai']
+
+    # An open circuit stops retries, and other endpoints are unaffected
+    assert not policy.wait(0, HTTPError(502), 'xai')
+    assert policy.allow('google')
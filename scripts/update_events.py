@@ -1,10 +1,26 @@
 import os
+import re
 import json
 import requests
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
-from openai import OpenAI
 from collections import defaultdict
 
+import http_clients
+import response_cache
+import published_output
+from event_store import ShardedEventStore, month_of
+from rate_limit import SharedTokenBucket
+from site_index import write_site_indexes
+
+OUTPUT_ROOT = "public/events-data"
+# The event history stays out of public/, which Astro serves as-is; only
+# the files exported from it are published
+STORE_ROOT = "data/events-store"
+
+# Set in worker processes when several addresses are processed in parallel
+_search_limiter = None
+
 def load_config():
     """Loads configuration from environment variables."""
     config = {
@@ -18,16 +34,40 @@ def load_config():
         raise ValueError("One or more environment variables are not set!")
 
     config["search_queries"] = [q.strip() for q in config["search_queries_raw"].split(',')]
+    # Several sites can be tracked at once: TARGET_ADDRESS="addr 1; addr 2"
+    config["target_addresses"] = [a.strip() for a in config["target_address"].split(';') if a.strip()]
     return config
 
+def address_slug(address):
+    """Returns the directory name used for one of several tracked addresses."""
+    return re.sub(r'[^a-z0-9]+', '-', address.lower()).strip('-')
+
+def output_dir_for(address):
+    """Returns the data directory of one of several tracked addresses."""
+    return f"{OUTPUT_ROOT}/{address_slug(address)}"
+
+def store_dir_for(address):
+    """Returns the event store directory of one of several tracked addresses."""
+    return f"{STORE_ROOT}/{address_slug(address)}"
+
 def fetch_google_search_results(api_key, cx_id, query):
     """Performs a Google search and returns the results."""
     print(f"Searching for: {query}...")
+    cache = response_cache.get_cache()
+    cache_key = [cx_id, query, datetime.now(timezone.utc).strftime("%Y-%m-%d")]
+    cached = cache.get("google", cache_key)
+    if cached is not None:
+        return cached
+
     url = f"https://www.googleapis.com/customsearch/v1?key={api_key}&cx={cx_id}&q={query}"
+    if _search_limiter is not None:
+        _search_limiter.acquire()
     try:
-        response = requests.get(url)
+        response = http_clients.get_session().get(url)
         response.raise_for_status()
-        return response.json().get("items", [])
+        items = response.json().get("items", [])
+        cache.set("google", cache_key, items)
+        return items
     except requests.exceptions.RequestException as e:
         print(f"Error during search: {e}")
         return []
@@ -55,16 +95,26 @@ def analyze_with_openai(client, search_results, address):
     ]
     """
 
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant that returns structured JSON."},
+        {"role": "user", "content": prompt}
+    ]
+    cache = response_cache.get_cache()
+    cache_key = {"model": "gpt-4o", "messages": messages, "date": datetime.now(timezone.utc).strftime("%Y-%m-%d")}
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that returns structured JSON."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        data = json.loads(response.choices[0].message.content)
+        content = cache.get("openai", cache_key)
+        from_cache = content is not None
+        if not from_cache:
+            response = client.chat.completions.create(
+                model="gpt-4o",
+                response_format={"type": "json_object"},
+                messages=messages
+            )
+            content = response.choices[0].message.content
+        data = json.loads(content)
+        if not from_cache:
+            cache.set("openai", cache_key, content)
         if isinstance(data, dict):
             for key in data:
                 if isinstance(data[key], list):
@@ -74,50 +124,108 @@ def analyze_with_openai(client, search_results, address):
         print(f"Error with OpenAI API: {e}")
         return None
 
-def update_events_data(new_events):
-    """Updates the events JSON file for Astro to consume."""
+def apply_update(store, output_dir, changes):
+    """Writes a journaled update: the month shards, then every file exported from them."""
+    months = changes["months"]
+    store.save_months({date: day for shard in months.values() for date, day in shard.items()}, months)
+    # Forced: a recovered update may have stopped after the export cleared the stale flag
+    published_output.export_store(store, f"{output_dir}/events.json", force=True)
+    write_site_indexes(store, output_dir)
+    published_output.write_json(f"{output_dir}/{changes['date']}.json", changes["events"])
+    store.bump_generation()
+    store.journal.clear()
+
+def recover_update(store, output_dir):
+    """Redoes an update that was interrupted after its journal was written."""
+    changes = store.journal.read()
+    if changes is None:
+        return False
+    apply_update(store, output_dir, changes)
+    return True
+
+def update_events_data(new_events, output_dir=OUTPUT_ROOT, store_dir=STORE_ROOT):
+    """Updates the events JSON file for Astro to consume.
+
+    Only the current month's shard in <store_dir> is rewritten;
+    events.json, the day file and the small per-category, per-tag,
+    per-month and latest indexes under <output_dir>/index/ are regenerated
+    from the shards afterwards. The read-modify-write happens under the
+    store's lock and every file is replaced atomically, so overlapping runs
+    can't clobber each other. The update is journaled before the first
+    write and the journal cleared after the last, so an interrupted run is
+    completed by the next one.
+    """
     print("Updating events data file...")
     today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
 
     # Update the master JSON data file
-    events_path = "public/events-data/events.json"
-    os.makedirs("public/events-data", exist_ok=True)
-
-    all_events = {}
-    if os.path.exists(events_path):
-        with open(events_path, 'r', encoding='utf-8') as f:
-            all_events = json.load(f)
-
-    all_events[today_str] = new_events
-
-    with open(events_path, 'w', encoding='utf-8') as f:
-        json.dump(all_events, f, ensure_ascii=False, indent=2)
-
-    # Create individual day data file
-    day_path = f"public/events-data/{today_str}.json"
-    with open(day_path, 'w', encoding='utf-8') as f:
-        json.dump(new_events, f, ensure_ascii=False, indent=2)
+    events_path = f"{output_dir}/events.json"
+    os.makedirs(output_dir, exist_ok=True)
+
+    store = ShardedEventStore(store_dir)
+    with store.lock():
+        # Re-read under the lock in case another run saved in the meantime
+        store = store.reopen()
+        if recover_update(store, output_dir):
+            print("Completed an update that was interrupted by a previous run.")
+        if not store.exists() and os.path.exists(events_path):
+            with open(events_path, 'r', encoding='utf-8') as f:
+                store.import_events(json.load(f))
+
+        month = month_of(today_str)
+        month_events = dict(store.load_month(month))
+        month_events[today_str] = new_events
+        changes = {"months": {month: month_events}, "date": today_str, "events": new_events}
+        store.journal.write(changes)
+        apply_update(store, output_dir, changes)
 
     print("Events data updated successfully.")
 
-if __name__ == "__main__":
-    print("Starting daily events update process...")
-    config = load_config()
+def run_for_address(config, address, output_dir, store_dir):
+    """Searches, analyzes and stores the events around one address."""
     all_results = []
     for query_template in config["search_queries"]:
-        query = query_template.replace("{address}", config["target_address"])
+        query = query_template.replace("{address}", address)
         all_results.extend(fetch_google_search_results(
             config["google_api_key"], config["search_engine_id"], query
         ))
 
     if all_results:
-        openai_client = OpenAI(api_key=config["openai_api_key"])
-        newly_generated_events = analyze_with_openai(openai_client, all_results, config["target_address"])
+        openai_client = http_clients.get_openai_client(config["openai_api_key"])
+        newly_generated_events = analyze_with_openai(openai_client, all_results, address)
 
         if newly_generated_events:
-            update_events_data(newly_generated_events)
+            update_events_data(newly_generated_events, output_dir, store_dir)
             print("Process completed successfully.")
+            return True
         else:
             print("Failed to generate content from OpenAI.")
     else:
         print("No search results found. Exiting.")
+    return False
+
+def init_worker(search_limiter):
+    """Adopts the parent's search rate limiter in a worker process."""
+    global _search_limiter
+    _search_limiter = search_limiter
+
+if __name__ == "__main__":
+    print("Starting daily events update process...")
+    config = load_config()
+    addresses = config["target_addresses"]
+
+    if len(addresses) == 1:
+        run_for_address(config, addresses[0], OUTPUT_ROOT, STORE_ROOT)
+    else:
+        # One worker process per address; Google requests share one rate
+        # limit and all workers share the on-disk response cache
+        limiter = SharedTokenBucket(rate=float(os.environ.get("SEARCH_REQUESTS_PER_SECOND", "5")))
+        with ProcessPoolExecutor(max_workers=len(addresses), initializer=init_worker, initargs=(limiter,)) as executor:
+            futures = {
+                address: executor.submit(
+                    run_for_address, config, address, output_dir_for(address), store_dir_for(address)
+                )
+                for address in addresses
+            }
+            for address, future in futures.items():
+                print(f"{address}: {'updated' if future.result() else 'not updated'}")